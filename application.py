@@ -1,15 +1,172 @@
+import os
+import time
 import joblib
 import numpy as np
-from config.paths_config import MODEL_OUTPUT_PATH
-from flask import Flask, render_template,request
+from config.paths_config import (MODEL_OUTPUT_PATH, TREE_MODEL_OUTPUT_PATH, PREPROCESSOR_PATH, DRIFT_REFERENCE_PATH,
+                                 CONFIG_PATH)
+from flask import Flask, Response, render_template, request, jsonify, g
+from src.micro_batcher import MicroBatcher
+from src.prediction_cache import PredictionCache
+from src.model_registry import ModelRegistry
+from src.drift_monitor import DriftMonitor
+from src.metrics import MetricsRegistry
+from src.logger import get_logger
+from src.tree_predictor import TreeEnsemblePredictor
+from src.preprocessor import BookingPreprocessor
+from src.custom_exception import CustomException
+from src.batch_scoring import (FEATURE_COLUMNS, BatchValidationError, parse_json_bookings, parse_csv_bookings,
+                               parse_raw_json_bookings, parse_raw_csv_bookings, build_feature_matrix, score_batch)
+from utils.common_functions import read_yaml
 
 app = Flask(__name__)
 
-loaded_model = joblib.load(MODEL_OUTPUT_PATH)
+config = read_yaml(CONFIG_PATH)
+serving_config = config["serving"]
+
+# One line per request; volume is controlled by logging.sampling/rate_limits for "access"
+ACCESS_LOG = config.get("logging", {}).get("access_log", False)
+access_logger = get_logger("access")
+
+MODEL_FORMAT = os.environ.get("MODEL_FORMAT", serving_config.get("model_format", "pickle"))
+MODEL_PATH = TREE_MODEL_OUTPUT_PATH if MODEL_FORMAT == "tree_tables" else MODEL_OUTPUT_PATH
+
+def load_model():
+    """The served model plus the preprocessor fitted alongside it (feature order, log1p columns)"""
+    # "tree_tables" serves the NumPy export of the booster instead of the LightGBM pickle
+    if MODEL_FORMAT == "tree_tables":
+        # Memory-mapped tables are read from the page cache, so forked workers share one copy
+        mmap_mode = "r" if serving_config.get("mmap_tree_tables", False) else None
+        model = TreeEnsemblePredictor.load(TREE_MODEL_OUTPUT_PATH, mmap_mode=mmap_mode)
+    else:
+        model = joblib.load(MODEL_OUTPUT_PATH)
+    preprocessor = BookingPreprocessor.load(PREPROCESSOR_PATH) if os.path.exists(PREPROCESSOR_PATH) else None
+    # The form and /predict_batch send exactly FEATURE_COLUMNS; a model trained on a different
+    # selection would score them against the wrong features, so it is refused instead of served
+    if preprocessor is not None and not preprocessor.covers(FEATURE_COLUMNS):
+        raise CustomException(f"Model was trained on {preprocessor.feature_order}, which does not match the "
+                              f"serving columns {FEATURE_COLUMNS}")
+    return model, preprocessor
+
+def warm_up_model(model, preprocessor):
+    """One dummy prediction so LightGBM's first-call setup does not land on a real request"""
+    n_features = len(preprocessor.feature_order) if preprocessor is not None and preprocessor.feature_order \
+        else getattr(model, "n_features_in_", len(FEATURE_COLUMNS))
+    model.predict(np.zeros((1, n_features), dtype=np.float64))
+
+# Nothing is loaded at import; the first request or warm_up() loads the model, and a watcher
+# thread swaps in retrained artifacts written by training_pipeline. Only the model path is
+# watched: the pipeline writes the preprocessor before training, so a new model always comes
+# with its matching preprocessor already on disk
+model_reload_config = serving_config.get("model_reload", {})
+model_registry = ModelRegistry(load_model, [MODEL_PATH], warmup_fn=warm_up_model,
+                               poll_interval_s=model_reload_config.get("poll_interval_s", 5),
+                               watch=model_reload_config.get("enabled", False))
+
+MAX_BATCH_SIZE = int(serving_config["max_batch_size"])
+
+micro_batching_config = serving_config.get("micro_batching", {})
+micro_batcher = None
+if micro_batching_config.get("enabled", False):
+    micro_batcher = MicroBatcher(lambda rows: model_registry.get().model.predict(rows),
+                                 max_batch_size=micro_batching_config["max_batch_size"],
+                                 max_wait_ms=micro_batching_config["max_wait_ms"])
+
+prediction_cache_config = serving_config.get("prediction_cache", {})
+prediction_cache = None
+if prediction_cache_config.get("enabled", False):
+    prediction_cache = PredictionCache(
+        max_entries=prediction_cache_config["max_entries"],
+        ttl_seconds=prediction_cache_config.get("ttl_seconds"),
+        price_index=FEATURE_COLUMNS.index("avg_price_per_room"),
+        price_quantum=prediction_cache_config.get("price_quantum")
+    )
+    model_registry.add_listener(lambda loaded: prediction_cache.invalidate(f"model version {loaded.version}"))
+
+# Served features and predictions against the training reference; training writes the reference
+# before the model, so a hot swap always finds the matching one
+drift_config = serving_config.get("drift", {})
+drift_monitor = None
+if drift_config.get("enabled", False):
+    drift_monitor = DriftMonitor(DRIFT_REFERENCE_PATH,
+                                 window_rows=drift_config.get("window_rows", 100000),
+                                 min_rows=drift_config.get("min_rows", 200),
+                                 warn_psi=drift_config.get("warn_psi", 0.1),
+                                 alert_psi=drift_config.get("alert_psi", 0.2))
+    model_registry.add_listener(lambda loaded: drift_monitor.load_reference())
+
+# Telemetry for GET /metrics (Prometheus text format); per process, so each gunicorn worker
+# reports its own series
+metrics = MetricsRegistry(namespace="hotel_churn")
+REQUEST_LATENCY = metrics.histogram("request_latency_ms", "End-to-end request latency in ms", ["route", "method"])
+PHASE_LATENCY = metrics.histogram("request_phase_latency_ms", "Request parse/predict/render time in ms",
+                                  ["route", "phase"])
+REQUESTS = metrics.counter("requests_total", "Requests by route and HTTP status", ["route", "status"])
+REQUEST_ERRORS = metrics.counter("request_errors_total", "Failed requests by route, client (4xx) or server (5xx)",
+                                 ["route", "kind"])
+metrics.gauge("model_reloads", "Hot model swaps since start", lambda: model_registry.reloads)
+metrics.gauge("model_reload_errors", "Failed model reloads since start", lambda: model_registry.reload_errors)
+if prediction_cache is not None:
+    metrics.gauge("prediction_cache_lookups", "Prediction cache lookups by result",
+                  lambda: {("hit",): prediction_cache.hits, ("miss",): prediction_cache.misses}, ["result"])
+    metrics.gauge("prediction_cache_entries", "Entries in the prediction cache",
+                  lambda: prediction_cache.stats()["entries"])
+if micro_batcher is not None:
+    metrics.gauge("micro_batch_queue_depth", "Rows waiting for the micro-batcher",
+                  lambda: micro_batcher._queue.qsize())
+if drift_monitor is not None:
+    metrics.gauge("drift_psi", "PSI of served features and predictions against the training reference",
+                  drift_monitor.psi, ["column"])
+
+def observe_phase(route, phase, start):
+    """Record the time since start as one request phase and return the current time"""
+    now = time.perf_counter()
+    PHASE_LATENCY.labels(route, phase).observe((now - start) * 1000)
+    return now
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    elapsed_ms = (time.perf_counter() - g.request_start) * 1000
+    REQUEST_LATENCY.labels(route, request.method).observe(elapsed_ms)
+    REQUESTS.labels(route, str(response.status_code)).inc()
+    if response.status_code >= 400:
+        REQUEST_ERRORS.labels(route, "client" if response.status_code < 500 else "server").inc()
+    if ACCESS_LOG:
+        access_logger.info("%s %s %d %.2fms", request.method, request.path, response.status_code, elapsed_ms)
+    return response
+
+def to_model_features(features, preprocessor):
+    """Form-order encoded features -> (features, aligned) in the column order and log1p scaling used in training
+
+    aligned is False only without a saved preprocessor (load_model refuses one that does not
+    cover the form columns); the rows are then returned in form order, unchanged.
+    """
+    if preprocessor is not None:
+        return preprocessor.align_encoded(features, FEATURE_COLUMNS), True
+    return features, False
+
+def observe_drift(features, predictions, preprocessor, aligned):
+    """Add served rows to the drift monitor when they were aligned to the reference's (training) column order"""
+    if drift_monitor is not None and aligned and preprocessor.feature_order == drift_monitor.features:
+        drift_monitor.observe(features, predictions)
+
+def predict_one(row):
+    """Prediction for one form-order feature row"""
+    current = model_registry.get()
+    features, _ = to_model_features(row.reshape(1, -1), current.preprocessor)
+    if micro_batcher is not None:
+        # The snapshot's model, so a reload cannot pair it with a different preprocessor
+        return micro_batcher.predict(features[0], current.model)
+    return current.model.predict(features)[0]
 
 @app.route('/',methods=['GET','POST'])
 def index():
     if request.method=='POST':
+        start = time.perf_counter()
 
         lead_time = int(request.form["lead_time"])
         no_of_special_request = int(request.form["no_of_special_request"])
@@ -25,15 +182,110 @@ def index():
         room_type_reserved = int(request.form["room_type_reserved"])
 
 
-        features = np.array([[lead_time,no_of_special_request,avg_price_per_room,arrival_month,arrival_date,market_segment_type,no_of_week_nights,no_of_weekend_nights,type_of_meal_plan,room_type_reserved]])
+        features = np.array([[lead_time,no_of_special_request,avg_price_per_room,arrival_month,arrival_date,market_segment_type,no_of_week_nights,no_of_weekend_nights,type_of_meal_plan,room_type_reserved]], dtype=np.float64)
+        start = observe_phase("/", "parse", start)
+
+        if prediction_cache is not None:
+            prediction = prediction_cache.get_or_compute(features[0], predict_one)
+        else:
+            prediction = predict_one(features[0])
+        start = observe_phase("/", "predict", start)
 
-        prediction = loaded_model.predict(features)
+        if drift_monitor is not None:
+            preprocessor = model_registry.get().preprocessor
+            model_features, aligned = to_model_features(features, preprocessor)
+            observe_drift(model_features, [prediction], preprocessor, aligned)
+            start = observe_phase("/", "drift", start)
 
-        return render_template('index.html', prediction=prediction[0])
+        html = render_template('index.html', prediction=prediction)
+        observe_phase("/", "render", start)
+        return html
     
     return render_template("index.html" , prediction=None)
 
-import os
-port = int(os.environ.get("PORT", 8080))
-app.run(host='0.0.0.0', port=port)
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    """Score N bookings (JSON or CSV, same 10-feature order as the form) in one model call
+
+    With ?raw=1 the bookings are raw Hotel_Reservations rows, encoded by the fitted preprocessor.
+    """
+    # One model version for the whole request, even if a reload swaps it meanwhile; taken before
+    # the parse timer so a lazy first load is not reported as parse time
+    current = model_registry.get()
+    preprocessor = current.preprocessor
+    parse_start = time.perf_counter()
+    raw = request.args.get("raw", "0").lower() in ("1", "true")
+    try:
+        if request.mimetype == "text/csv":
+            payload = request.get_data(as_text=True)
+        elif "file" in request.files:
+            payload = request.files["file"].read().decode("utf-8")
+        else:
+            payload = None
+
+        if raw:
+            if preprocessor is None:
+                return jsonify({"error": "No fitted preprocessor available for raw bookings"}), 400
+            if payload is not None:
+                df = parse_raw_csv_bookings(payload, MAX_BATCH_SIZE)
+            else:
+                df = parse_raw_json_bookings(request.get_json(force=True, silent=True), MAX_BATCH_SIZE)
+            features = preprocessor.to_model_input(df)
+            # to_model_input always emits the preprocessor's feature order
+            aligned = True
+        else:
+            if payload is not None:
+                rows = parse_csv_bookings(payload, MAX_BATCH_SIZE)
+            else:
+                rows = parse_json_bookings(request.get_json(force=True, silent=True))
+            features, aligned = to_model_features(build_feature_matrix(rows, MAX_BATCH_SIZE), preprocessor)
+    except (BatchValidationError, CustomException) as e:
+        return jsonify({"error": str(e)}), 400
+    parse_ms = (time.perf_counter() - parse_start) * 1000
+    PHASE_LATENCY.labels("/predict_batch", "parse").observe(parse_ms)
+
+    predictions, probabilities, predict_ms = score_batch(current.model, features)
+    PHASE_LATENCY.labels("/predict_batch", "predict").observe(predict_ms)
+    observe_drift(features, predictions, preprocessor, aligned)
+
+    render_start = time.perf_counter()
+    response = jsonify({
+        "n_rows": len(features),
+        "predictions": predictions.tolist(),
+        "probabilities": probabilities.tolist() if probabilities is not None else None,
+        "timing_ms": {"parse": round(parse_ms, 3), "predict": round(predict_ms, 3)},
+    })
+    observe_phase("/predict_batch", "render", render_start)
+    return response
+
+@app.route('/stats/micro_batching', methods=['GET'])
+def micro_batching_stats():
+    if micro_batcher is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **micro_batcher.stats()})
+
+@app.route('/stats/prediction_cache', methods=['GET'])
+def prediction_cache_stats():
+    if prediction_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **prediction_cache.stats()})
+
+@app.route('/drift', methods=['GET'])
+def drift_snapshot():
+    """PSI/KS/quantiles of traffic this worker has served, per feature and for the predictions"""
+    if drift_monitor is None:
+        return jsonify({"enabled": False})
+    return jsonify(drift_monitor.snapshot())
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route('/stats/model', methods=['GET'])
+def model_stats():
+    return jsonify(model_registry.stats())
 
+if __name__ == "__main__":
+    model_registry.warm_up()
+    port = int(os.environ.get("PORT", 8080))
+    app.run(host='0.0.0.0', port=port)
@@ -0,0 +1,71 @@
+"""Write/read time, size and peak RSS of the artifact formats supported by write_data/load_data
+
+    python -m benchmarks.artifact_format_benchmark --rows 1000000
+
+Each read runs in a fresh interpreter so its peak RSS is not polluted by the writer.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from config.paths_config import ARTIFACT_EXTENSIONS
+from utils.common_functions import write_data, load_data, peak_rss_mb
+from benchmarks.synthetic_data import generate_reservations
+
+
+def _size_on_disk(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def read_once(path):
+    """Runs in the child process: load the artifact, report time and RSS growth"""
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    df = load_data(path)
+    # Sum the numeric columns so memory-mapped pages are actually read
+    total = float(df.select_dtypes("number").to_numpy(dtype="float64").sum())
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"read_s": elapsed, "peak_rss_delta_mb": peak_rss_mb() - baseline, "sum": total}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--read", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.read:
+        read_once(args.read)
+        return
+
+    df = generate_reservations(args.rows)
+    tmp = tempfile.mkdtemp(prefix="artifact_bench_")
+    try:
+        print(f"{args.rows} rows, {df.shape[1]} columns, {df.memory_usage(deep=True).sum() / 2**20:.1f} MB in pandas")
+        print(f"{'format':>8} {'write s':>8} {'read s':>8} {'size MB':>8} {'read peak RSS MB':>17}")
+
+        for file_format, ext in ARTIFACT_EXTENSIONS.items():
+            path = os.path.join(tmp, f"train{ext}")
+
+            start = time.perf_counter()
+            write_data(df, path, {"downcast": True})
+            write_s = time.perf_counter() - start
+
+            child = subprocess.run([sys.executable, "-m", "benchmarks.artifact_format_benchmark", "--read", path],
+                                   capture_output=True, text=True, check=True)
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+
+            print(f"{file_format:>8} {write_s:>8.2f} {result['read_s']:>8.2f} "
+                  f"{_size_on_disk(path) / 2**20:>8.1f} {result['peak_rss_delta_mb']:>17.1f}")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Runtime, output size and peak RSS of the balancing strategies in DataProcessor.balance_data
+
+    python -m benchmarks.balancing_benchmark --rows 1000000
+
+The synthetic frame is generated once and saved as .npz; each strategy then runs in a fresh
+interpreter that only loads the arrays, so its peak RSS is not polluted by data generation.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from imblearn.over_sampling import SMOTE
+from utils.common_functions import peak_rss_mb
+from src.balancing import chunked_smote, scale_pos_weight
+from benchmarks.synthetic_data import generate_reservations
+
+STRATEGIES = ["smote", "chunked_smote", "chunked_smote_sampled", "class_weight"]
+
+
+def _numeric_training_frame(n_rows):
+    df = generate_reservations(n_rows)
+    y = (df["booking_status"] == "Canceled").astype(np.int64).to_numpy()
+    X = df.drop(columns=["Booking_ID", "booking_status"]).select_dtypes("number")
+    return X.to_numpy(dtype=np.float64), y
+
+
+def run_once(strategy, data_path):
+    """Runs in the child process: balance once, report time and RSS growth"""
+    with np.load(data_path) as data:
+        X, y = data["X"], data["y"]
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+
+    if strategy == "smote":
+        X_out, _ = SMOTE(random_state=42).fit_resample(X, y)
+        X_out = np.asarray(X_out)
+        rows_out, output_mb = len(X_out), X_out.nbytes / 2**20
+    elif strategy.startswith("chunked_smote"):
+        # Only the synthetic rows are allocated; the original rows are kept as they are
+        X_new, _ = chunked_smote(X, y, neighbor_sample_size=50000 if strategy == "chunked_smote_sampled" else None)
+        rows_out, output_mb = len(X) + len(X_new), (X.nbytes + X_new.nbytes) / 2**20
+    else:
+        scale_pos_weight(y)
+        rows_out, output_mb = len(X), X.nbytes / 2**20
+
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "rows_out": rows_out, "output_mb": output_mb,
+                      "peak_rss_delta_mb": peak_rss_mb() - baseline}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--strategies", nargs="+", default=STRATEGIES, choices=STRATEGIES)
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    parser.add_argument("--data", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_once(args.run, args.data)
+        return
+
+    tmp = tempfile.mkdtemp(prefix="balancing_bench_")
+    try:
+        data_path = os.path.join(tmp, "train.npz")
+        X, y = _numeric_training_frame(args.rows)
+        np.savez(data_path, X=X, y=y)
+        print(f"{args.rows} rows, {X.shape[1]} numeric columns, {y.mean():.1%} positive")
+        del X, y
+
+        print(f"{'strategy':>22} {'seconds':>8} {'rows out':>10} {'output MB':>10} {'peak RSS MB':>12}")
+        for strategy in args.strategies:
+            child = subprocess.run([sys.executable, "-m", "benchmarks.balancing_benchmark",
+                                    "--run", strategy, "--data", data_path],
+                                   capture_output=True, text=True, check=True)
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            print(f"{strategy:>22} {result['seconds']:>8.2f} {result['rows_out']:>10} "
+                  f"{result['output_mb']:>10.1f} {result['peak_rss_delta_mb']:>12.1f}")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
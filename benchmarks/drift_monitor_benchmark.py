@@ -0,0 +1,63 @@
+"""Hot-path cost and memory of the serving drift monitor (src/drift_monitor.py)
+
+    python -m benchmarks.drift_monitor_benchmark
+
+Needs a trained pipeline (drift_reference.json and the processed test data). Times observe()
+for one row, as POST / calls it, and for a 1000-row /predict_batch, then snapshot(); traced
+memory is checked to stay flat however many rows are observed.
+"""
+import argparse
+import time
+import tracemalloc
+import numpy as np
+from config.paths_config import DRIFT_REFERENCE_PATH, PROCESSED_TEST_DATA_PATH
+from src.drift_monitor import DriftMonitor
+from utils.common_functions import load_data
+
+
+def _us_per_call(fn, n):
+    start = time.perf_counter_ns()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter_ns() - start) / n / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--batch-rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    monitor = DriftMonitor(DRIFT_REFERENCE_PATH, window_rows=None)
+    if monitor.reference is None:
+        raise SystemExit(f"No drift reference at {DRIFT_REFERENCE_PATH}; run pipeline/training_pipeline.py first")
+
+    test = load_data(PROCESSED_TEST_DATA_PATH)
+    X = test[monitor.features].to_numpy(dtype=np.float64)
+    y = test["booking_status"].to_numpy(dtype=np.float64)
+    rows = [X[i:i + 1] for i in range(min(len(X), 1000))]
+    batch, batch_y = X[:args.batch_rows], y[:args.batch_rows]
+
+    single_us = _us_per_call(lambda i: monitor.observe(rows[i % len(rows)], y[i % len(rows):i % len(rows) + 1]),
+                             args.calls)
+    batch_us = _us_per_call(lambda i: monitor.observe(batch, batch_y), max(1, args.calls // 100))
+    snapshot_ms = _us_per_call(lambda i: monitor.snapshot(), 100) / 1000
+
+    print(f"{'operation':<36} {'time':>12}")
+    print(f"{'observe(1 row)':<36} {single_us:>9.1f} us")
+    print(f"{f'observe({len(batch)} rows)':<36} {batch_us:>9.1f} us ({1000 * batch_us / len(batch):.0f} ns/row)")
+    print(f"{'snapshot()':<36} {snapshot_ms:>9.2f} ms")
+
+    tracemalloc.start()
+    monitor.observe(batch, batch_y)
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(args.calls // 10):
+        monitor.observe(batch, batch_y)
+    growth = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"\n{monitor.rows:,.0f} rows observed; sketch state {monitor._live.counts.nbytes} bytes, "
+          f"traced growth over the last {args.calls // 10 * len(batch):,} rows: {growth} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Time and chosen features of each feature selection method vs the RandomForest ranking
+
+    python -m benchmarks.feature_selection_benchmark --rows 100000
+"""
+import argparse
+import time
+from imblearn.over_sampling import SMOTE
+from config.paths_config import CONFIG_PATH
+from src.feature_selection import RANKERS, rank_features
+from src.preprocessor import BookingPreprocessor
+from utils.common_functions import read_yaml
+from benchmarks.synthetic_data import generate_reservations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    config = read_yaml(CONFIG_PATH)["data_processing"]
+    options = {k: v for k, v in config["feature_selection"].items() if k not in ("method", "cache")}
+    n_features = config["no_of_features"]
+
+    df = generate_reservations(args.rows).drop(columns=["Booking_ID"])
+    preprocessor = BookingPreprocessor(config["categorical_columns"], config["numerical_columns"],
+                                       config["skewness_threshold"])
+    df = preprocessor.fit(df).transform(df)
+    X, y = SMOTE(random_state=42).fit_resample(df.drop(columns="booking_status"), df["booking_status"])
+    print(f"{len(X)} SMOTE-balanced rows, {X.shape[1]} candidate features, selecting {n_features}")
+
+    baseline = None
+    for method in RANKERS:
+        start = time.perf_counter()
+        ranking = rank_features(X, y, method=method, **options)
+        elapsed = time.perf_counter() - start
+
+        selected = list(ranking.index[:n_features])
+        if baseline is None:
+            baseline = set(selected)
+        overlap = len(baseline & set(selected))
+        print(f"{method:<24} {elapsed:>7.2f}s  overlap with random_forest {overlap}/{n_features}  {selected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Caller-side cost of logging in sync and queue mode (src/logger.py)
+
+    python -m benchmarks.logging_benchmark
+
+Each case runs in a child process with LOG_MODE/LOG_FORMAT set, since the logger is configured
+at import. It times logger.info() per call on the calling thread, optionally with a simulated
+slow log sink (--sink-delay-ms, e.g. a network filesystem), and the /predict_batch latency
+through the Flask test client with the access log off and on.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+CASES = [("sync", "text"), ("queue", "text"), ("queue", "json")]
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _child(args):
+    import logging
+    from src import logger as log_module
+
+    if args.sink_delay_ms:
+        emit = logging.FileHandler.emit
+
+        def slow_emit(handler, record):
+            time.sleep(args.sink_delay_ms / 1000)
+            emit(handler, record)
+
+        logging.FileHandler.emit = slow_emit
+
+    logger = log_module.get_logger("benchmark")
+    calls = []
+    for i in range(args.calls):
+        start = time.perf_counter_ns()
+        logger.info("booking %d scored %.3f", i, i / args.calls)
+        calls.append(time.perf_counter_ns() - start)
+
+    import application
+    application.model_registry.warm_up()
+    client = application.app.test_client()
+    payload = {"bookings": [[10, 1, 100.5, 5, 3, 4, 2, 1, 0, 0]]}
+
+    latencies = {}
+    for access_log in (False, True):
+        application.ACCESS_LOG = access_log
+        samples = []
+        for _ in range(args.requests):
+            start = time.perf_counter_ns()
+            client.post("/predict_batch", json=payload)
+            samples.append(time.perf_counter_ns() - start)
+        latencies[access_log] = samples
+
+    flush_start = time.perf_counter()
+    log_module._stop_listener()
+    flush_s = time.perf_counter() - flush_start
+
+    print(json.dumps({
+        "call_p50_us": _percentile(calls, 0.5) / 1000,
+        "call_p99_us": _percentile(calls, 0.99) / 1000,
+        "request_p50_ms": _percentile(latencies[False], 0.5) / 1e6,
+        "request_access_p50_ms": _percentile(latencies[True], 0.5) / 1e6,
+        "request_access_p99_ms": _percentile(latencies[True], 0.99) / 1e6,
+        "flush_s": flush_s,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--sink-delay-ms", type=float, default=0.0,
+                        help="sleep before every file write to simulate a slow disk")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args)
+        return
+
+    print(f"{'mode':<12} {'info() p50 us':>14} {'p99 us':>8} {'req p50 ms':>11} "
+          f"{'+access p50':>12} {'p99 ms':>8} {'exit flush s':>13}")
+    for mode, log_format in CASES:
+        env = dict(os.environ, LOG_MODE=mode, LOG_FORMAT=log_format)
+        command = [sys.executable, "-m", "benchmarks.logging_benchmark", "--child",
+                   "--calls", str(args.calls), "--requests", str(args.requests),
+                   "--sink-delay-ms", str(args.sink_delay_ms)]
+        output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode + '/' + log_format:<12} {result['call_p50_us']:>14.1f} {result['call_p99_us']:>8.1f} "
+              f"{result['request_p50_ms']:>11.2f} {result['request_access_p50_ms']:>12.2f} "
+              f"{result['request_access_p99_ms']:>8.2f} {result['flush_s']:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Hot-path cost of the serving metrics (src/metrics.py)
+
+    python -m benchmarks.metrics_benchmark
+
+Times counter.inc() and histogram.observe() per call, single-threaded and from several threads
+at once, next to an empty function call, and compares the per-request overhead of the app's
+instrumentation with the /predict_batch latency measured through the Flask test client.
+"""
+import argparse
+import threading
+import time
+from src.metrics import MetricsRegistry
+
+
+def _ns_per_call(fn, n):
+    start = time.perf_counter_ns()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter_ns() - start) / n
+
+
+def _threaded_ns_per_call(fn, n, n_threads):
+    barrier = threading.Barrier(n_threads + 1)
+
+    def worker():
+        barrier.wait()
+        for i in range(n):
+            fn(i)
+
+    threads = [threading.Thread(target=worker) for _ in range(n_threads)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter_ns()
+    for t in threads:
+        t.join()
+    return (time.perf_counter_ns() - start) / (n * n_threads)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "", ["route", "status"])
+    histogram = registry.histogram("latency_ms", "", ["route", "phase"])
+
+    def noop(i):
+        pass
+
+    def inc(i):
+        counter.labels("/predict_batch", "200").inc()
+
+    def observe(i):
+        histogram.labels("/predict_batch", "predict").observe(i % 1000 / 10)
+
+    cases = [("empty function call", noop), ("counter.labels().inc()", inc),
+             ("histogram.labels().observe()", observe)]
+    print(f"{'operation':<32} {'ns/call':>8} {f'ns/call x{args.threads} threads':>22}")
+    for name, fn in cases:
+        print(f"{name:<32} {_ns_per_call(fn, args.calls):>8.0f} "
+              f"{_threaded_ns_per_call(fn, args.calls // args.threads, args.threads):>22.0f}")
+
+    expected = args.calls + (args.calls // args.threads) * args.threads
+    assert counter.labels("/predict_batch", "200").value() == expected, "lost counter increments"
+
+    # One request records 1 request histogram, 3 phase histograms and 1 counter
+    per_request_ns = _ns_per_call(inc, args.calls // 10) + 4 * _ns_per_call(observe, args.calls // 10)
+
+    import application
+    application.model_registry.warm_up()
+    client = application.app.test_client()
+    payload = {"bookings": [[10, 1, 100.5, 5, 3, 4, 2, 1, 0, 0]]}
+    latencies = []
+    for _ in range(args.requests):
+        start = time.perf_counter_ns()
+        client.post("/predict_batch", json=payload)
+        latencies.append(time.perf_counter_ns() - start)
+    median_ns = sorted(latencies)[len(latencies) // 2]
+
+    print(f"\ninstrumentation per request: {per_request_ns / 1000:.1f} us; "
+          f"median /predict_batch request: {median_ns / 1000:.0f} us "
+          f"({100 * per_request_ns / median_ns:.2f}% overhead)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""End-to-end scaling benchmark: every pipeline stage and the serving path at 1x/10x/100x data
+
+    python -m benchmarks.pipeline_benchmark --scales 1 10 100
+    python -m benchmarks.pipeline_benchmark --scales 1 --set data_processing.feature_selection.method=lgbm_gain
+    python -m benchmarks.pipeline_benchmark --compare old.json new.json
+
+Each scale runs in its own interpreter with ARTIFACTS_DIR pointing at a scratch directory and
+the local storage backend standing in for the GCS bucket, so nothing touches the project's
+artifacts or the network. Scale 1 is the size of the public dataset (BASE_ROWS). The JSON report
+records wall/CPU time, peak RSS growth and rows in/out per stage, plus serving latency
+percentiles, and is written to artifacts/benchmarks/pipeline_<commit>.json by default.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import yaml
+from config.paths_config import PROJECT_ROOT, CONFIG_PATH, ARTIFACTS_DIR
+from utils.common_functions import read_yaml
+from src.profiling import profiler
+from benchmarks.synthetic_data import generate_reservations, BASE_ROWS
+
+
+def _set(config, assignment):
+    key, value = assignment.split("=", 1)
+    *parents, leaf = key.split(".")
+    node = config
+    for part in parents:
+        node = node.setdefault(part, {})
+    node[leaf] = yaml.safe_load(value)
+
+
+def _percentiles(samples_ms):
+    samples = np.asarray(samples_ms)
+    return {f"p{q}": float(np.percentile(samples, q)) for q in (50, 90, 99)} | {"mean": float(samples.mean())}
+
+
+def _form_rows(raw_test, preprocessor, n):
+    """Encoded rows in the web form's column order, taken from real held-out bookings"""
+    from src.batch_scoring import FEATURE_COLUMNS
+    sample = raw_test.sample(n=min(n, len(raw_test)), replace=len(raw_test) < n, random_state=0)
+    columns = []
+    for col in FEATURE_COLUMNS:
+        mapping = preprocessor.category_maps.get(col)
+        values = sample[col].astype(str).map(mapping) if mapping else sample[col]
+        columns.append(values.to_numpy(dtype=np.float64))
+    return np.column_stack(columns)
+
+
+def serving_latency(raw_test, n_requests, batch_size):
+    """Per-request latency of the form endpoint and throughput of /predict_batch, in-process"""
+    from src.batch_scoring import FEATURE_COLUMNS, FORM_FIELDS
+    from src.preprocessor import BookingPreprocessor
+    from config.paths_config import PREPROCESSOR_PATH
+    import application
+
+    application.model_registry.warm_up()
+    client = application.app.test_client()
+    rows = _form_rows(raw_test, BookingPreprocessor.load(PREPROCESSOR_PATH), n_requests)
+    form_names = [FORM_FIELDS.get(c, c) for c in FEATURE_COLUMNS]
+
+    single_ms = []
+    for row in rows:
+        form = {name: str(int(v)) if name != "avg_price_per_room" else str(v) for name, v in zip(form_names, row)}
+        start = time.perf_counter()
+        client.post("/", data=form)
+        single_ms.append((time.perf_counter() - start) * 1000)
+
+    batch = np.resize(rows, (batch_size, rows.shape[1])).tolist()
+    batch_ms = []
+    for _ in range(5):
+        start = time.perf_counter()
+        client.post("/predict_batch", json={"bookings": batch})
+        batch_ms.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "form_request_ms": _percentiles(single_ms),
+        "batch_request_ms": _percentiles(batch_ms),
+        "batch_size": batch_size,
+        "batch_rows_per_s": batch_size / (float(np.median(batch_ms)) / 1000),
+    }
+
+
+def run_scale(scale, overrides, n_requests, batch_size):
+    """Runs in the child process, with ARTIFACTS_DIR already pointing at a scratch directory"""
+    from src.data_ingestion import DataIngestion
+    from src.data_preprocessing import DataProcessor
+    from src.model_training import ModelTraining
+    from config.paths_config import (TRAIN_FILE_PATH, TEST_FILE_PATH, PROCESSED_DIR,
+                                     PROCESSED_TRAIN_DATA_PATH, PROCESSED_TEST_DATA_PATH, MODEL_OUTPUT_PATH)
+    from utils.common_functions import load_data
+
+    config = read_yaml(CONFIG_PATH)
+    for assignment in overrides:
+        _set(config, assignment)
+    bucket_dir = os.path.join(ARTIFACTS_DIR, "bucket")
+    os.makedirs(bucket_dir, exist_ok=True)
+    config["data_ingestion"].update(storage_backend="local", local_dir=bucket_dir)
+    config_path = os.path.join(ARTIFACTS_DIR, "config.yaml")
+    with open(config_path, "w") as f:
+        yaml.safe_dump(config, f)
+
+    n_rows = int(round(scale * BASE_ROWS))
+    with profiler.stage("generate"):
+        df = generate_reservations(n_rows)
+        profiler.annotate(data_out=df)
+    expected = set(config["data_processing"]["categorical_columns"] + config["data_processing"]["numerical_columns"])
+    missing = expected - set(df.columns)
+    if missing:
+        raise ValueError(f"Synthetic data lacks configured columns {sorted(missing)}")
+    df.to_csv(os.path.join(bucket_dir, config["data_ingestion"]["bucket_file_name"]), index=False)
+    del df
+
+    ingestion = DataIngestion(config)
+    ingestion.download_csv_from_gcp()
+    ingestion.split_data()
+
+    processor = DataProcessor(TRAIN_FILE_PATH, TEST_FILE_PATH, PROCESSED_DIR, config_path)
+    train_df, test_df = load_data(TRAIN_FILE_PATH), load_data(TEST_FILE_PATH)
+    raw_test = test_df.copy()
+    train_df = processor.preprocess_data(train_df, fit=True)
+    test_df = processor.preprocess_data(test_df)
+    train_df = processor.balance_data(train_df)
+    train_df = processor.select_features(train_df)
+    test_df = test_df.reindex(columns=train_df.columns, fill_value=0)
+    processor.preprocessor.set_feature_order([c for c in train_df.columns if c != "booking_status"])
+    processor.preprocessor.save(processor.preprocessor_path)
+    processor.save_data(train_df, PROCESSED_TRAIN_DATA_PATH)
+    processor.save_data(test_df, PROCESSED_TEST_DATA_PATH)
+    del train_df, test_df
+
+    trainer = ModelTraining(PROCESSED_TRAIN_DATA_PATH, PROCESSED_TEST_DATA_PATH, MODEL_OUTPUT_PATH,
+                            config_path=config_path)
+    # Every stage method is instrumented by src.profiling, which collects the per-stage records
+    X_train, y_train, X_test, y_test = trainer.load_and_split_data()
+    model = trainer.train_lgbm(X_train, y_train)
+    metrics = trainer.evaluate_model(model, X_test, y_test)
+    trainer.save_model(model)
+    trainer.export_tree_model(model, X_test)
+    stages = list(profiler.records)
+
+    return {
+        "scale": scale,
+        "rows": n_rows,
+        "stages": stages,
+        "serving": serving_latency(raw_test, n_requests, batch_size),
+        "model_metrics": metrics,
+        # Each stage resets the high-water mark, so the run's peak is the largest stage peak
+        "peak_rss_mb": max(s["peak_rss_mb"] for s in stages),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(old_path, new_path):
+    """Print new/old ratios of stage wall time and peak RSS for scales present in both reports"""
+    with open(old_path) as f:
+        old = {r["scale"]: r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = {r["scale"]: r for r in json.load(f)["results"]}
+
+    print(f"{'scale':>6} {'stage':<24} {'old s':>8} {'new s':>8} {'ratio':>6} {'old MB':>8} {'new MB':>8}")
+    for scale in sorted(set(old) & set(new)):
+        old_stages = {s["stage"]: s for s in old[scale]["stages"]}
+        for s in new[scale]["stages"]:
+            o = old_stages.get(s["stage"])
+            if o is None:
+                continue
+            ratio = s["wall_s"] / o["wall_s"] if o["wall_s"] else float("nan")
+            print(f"{scale:>6} {s['stage']:<24} {o['wall_s']:>8.2f} {s['wall_s']:>8.2f} {ratio:>6.2f} "
+                  f"{o['peak_rss_delta_mb']:>8.1f} {s['peak_rss_delta_mb']:>8.1f}")
+        old_p99 = old[scale]["serving"]["form_request_ms"]["p99"]
+        new_p99 = new[scale]["serving"]["form_request_ms"]["p99"]
+        print(f"{scale:>6} {'form p99 ms':<24} {old_p99:>8.2f} {new_p99:>8.2f} {new_p99 / old_p99:>6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--set", dest="overrides", action="append", default=[],
+                        help="config.yaml override, e.g. data_processing.balancing.method=class_weight")
+    parser.add_argument("--requests", type=int, default=500, help="single-row form requests for latency")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--output")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch artifact directories")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--run", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    if args.run is not None:
+        print(json.dumps(run_scale(args.run, args.overrides, args.requests, args.batch_size)))
+        return
+
+    commit = _git_commit()
+    report = {"commit": commit, "created": time.time(), "python": platform.python_version(),
+              "machine": platform.machine(), "cpu_count": os.cpu_count(), "overrides": args.overrides,
+              "results": []}
+
+    for scale in args.scales:
+        workdir = tempfile.mkdtemp(prefix=f"pipeline_bench_{scale:g}x_")
+        try:
+            command = [sys.executable, "-m", "benchmarks.pipeline_benchmark", "--run", str(scale),
+                       "--requests", str(args.requests), "--batch-size", str(args.batch_size)]
+            for assignment in args.overrides:
+                command += ["--set", assignment]
+            # The child's cwd is the scratch dir so logs/ and mlruns/ stay out of the project
+            child = subprocess.run(command, cwd=workdir, capture_output=True, text=True,
+                                   env={**os.environ, "ARTIFACTS_DIR": workdir,
+                                        "PYTHONPATH": os.pathsep.join(filter(None, [PROJECT_ROOT,
+                                                                               os.environ.get("PYTHONPATH")]))})
+            if child.returncode != 0:
+                sys.stderr.write(child.stderr[-4000:])
+                raise RuntimeError(f"Benchmark at scale {scale:g}x failed")
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            report["results"].append(result)
+        finally:
+            if not args.keep:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        print(f"\n{scale:g}x = {result['rows']} rows, peak RSS {result['peak_rss_mb']:.0f} MB")
+        print(f"{'stage':<24} {'wall s':>8} {'cpu s':>8} {'peak RSS +MB':>13} {'rows in':>10} {'rows out':>10}")
+        for s in result["stages"]:
+            rows_in = s["rows_in"] if s["rows_in"] is not None else ""
+            rows_out = s["rows_out"] if s["rows_out"] is not None else ""
+            print(f"{s['stage']:<24} {s['wall_s']:>8.2f} {s['cpu_s']:>8.2f} {s['peak_rss_delta_mb']:>13.1f} "
+                  f"{rows_in:>10} {rows_out:>10}")
+        form = result["serving"]["form_request_ms"]
+        print(f"form request ms p50 {form['p50']:.2f} p90 {form['p90']:.2f} p99 {form['p99']:.2f}; "
+              f"/predict_batch {result['serving']['batch_rows_per_s']:.0f} rows/s")
+
+    output = args.output or os.path.join(ARTIFACTS_DIR, "benchmarks", f"pipeline_{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Transform throughput of the fitted BookingPreprocessor vs refitting LabelEncoders per call
+
+    python -m benchmarks.preprocessor_benchmark
+
+Also compares preprocessing_mode default and compact: transform time and bytes per row of the
+encoded frame, then SMOTE and the random-forest feature ranking on each frame.
+"""
+import time
+import numpy as np
+from imblearn.over_sampling import SMOTE
+from sklearn.preprocessing import LabelEncoder
+from config.paths_config import CONFIG_PATH
+from src.preprocessor import BookingPreprocessor
+from src.feature_selection import rank_features
+from utils.common_functions import read_yaml
+from benchmarks.synthetic_data import generate_reservations
+
+ROW_COUNTS = [1, 1_000, 100_000, 1_000_000]
+DOWNSTREAM_ROWS = 100_000
+
+
+def legacy_preprocess(df, cat_cols, num_cols, skew_threshold):
+    """What DataProcessor.preprocess_data did before the fitted preprocessor"""
+    df = df.copy()
+    label_encoder = LabelEncoder()
+    for col in cat_cols:
+        if col in df.columns:
+            df[col] = label_encoder.fit_transform(df[col].astype(str))
+    skewness = df[num_cols].apply(lambda x: x.skew())
+    for column in skewness[skewness > skew_threshold].index:
+        df[column] = np.log1p(df[column])
+    return df
+
+
+def best_of(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bytes_per_row(df):
+    return df.memory_usage(index=False, deep=True).sum() / len(df)
+
+
+def compare_modes(data, cat_cols, num_cols, skew_threshold):
+    """Encoded frame size and the time of each step that consumes it, per preprocessing_mode"""
+    print(f"\n{'mode':<8} {'transform s':>12} {'bytes/row':>10} {'smote s':>8} {'smote bytes/row':>16} "
+          f"{'rank s':>7}  (transform on {len(data)} rows, downstream on {DOWNSTREAM_ROWS})")
+    for mode in ("default", "compact"):
+        preprocessor = BookingPreprocessor(cat_cols, num_cols, skew_threshold,
+                                           compact_dtypes=mode == "compact").fit(data.head(100_000))
+        transform_s = best_of(lambda: preprocessor.transform(data), 3)
+        encoded = preprocessor.transform(data)
+
+        sample = encoded.head(DOWNSTREAM_ROWS)
+        X, y = sample.drop(columns="booking_status"), sample["booking_status"]
+        start = time.perf_counter()
+        X_resampled, y_resampled = SMOTE(random_state=42).fit_resample(X, y)
+        smote_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rank_features(X_resampled, y_resampled, method="random_forest", n_jobs=-1)
+        rank_s = time.perf_counter() - start
+
+        print(f"{mode:<8} {transform_s:>12.3f} {bytes_per_row(encoded):>10.1f} {smote_s:>8.2f} "
+              f"{bytes_per_row(X_resampled):>16.1f} {rank_s:>7.2f}")
+
+
+def main():
+    config = read_yaml(CONFIG_PATH)["data_processing"]
+    cat_cols, num_cols = config["categorical_columns"], config["numerical_columns"]
+
+    data = generate_reservations(max(ROW_COUNTS)).drop(columns=["Booking_ID"])
+
+    preprocessor = BookingPreprocessor(cat_cols, num_cols, config["skewness_threshold"])
+    fit_s = best_of(lambda: preprocessor.fit(data.head(100_000)), 1)
+    features = [c for c in data.columns if c != "booking_status"][:config["no_of_features"]]
+    preprocessor.set_feature_order(features)
+    print(f"fit on 100000 rows : {fit_s * 1000:.1f} ms, log1p columns {preprocessor.log1p_columns}")
+
+    print(f"{'rows':>9} {'legacy rows/s':>14} {'transform rows/s':>17} {'model input rows/s':>19}")
+    for n_rows in ROW_COUNTS:
+        df = data.head(n_rows)
+        repeats = 20 if n_rows <= 1_000 else 3
+        legacy_s = best_of(lambda: legacy_preprocess(df, cat_cols, num_cols, config["skewness_threshold"]), repeats)
+        transform_s = best_of(lambda: preprocessor.transform(df), repeats)
+        model_input_s = best_of(lambda: preprocessor.to_model_input(df), repeats)
+        print(f"{n_rows:>9} {n_rows / legacy_s:>14,.0f} {n_rows / transform_s:>17,.0f} {n_rows / model_input_s:>19,.0f}")
+
+    compare_modes(data, cat_cols, num_cols, config["skewness_threshold"])
+
+
+if __name__ == "__main__":
+    main()
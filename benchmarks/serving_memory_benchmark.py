@@ -0,0 +1,116 @@
+"""Memory per gunicorn worker for the pickle and tree-table models, with and without preloading
+
+    python -m benchmarks.serving_memory_benchmark --workers 1 2 4
+
+For each setup gunicorn is started from gunicorn.conf.py, every worker serves some requests, and
+the workers' /proc/<pid>/smaps_rollup is read. USS (private pages) is what each extra worker
+really costs; PSS splits shared pages evenly between the processes mapping them.
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from config.paths_config import PROJECT_ROOT
+
+BOOKING = [10, 1, 100.5, 5, 3, 4, 2, 1, 0, 0]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _smaps_mb(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {"rss": values["Rss"], "pss": values["Pss"],
+            "uss": values["Private_Clean"] + values["Private_Dirty"]}
+
+
+def _children(pid):
+    children = []
+    for tid in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{tid}/children") as f:
+            children += [int(c) for c in f.read().split()]
+    return children
+
+
+def _post(port, path, payload):
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=json.dumps(payload).encode(),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.read()
+
+
+def measure(model_format, workers, preload, requests=200):
+    port = _free_port()
+    env = {**os.environ, "PORT": str(port), "WEB_CONCURRENCY": str(workers), "MODEL_FORMAT": model_format,
+           "GUNICORN_PRELOAD": "1" if preload else "0"}
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+                              cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 60
+        while True:
+            try:
+                _post(port, "/predict_batch", {"bookings": [BOOKING]})
+                break
+            except OSError:
+                if time.time() > deadline or server.poll() is not None:
+                    raise RuntimeError(f"gunicorn did not start for {model_format} with {workers} workers")
+                time.sleep(0.2)
+
+        # Requests are spread over the workers by the kernel, so enough of them reach every worker
+        for _ in range(requests):
+            _post(port, "/predict_batch", {"bookings": [BOOKING] * 16})
+
+        worker_mem = [_smaps_mb(pid) for pid in _children(server.pid)]
+        return {
+            "model_format": model_format,
+            "preload": preload,
+            "workers": len(worker_mem),
+            "uss_per_worker_mb": sum(m["uss"] for m in worker_mem) / len(worker_mem),
+            "pss_per_worker_mb": sum(m["pss"] for m in worker_mem) / len(worker_mem),
+            "rss_per_worker_mb": sum(m["rss"] for m in worker_mem) / len(worker_mem),
+            "total_pss_mb": sum(m["pss"] for m in worker_mem) + _smaps_mb(server.pid)["pss"],
+        }
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--formats", nargs="+", default=["pickle", "tree_tables"])
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'model':>12} {'preload':>8} {'workers':>8} {'USS/worker':>11} {'PSS/worker':>11} "
+          f"{'RSS/worker':>11} {'total PSS':>10}")
+    for model_format in args.formats:
+        for preload in (False, True):
+            for workers in args.workers:
+                r = measure(model_format, workers, preload)
+                results.append(r)
+                print(f"{r['model_format']:>12} {str(r['preload']):>8} {r['workers']:>8} "
+                      f"{r['uss_per_worker_mb']:>11.1f} {r['pss_per_worker_mb']:>11.1f} "
+                      f"{r['rss_per_worker_mb']:>11.1f} {r['total_pss_mb']:>10.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Peak RSS and time to get a constructed lgb.Dataset from a processed training artifact
+
+    python -m benchmarks.streaming_dataset_benchmark --rows 2000000 --format csv
+
+Compares the in-memory path of ModelTraining (load_data, drop, lgb.Dataset) with
+StreamingDatasetBuilder building from chunks and reloading its saved binary Dataset. The
+artifact is written once; each path then runs in a fresh interpreter.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+MODES = ["in_memory", "streaming_cold", "streaming_binary"]
+
+
+def _processed_frame(n_rows, seed=42):
+    # Ten selected features plus the label, with the value ranges of the processed artifacts
+    from benchmarks.synthetic_data import generate_reservations
+    df = generate_reservations(n_rows, seed=seed)
+    features = df.drop(columns=["Booking_ID", "booking_status"]).select_dtypes("number").iloc[:, :10]
+    features["booking_status"] = (df["booking_status"] == "Canceled").astype(np.int64)
+    return features
+
+
+def run_once(mode, path, cache_dir):
+    """Runs in the child process: build one Dataset, report time and RSS"""
+    import lightgbm as lgb
+    from utils.common_functions import load_data, peak_rss_mb
+    from src.streaming_dataset import StreamingDatasetBuilder, DEFAULT_DATASET_PARAMS
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "in_memory":
+        df = load_data(path)
+        X, y = df.drop(columns=["booking_status"]), df["booking_status"]
+        dataset = lgb.Dataset(X, label=y, params=DEFAULT_DATASET_PARAMS, free_raw_data=False).construct()
+    else:
+        dataset = StreamingDatasetBuilder(cache_dir).build(path)
+
+    print(json.dumps({"seconds": time.perf_counter() - start, "rows": dataset.num_data(),
+                      "peak_rss_delta_mb": peak_rss_mb() - baseline}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--format", default="csv", choices=["csv", "parquet", "feather", "npy"])
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    parser.add_argument("--data", help=argparse.SUPPRESS)
+    parser.add_argument("--cache-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_once(args.run, args.data, args.cache_dir)
+        return
+
+    from utils.common_functions import write_data
+
+    tmp = tempfile.mkdtemp(prefix="streaming_dataset_bench_")
+    try:
+        path = os.path.join(tmp, f"processed_train.{args.format}")
+        df = _processed_frame(args.rows)
+        write_data(df, path)
+        in_memory_mb = df.memory_usage(deep=True).sum() / 2**20
+        del df
+        print(f"{args.rows} rows as {args.format}, {in_memory_mb:.0f} MB as a DataFrame")
+
+        print(f"{'mode':>18} {'seconds':>8} {'peak RSS MB':>12}")
+        for mode in MODES:
+            child = subprocess.run([sys.executable, "-m", "benchmarks.streaming_dataset_benchmark", "--run", mode,
+                                    "--data", path, "--cache-dir", os.path.join(tmp, "cache")],
+                                   capture_output=True, text=True, check=True)
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            print(f"{mode:>18} {result['seconds']:>8.2f} {result['peak_rss_delta_mb']:>12.1f}")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Synthetic bookings shaped like Hotel_Reservations.csv
+
+    python -m benchmarks.synthetic_data --rows 36275 --output artifacts/raw/raw.csv
+"""
+import argparse
+import numpy as np
+import pandas as pd
+
+MEAL_PLANS = ["Meal Plan 1", "Not Selected", "Meal Plan 2", "Meal Plan 3"]
+MEAL_PLAN_P = [0.767, 0.141, 0.091, 0.001]
+
+ROOM_TYPES = [f"Room_Type {i}" for i in range(1, 8)]
+ROOM_TYPE_P = [0.776, 0.0002, 0.167, 0.019, 0.027, 0.0073, 0.0035]
+
+MARKET_SEGMENTS = ["Online", "Offline", "Corporate", "Complimentary", "Aviation"]
+MARKET_SEGMENT_P = [0.64, 0.29, 0.056, 0.011, 0.003]
+
+# Size of the public Hotel_Reservations dataset, i.e. the "1x" scale
+BASE_ROWS = 36275
+
+
+def _normalized(p):
+    p = np.asarray(p, dtype=np.float64)
+    return p / p.sum()
+
+
+def generate_reservations(n_rows, seed=42):
+    """Random bookings with the raw dataset's columns, value ranges and a plausible cancellation signal"""
+    rng = np.random.default_rng(seed)
+
+    market_segment = rng.choice(MARKET_SEGMENTS, n_rows, p=_normalized(MARKET_SEGMENT_P))
+    repeated_guest = (rng.random(n_rows) < 0.026).astype(np.int64)
+
+    lead_time = np.minimum(rng.gamma(0.9, 95, n_rows).astype(np.int64), 443)
+    no_of_special_requests = np.minimum(rng.poisson(0.62, n_rows), 5)
+    avg_price_per_room = np.round(np.clip(rng.normal(103.4, 35.1, n_rows), 0, 540), 2)
+    avg_price_per_room[market_segment == "Complimentary"] = 0.0
+
+    arrival_year = np.where(rng.random(n_rows) < 0.82, 2018, 2017)
+    arrival_month = rng.integers(1, 13, n_rows)
+    arrival_date = rng.integers(1, 32, n_rows)
+
+    no_of_previous_cancellations = np.where(repeated_guest == 1, rng.poisson(0.4, n_rows), 0)
+    no_of_previous_bookings_not_canceled = np.where(repeated_guest == 1, rng.poisson(3.0, n_rows), 0)
+
+    # Cancellation odds rise with lead time and price and fall with special requests
+    logit = (-1.6 + 0.012 * lead_time - 0.9 * no_of_special_requests + 0.011 * (avg_price_per_room - 100)
+             + 0.8 * (market_segment == "Online") - 2.5 * repeated_guest)
+    canceled = rng.random(n_rows) < 1 / (1 + np.exp(-logit))
+
+    return pd.DataFrame({
+        "Booking_ID": [f"INN{i:08d}" for i in range(1, n_rows + 1)],
+        "no_of_adults": rng.choice([0, 1, 2, 3, 4], n_rows, p=[0.004, 0.212, 0.72, 0.063, 0.001]),
+        "no_of_children": np.minimum(rng.poisson(0.1, n_rows), 10),
+        "no_of_weekend_nights": np.minimum(rng.poisson(0.81, n_rows), 7),
+        "no_of_week_nights": np.minimum(rng.poisson(2.2, n_rows), 17),
+        "type_of_meal_plan": rng.choice(MEAL_PLANS, n_rows, p=_normalized(MEAL_PLAN_P)),
+        "required_car_parking_space": (rng.random(n_rows) < 0.031).astype(np.int64),
+        "room_type_reserved": rng.choice(ROOM_TYPES, n_rows, p=_normalized(ROOM_TYPE_P)),
+        "lead_time": lead_time,
+        "arrival_year": arrival_year,
+        "arrival_month": arrival_month,
+        "arrival_date": arrival_date,
+        "market_segment_type": market_segment,
+        "repeated_guest": repeated_guest,
+        "no_of_previous_cancellations": no_of_previous_cancellations,
+        "no_of_previous_bookings_not_canceled": no_of_previous_bookings_not_canceled,
+        "avg_price_per_room": avg_price_per_room,
+        "no_of_special_requests": no_of_special_requests,
+        "booking_status": np.where(canceled, "Canceled", "Not_Canceled"),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic Hotel_Reservations-shaped data")
+    parser.add_argument("--rows", type=int, default=BASE_ROWS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    generate_reservations(args.rows, args.seed).to_csv(args.output, index=False)
+    print(f"Wrote {args.rows} rows to {args.output}")
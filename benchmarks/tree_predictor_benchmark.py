@@ -0,0 +1,75 @@
+"""Parity and latency of the NumPy tree tables vs the LightGBM pickle
+
+    python -m benchmarks.tree_predictor_benchmark
+
+Uses artifacts/models/lgbm_model.pkl when it exists, otherwise trains a model
+on random data in the 10-feature serving layout.
+"""
+import os
+import tempfile
+import time
+import joblib
+import numpy as np
+import lightgbm as lgb
+from config.paths_config import MODEL_OUTPUT_PATH
+from src.tree_predictor import TreeEnsemblePredictor
+
+FEATURE_SCALE = np.array([400, 5, 300, 12, 31, 5, 10, 5, 4, 7], dtype=np.float64)
+ROW_COUNTS = [1, 100, 100_000]
+
+
+def random_features(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.floor(rng.random((n_rows, len(FEATURE_SCALE))) * FEATURE_SCALE)
+    X[:, 2] = np.round(rng.gamma(4, 25, n_rows), 2)
+    return X
+
+
+def load_or_train_model():
+    if os.path.exists(MODEL_OUTPUT_PATH):
+        return joblib.load(MODEL_OUTPUT_PATH), "artifacts"
+
+    X = random_features(20_000, seed=1)
+    y = ((X[:, 0] > 150) ^ (X[:, 1] > 2) | (X[:, 2] > 160)).astype(int)
+    model = lgb.LGBMClassifier(n_estimators=300, num_leaves=63, verbose=-1, random_state=42)
+    return model.fit(X, y), "synthetic"
+
+
+def best_of(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    model, source = load_or_train_model()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        TreeEnsemblePredictor.from_model(model).save(tmp)
+        tree_model = TreeEnsemblePredictor.load(tmp)
+
+    X = random_features(max(ROW_COUNTS), seed=2)
+    X[::97, 0] = np.nan
+
+    max_diff = np.abs(model.predict_proba(X)[:, 1] - tree_model.predict_proba(X)[:, 1]).max()
+    label_mismatches = int((model.predict(X) != tree_model.predict(X)).sum())
+
+    print(f"model source            : {source} ({len(tree_model.roots)} trees, {len(tree_model.feature)} nodes)")
+    print(f"max |proba diff|        : {max_diff:.3e}")
+    print(f"label mismatches        : {label_mismatches} / {len(X)}")
+    assert max_diff < 1e-9 and label_mismatches == 0, "tree tables disagree with LightGBM"
+
+    print(f"{'rows':>8} {'lightgbm ms':>12} {'tree tables ms':>15} {'speedup':>8}")
+    for n_rows in ROW_COUNTS:
+        batch = X[:n_rows]
+        repeats = 200 if n_rows == 1 else 20 if n_rows == 100 else 3
+        lgbm_ms = best_of(lambda: model.predict_proba(batch), repeats)
+        tree_ms = best_of(lambda: tree_model.predict_proba(batch), repeats)
+        print(f"{n_rows:>8} {lgbm_ms:>12.3f} {tree_ms:>15.3f} {lgbm_ms / tree_ms:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
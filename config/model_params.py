@@ -16,4 +16,20 @@ RANDOM_SEARCH_PARAMS = {
     'verbose' :2,
     'random_state' : 42,
     'scoring' : 'accuracy'
-}
\ No newline at end of file
+}
+
+# "random_search" (RandomizedSearchCV) or "successive_halving"
+SEARCH_STRATEGY = "random_search"
+
+HALVING_SEARCH_PARAMS = {
+    'n_candidates' : 27,
+    'min_rounds' : 25,
+    'max_rounds' : 500,
+    'eta' : 3,
+    'cv' : 2,
+    'early_stopping_rounds' : 20,
+    'scoring' : 'accuracy',
+    'thread_budget' : None,      # None = all cores
+    'parallel_trials' : 2,       # each trial gets thread_budget // parallel_trials threads
+    'random_state' : 42
+}
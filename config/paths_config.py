@@ -1,30 +1,73 @@
 import os
+import yaml
 
 # Get project root (2 levels up from this file)
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
+CONFIG_PATH = os.path.join(PROJECT_ROOT, "config", "config.yaml")
+MODEL_PARAMS_PATH = os.path.join(PROJECT_ROOT, "config", "model_params.py")
+
+# Root of every generated artifact; the ARTIFACTS_DIR environment variable moves it elsewhere
+# (benchmarks run the pipeline in a scratch directory this way)
+ARTIFACTS_DIR = os.environ.get("ARTIFACTS_DIR", os.path.join(PROJECT_ROOT, "artifacts"))
+
+########################### ARTIFACT FORMAT #########################
+
+# Format of the intermediate train/test and processed artifacts (RAW_FILE_PATH stays CSV).
+# The ARTIFACT_FORMAT environment variable overrides artifacts.format in config.yaml.
+ARTIFACT_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather", "npy": ".npy"}
+
+with open(CONFIG_PATH) as _config_file:
+    _artifacts_config = (yaml.safe_load(_config_file) or {}).get("artifacts", {})
+
+ARTIFACT_FORMAT = os.environ.get("ARTIFACT_FORMAT", _artifacts_config.get("format", "csv"))
+if ARTIFACT_FORMAT not in ARTIFACT_EXTENSIONS:
+    raise ValueError(f"Unknown artifact format {ARTIFACT_FORMAT!r}, expected one of {list(ARTIFACT_EXTENSIONS)}")
+ARTIFACT_EXT = ARTIFACT_EXTENSIONS[ARTIFACT_FORMAT]
+
 ########################### DATA INGESTION #########################
 
-RAW_DIR = os.path.join(PROJECT_ROOT, "artifacts", "raw")
+RAW_DIR = os.path.join(ARTIFACTS_DIR, "raw")
 RAW_FILE_PATH = os.path.join(RAW_DIR, "raw.csv")
-TRAIN_FILE_PATH = os.path.join(RAW_DIR, "train.csv")
-TEST_FILE_PATH = os.path.join(RAW_DIR, "test.csv")
-
-CONFIG_PATH = os.path.join(PROJECT_ROOT, "config", "config.yaml")
+RAW_MANIFEST_PATH = os.path.join(RAW_DIR, "raw.manifest.json")
+# Per-class thresholds of the hash split, kept so appended rows never move existing bookings
+SPLIT_MANIFEST_PATH = os.path.join(RAW_DIR, "split.manifest.json")
+# Delta files for incremental refreshes, and which of them were applied to which model version
+DELTA_DIR = os.path.join(RAW_DIR, "deltas")
+DELTA_MANIFEST_PATH = os.path.join(DELTA_DIR, "applied.json")
+# New bookings of every applied delta; ingestion splits them together with raw.csv, which stays as downloaded
+APPENDED_ROWS_PATH = os.path.join(DELTA_DIR, "appended_rows.csv")
+TRAIN_FILE_PATH = os.path.join(RAW_DIR, f"train{ARTIFACT_EXT}")
+TEST_FILE_PATH = os.path.join(RAW_DIR, f"test{ARTIFACT_EXT}")
 
 ######################## DATA PROCESSING ########################
 
-PROCESSED_DIR = os.path.join(PROJECT_ROOT, "artifacts", "processed")
-PROCESSED_TRAIN_DATA_PATH = os.path.join(PROCESSED_DIR, "processed_train.csv")
-PROCESSED_TEST_DATA_PATH = os.path.join(PROCESSED_DIR, "processed_test.csv")
+PROCESSED_DIR = os.path.join(ARTIFACTS_DIR, "processed")
+PROCESSED_TRAIN_DATA_PATH = os.path.join(PROCESSED_DIR, f"processed_train{ARTIFACT_EXT}")
+PROCESSED_TEST_DATA_PATH = os.path.join(PROCESSED_DIR, f"processed_test{ARTIFACT_EXT}")
 
 ####################### MODEL TRAINING ########################
 
-MODEL_DIR = os.path.join(PROJECT_ROOT, "artifacts", "models")
+MODEL_DIR = os.path.join(ARTIFACTS_DIR, "models")
 MODEL_OUTPUT_PATH = os.path.join(MODEL_DIR, "lgbm_model.pkl")
+TREE_MODEL_OUTPUT_PATH = os.path.join(MODEL_DIR, "lgbm_trees")
+PREPROCESSOR_PATH = os.path.join(MODEL_DIR, "preprocessor.pkl")
+# Histograms of the processed training features and the model's predictions, for the serving drift monitor
+DRIFT_REFERENCE_PATH = os.path.join(MODEL_DIR, "drift_reference.json")
+
+####################### STAGE CACHE ########################
+
+CACHE_DIR = os.path.join(ARTIFACTS_DIR, "cache")
+# LightGBM binary Datasets from streaming training, keyed on the processed data and bin settings
+LGB_DATASET_DIR = os.path.join(CACHE_DIR, "lgb_dataset")
+
+####################### PROFILING ########################
+
+PROFILE_DIR = os.path.join(ARTIFACTS_DIR, "profiles")
+RUN_SUMMARY_PATH = os.path.join(PROFILE_DIR, "run_summary.json")
 
 ####################### ENSURE DIRECTORIES #####################
 
 # Create all directories safely
-for path in [RAW_DIR, PROCESSED_DIR, MODEL_DIR]:
+for path in [RAW_DIR, DELTA_DIR, PROCESSED_DIR, MODEL_DIR, CACHE_DIR]:
     os.makedirs(path, exist_ok=True)
@@ -0,0 +1,15 @@
+import os
+from config.paths_config import CONFIG_PATH
+from utils.common_functions import read_yaml
+
+serving_config = read_yaml(CONFIG_PATH)["serving"]
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", serving_config.get("workers", 2)))
+threads = int(serving_config.get("threads", 4))
+worker_class = "gthread"
+
+# Load the model in the master before forking (see wsgi.py); GUNICORN_PRELOAD=0 gives every
+# worker its own copy, which is only useful as a baseline for benchmarks/serving_memory_benchmark.py
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+timeout = 60
@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import time
+import mlflow
+from src.incremental_training import IncrementalTrainer, full_retrain_seconds, record_new_bookings
+from src.model_training import ModelTraining
+from src.storage import ChunkedDownloader, make_backend, file_md5
+from src.stage_cache import hash_path
+from src.profiling import profiler
+from src.logger import get_logger
+from utils.common_functions import read_yaml, load_data
+from pipeline.training_pipeline import run_pipeline
+from config.paths_config import *
+
+logger = get_logger(__name__)
+
+
+def fetch_delta(delta, config):
+    """Local path of the delta: the file itself if it exists, else downloaded from the configured bucket"""
+    if os.path.exists(delta):
+        return delta
+    ingestion_config = config["data_ingestion"]
+    download_config = ingestion_config.get("download", {})
+    downloader = ChunkedDownloader(make_backend(ingestion_config),
+                                   chunk_size=int(download_config.get("chunk_size_mb", 32) * 1024 * 1024),
+                                   max_workers=download_config.get("max_workers", 8))
+    dest = os.path.join(DELTA_DIR, os.path.basename(delta))
+    downloader.download(delta, dest, f"{dest}.manifest.json")
+    return dest
+
+
+def model_version():
+    return hash_path(MODEL_OUTPUT_PATH).hexdigest()[:12] if os.path.exists(MODEL_OUTPUT_PATH) else None
+
+
+def read_applied():
+    if not os.path.exists(DELTA_MANIFEST_PATH):
+        return {}
+    with open(DELTA_MANIFEST_PATH) as f:
+        return json.load(f)
+
+
+def record_applied(delta_md5, version):
+    applied = read_applied()
+    applied[delta_md5] = {"model_version": version, "applied_at": time.time()}
+    with open(DELTA_MANIFEST_PATH, "w") as f:
+        json.dump(applied, f, indent=2)
+
+
+def record_delta_rows(delta_path, chunk_rows=100000):
+    """Keep the delta's new bookings in APPENDED_ROWS_PATH, which ingestion splits together with raw.csv
+
+    raw.csv is left as downloaded, so the download skip and resume still see the bucket's copy.
+    """
+    return len(record_new_bookings(delta_path, RAW_FILE_PATH, APPENDED_ROWS_PATH, chunk_rows))
+
+
+def run_incremental(delta, force=False):
+    """Refresh the saved model with a delta; falls back to the full pipeline when it must"""
+    config = read_yaml(CONFIG_PATH)
+    delta_path = fetch_delta(delta, config)
+    delta_md5 = file_md5(delta_path)
+
+    version = model_version()
+    if version is None:
+        raise FileNotFoundError(f"No saved model at {MODEL_OUTPUT_PATH}; run training_pipeline.py first")
+    if not force and read_applied().get(delta_md5, {}).get("model_version") == version:
+        logger.info(f"{delta_path} was already applied to model version {version}, nothing to do")
+        return "skipped"
+
+    trainer = IncrementalTrainer(MODEL_OUTPUT_PATH, PREPROCESSOR_PATH, PROCESSED_TEST_DATA_PATH,
+                                 config.get("model_training", {}).get("incremental", {}))
+    reference_s = full_retrain_seconds(RUN_SUMMARY_PATH)
+
+    with mlflow.start_run(run_name="incremental_refresh"):
+        mlflow.log_param("delta_file", os.path.basename(delta_path))
+        mlflow.log_param("base_model_version", version)
+
+        refreshed = trainer.refresh(delta_path)
+        if refreshed is not None:
+            saver = ModelTraining(PROCESSED_TRAIN_DATA_PATH, PROCESSED_TEST_DATA_PATH, MODEL_OUTPUT_PATH)
+            test_df = load_data(PROCESSED_TEST_DATA_PATH)
+            # The prediction histogram changes with the model; the app reloads it when the model swaps
+            saver.build_drift_reference(refreshed)
+            saver.save_model(refreshed)
+            saver.export_tree_model(refreshed, test_df.drop(columns=["booking_status"]))
+            mlflow.log_artifact(MODEL_OUTPUT_PATH)
+
+            if reference_s is not None:
+                trainer.metrics["full_retrain_reference_s"] = reference_s
+                trainer.metrics["time_saved_s"] = reference_s - trainer.metrics["refresh_wall_s"]
+                logger.info(f"Refresh took {trainer.metrics['refresh_wall_s']:.1f}s, "
+                            f"last full retrain {reference_s:.1f}s")
+
+        mlflow.log_param("refresh_status", trainer.status)
+        if trainer.fallback_reason:
+            mlflow.log_param("fallback_reason", trainer.fallback_reason)
+        mlflow.log_metrics(trainer.metrics)
+        mlflow.log_metrics(profiler.metrics())
+
+    if trainer.status != "skipped":
+        # Refreshed or not, the model has now seen these rows, so every later full retrain must too
+        record_delta_rows(delta_path, config["data_ingestion"].get("split", {}).get("chunk_rows", 100000))
+    if trainer.status == "full_retrain":
+        print(run_pipeline(download=False))
+
+    if trainer.status != "skipped":
+        record_applied(delta_md5, model_version())
+    return trainer.status
+
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(description="Refresh the saved model with a delta of new bookings")
+    parser.add_argument("--delta", required=True, help="local CSV of new bookings, or its object name in the bucket")
+    parser.add_argument("--force", action="store_true", help="apply the delta even if it was applied to this model")
+    args = parser.parse_args()
+
+    print(run_incremental(args.delta, force=args.force))
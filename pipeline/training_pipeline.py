@@ -1,22 +1,98 @@
+import argparse
 from src.data_ingestion import DataIngestion
 from src.data_preprocessing import DataProcessor
 from src.model_training import ModelTraining
+from src.stage_cache import StageCache
+from src.profiling import profiler
+from src.logger import get_logger
 from utils.common_functions import read_yaml
 from config.paths_config import *
 
+logger = get_logger(__name__)
+
+STAGES = ["data_ingestion", "data_processing", "model_training"]
+
+
+def run_pipeline(force=False, invalidate=None, no_cache=False, profile_stages=(), download=True):
+    """Ingestion, processing and training with the stage cache; returns the cache report
+
+    download=False trains on the raw file already on disk (incremental_pipeline falls back to
+    a full retrain this way); the delta rows it recorded are split in either way.
+    """
+    config = read_yaml(CONFIG_PATH)
+    cache_config = config.get("pipeline", {}).get("stage_cache", {})
+    profiling_config = config.get("pipeline", {}).get("profiling", {})
+
+    profiler.configure(cprofile_stages=set(profiling_config.get("cprofile_stages") or []) | set(profile_stages),
+                       profile_dir=PROFILE_DIR)
+
+    cache = StageCache(
+        CACHE_DIR,
+        max_entries_per_stage=cache_config.get("max_entries_per_stage", 3),
+        max_age_days=cache_config.get("max_age_days"),
+        force=force,
+        enabled=cache_config.get("enabled", False) and not no_cache,
+        stages=STAGES
+    )
+    if invalidate is not None:
+        cache.invalidate(invalidate)
 
-if __name__=="__main__":
     ### 1. Data Ingestion
 
-    data_ingestion = DataIngestion(read_yaml(CONFIG_PATH))
-    data_ingestion.run()
+    data_ingestion = DataIngestion(config)
+    if download:
+        data_ingestion.download_csv_from_gcp()
+    cache.run(
+        "data_ingestion", data_ingestion.split_data,
+        inputs=[RAW_FILE_PATH] + data_ingestion.appended_paths(),
+        outputs=[TRAIN_FILE_PATH, TEST_FILE_PATH],
+        config={"data_ingestion": config["data_ingestion"], "artifacts": config.get("artifacts")}
+    )
 
     ### 2. Data Processing
 
     processor = DataProcessor(TRAIN_FILE_PATH,TEST_FILE_PATH,PROCESSED_DIR,CONFIG_PATH)
-    processor.process()
+    cache.run(
+        "data_processing", processor.process,
+        inputs=[TRAIN_FILE_PATH, TEST_FILE_PATH],
+        outputs=[PROCESSED_TRAIN_DATA_PATH, PROCESSED_TEST_DATA_PATH, PREPROCESSOR_PATH],
+        config={"data_processing": config["data_processing"], "artifacts": config.get("artifacts")}
+    )
 
     ### 3. Model Training
 
     trainer = ModelTraining(PROCESSED_TRAIN_DATA_PATH,PROCESSED_TEST_DATA_PATH,MODEL_OUTPUT_PATH)
-    trainer.run()
+    drift_config = config.get("serving", {}).get("drift", {})
+    cache.run(
+        "model_training", trainer.run,
+        inputs=[PROCESSED_TRAIN_DATA_PATH, PROCESSED_TEST_DATA_PATH],
+        outputs=[MODEL_OUTPUT_PATH, TREE_MODEL_OUTPUT_PATH]
+                + ([DRIFT_REFERENCE_PATH] if drift_config.get("enabled", False) else []),
+        # Drift settings only key the cache when the reference is built, so disabled runs keep their old keys
+        config={"model_training": config.get("model_training"),
+                **({"drift": drift_config} if drift_config.get("enabled", False) else {})},
+        extra_files=[MODEL_PARAMS_PATH]
+    )
+
+    # Stages restored from the cache have no DAG timings
+    dags = {runner.name: runner.summary() for runner in (processor.dag, trainer.dag) if runner is not None}
+    artifacts = trainer.artifacts.records if trainer.artifacts is not None else []
+    profiler.write_summary(RUN_SUMMARY_PATH, extra={"stage_cache": cache.report, "dag": dags, "artifacts": artifacts})
+    logger.info(f"Run summary written to {RUN_SUMMARY_PATH}")
+
+    summary = cache.summary()
+    logger.info(f"Stage cache report\n{summary}")
+    return summary
+
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(description="Hotel churn training pipeline")
+    parser.add_argument("--force", action="store_true", help="rerun every stage even if its cache entry matches")
+    parser.add_argument("--invalidate", nargs="*", choices=STAGES, help="drop cached entries (all stages if none given)")
+    parser.add_argument("--no-cache", action="store_true", help="run without the stage cache")
+    parser.add_argument("--profile-stage", nargs="+", default=[], metavar="STAGE",
+                        help="write a cProfile dump for these stage methods, e.g. train_lgbm")
+    args = parser.parse_args()
+
+    print(run_pipeline(force=args.force, invalidate=args.invalidate, no_cache=args.no_cache,
+                       profile_stages=args.profile_stage))
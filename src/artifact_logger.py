@@ -0,0 +1,146 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from mlflow.tracking import MlflowClient
+from src.logger import get_logger
+from src.custom_exception import CustomException
+from src.stage_cache import hash_path
+
+logger = get_logger(__name__)
+
+# Run tag recording which artifact in that run holds content with this hash
+HASH_TAG_PREFIX = "artifact_sha256."
+# Run tag pointing at the stored copy an artifact was deduplicated against
+REFERENCE_TAG_PREFIX = "artifact_ref."
+
+
+def _size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+    return os.path.getsize(path)
+
+
+class AsyncArtifactLogger:
+    """Uploads artifacts to an MLflow run on a worker thread, skipping content already stored
+
+    log_artifact() returns at once; hashing and uploading happen in the background while the
+    caller keeps training. An uploaded artifact tags its run with artifact_sha256.<hash>, so a
+    later run in the same experiment that would upload identical content finds that run instead
+    and logs a small <name>.ref.json (plus an artifact_ref.<path> tag) pointing at the stored
+    copy. wait() blocks until every upload is done and must be called before the run ends.
+    """
+
+    def __init__(self, run_id, client=None, dedup=True, background=True, max_workers=1):
+        self.run_id = run_id
+        self.client = client or MlflowClient()
+        self.dedup = dedup
+        self.background = background
+        self.experiment_id = self.client.get_run(run_id).info.experiment_id
+
+        self.records = []
+        self.wait_s = 0.0
+        self._futures = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="artifact-upload") \
+            if background else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Never leave the run with uploads in flight; an upload error must not mask the original one
+        try:
+            self.wait(raise_errors=exc_type is None)
+        finally:
+            self.close()
+
+    def log_artifact(self, path, artifact_path=None):
+        """Queue path (a file or directory) for upload under artifact_path; returns a Future of its record"""
+        if not self.background:
+            future = Future()
+            try:
+                future.set_result(self._upload(path, artifact_path))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            future = self._executor.submit(self._upload, path, artifact_path)
+        self._futures.append((path, future))
+        return future
+
+    def _stored_copy(self, digest):
+        """(run_id, artifact path) of a live run that already holds content with this hash, or None"""
+        tag = f"{HASH_TAG_PREFIX}{digest}"
+        runs = self.client.search_runs([self.experiment_id], filter_string=f"tags.`{tag}` != ''",
+                                       order_by=["attributes.start_time DESC"], max_results=5)
+        for run in runs:
+            stored = run.data.tags[tag]
+            parent = os.path.dirname(stored) or None
+            # The run may still exist after its artifacts were garbage-collected
+            if any(info.path == stored for info in self.client.list_artifacts(run.info.run_id, parent)):
+                return run.info.run_id, stored
+        return None
+
+    def _upload(self, path, artifact_path):
+        start = time.perf_counter()
+        name = os.path.basename(os.path.normpath(path))
+        stored_path = "/".join(p for p in (artifact_path, name) if p)
+        digest = hash_path(path).hexdigest()
+        record = {"path": path, "artifact": stored_path, "sha256": digest, "bytes": _size(path)}
+
+        stored = self._stored_copy(digest) if self.dedup else None
+        if stored is not None:
+            source_run_id, source_path = stored
+            uri = f"runs:/{source_run_id}/{source_path}"
+            self.client.log_dict(self.run_id, {"sha256": digest, "bytes": record["bytes"], "artifact_uri": uri,
+                                               "source_run_id": source_run_id}, f"{stored_path}.ref.json")
+            self.client.set_tag(self.run_id, f"{REFERENCE_TAG_PREFIX}{stored_path}", uri)
+            record.update(status="deduplicated", artifact_uri=uri)
+        else:
+            if os.path.isdir(path):
+                self.client.log_artifacts(self.run_id, path, artifact_path=stored_path)
+            else:
+                self.client.log_artifact(self.run_id, path, artifact_path=artifact_path)
+            self.client.set_tag(self.run_id, f"{HASH_TAG_PREFIX}{digest}", stored_path)
+            record.update(status="uploaded", artifact_uri=f"runs:/{self.run_id}/{stored_path}")
+
+        record["seconds"] = time.perf_counter() - start
+        with self._lock:
+            self.records.append(record)
+        logger.info(f"Artifact {stored_path} {record['status']} ({record['bytes']} bytes) in {record['seconds']:.2f}s")
+        return record
+
+    def wait(self, timeout=None, raise_errors=True):
+        """Block until queued uploads finish; returns their records and raises if any failed"""
+        start = time.perf_counter()
+        futures = [future for _, future in self._futures]
+        _, not_done = wait(futures, timeout=timeout)
+        self.wait_s += time.perf_counter() - start
+        if not_done:
+            raise CustomException(f"{len(not_done)} artifact uploads still running after {timeout}s", None)
+
+        failures = [(path, future.exception()) for path, future in self._futures if future.exception()]
+        self._futures = []
+        for path, error in failures:
+            logger.error(f"Uploading {path} to run {self.run_id} failed: {error}")
+        if failures and raise_errors:
+            raise CustomException(f"Failed to upload {failures[0][0]} to MLflow", failures[0][1])
+        return list(self.records)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def metrics(self):
+        """Flat {artifacts.<field>: value} dict for mlflow.log_metrics"""
+        uploaded = [r for r in self.records if r["status"] == "uploaded"]
+        deduplicated = [r for r in self.records if r["status"] == "deduplicated"]
+        return {
+            "artifacts.uploaded": len(uploaded),
+            "artifacts.deduplicated": len(deduplicated),
+            "artifacts.bytes_uploaded": sum(r["bytes"] for r in uploaded),
+            "artifacts.bytes_deduplicated": sum(r["bytes"] for r in deduplicated),
+            "artifacts.upload_s": sum(r["seconds"] for r in self.records),
+            "artifacts.wait_s": self.wait_s,
+        }
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import NearestNeighbors
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def scale_pos_weight(y):
+    """negatives / positives, the LightGBM weight that balances a binary label without new rows"""
+    y = np.asarray(y)
+    positives = int((y == 1).sum())
+    return float((y == 0).sum()) / positives if positives else 1.0
+
+
+def chunked_smote(X, y, k_neighbors=5, chunk_size=50000, neighbor_sample_size=None, random_state=42):
+    """SMOTE for a binary label with float32 storage and block-wise neighbour search
+
+    Returns (X_new, y_new): only the synthetic rows, in one preallocated float32 array, so the
+    caller appends them to the original rows, which are never copied or converted. Only the
+    minority class is held in float32 for the neighbour search, which covers chunk_size
+    minority rows at a time. With neighbor_sample_size, neighbours come from a random sample of
+    the minority class (approximate, but the index stays small on very large histories).
+    """
+    rng = np.random.default_rng(random_state)
+    y = np.asarray(y)
+
+    classes, counts = np.unique(y, return_counts=True)
+    if len(classes) != 2:
+        raise ValueError(f"chunked_smote supports binary labels, got {len(classes)} classes")
+    minority_label = classes[np.argmin(counts)]
+    n_new = int(counts.max() - counts.min())
+
+    minority = np.asarray(X[y == minority_label], dtype=np.float32)
+    n_minority = len(minority)
+    if n_new == 0 or n_minority < 2:
+        return np.empty((0, minority.shape[1]), dtype=np.float32), y[:0]
+
+    pool = minority
+    pool_index = np.arange(n_minority)
+    if neighbor_sample_size and n_minority > neighbor_sample_size:
+        pool_index = np.sort(rng.choice(n_minority, size=int(neighbor_sample_size), replace=False))
+        pool = minority[pool_index]
+
+    k = min(k_neighbors, len(pool) - 1)
+    index = NearestNeighbors(n_neighbors=k + 1).fit(pool)
+
+    # Only minority rows picked as a base need neighbours
+    base = rng.integers(0, n_minority, size=n_new)
+    needed, base_slot = np.unique(base, return_inverse=True)
+
+    neighbors = np.empty((len(needed), k), dtype=np.int32)
+    for start in range(0, len(needed), chunk_size):
+        block = needed[start:start + chunk_size]
+        _, found = index.kneighbors(minority[block])
+        # Drop each row's match with itself, which sits in column 0 when the row is in the pool
+        found = pool_index[found]
+        self_match = found[:, :1] == block[:, None]
+        neighbors[start:start + len(block)] = np.where(self_match, found[:, 1:], found[:, :-1])
+
+    X_new = np.empty((n_new, minority.shape[1]), dtype=np.float32)
+    y_new = np.full(n_new, minority_label, dtype=y.dtype)
+
+    choice = rng.integers(0, k, size=n_new)
+    for start in range(0, n_new, chunk_size):
+        stop = min(start + chunk_size, n_new)
+        slots = base_slot[start:stop]
+        origin = minority[base[start:stop]]
+        neighbor = minority[neighbors[slots, choice[start:stop]]]
+        gap = rng.random((stop - start, 1), dtype=np.float32)
+        X_new[start:stop] = origin + gap * (neighbor - origin)
+
+    logger.info(f"chunked SMOTE added {n_new} synthetic rows of class {minority_label} "
+                f"({X_new.nbytes / 2**20:.1f} MB float32 output)")
+    return X_new, y_new
+
+
+def resampled_frame(X_new, template, round_columns=()):
+    """template's rows followed by chunked_smote's synthetic rows, in template's columns and dtypes
+
+    Like imblearn's SMOTE, every synthetic column goes to its input dtype; integer columns and
+    round_columns (label-encoded categories) are rounded first, so synthetic rows hold valid
+    codes and counts instead of values truncated toward zero. The original rows are not converted.
+    """
+    columns = {}
+    for j, col in enumerate(template.columns):
+        values = X_new[:, j]
+        dtype = template[col].dtype
+        if col in round_columns or pd.api.types.is_integer_dtype(dtype):
+            values = np.rint(values)
+        columns[col] = values.astype(dtype, copy=False)
+    return pd.concat([template, pd.DataFrame(columns, copy=False)], ignore_index=True)
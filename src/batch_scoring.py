@@ -0,0 +1,182 @@
+import csv
+import io
+import time
+import numpy as np
+import pandas as pd
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Same order as the form fields in templates/index.html
+FEATURE_COLUMNS = [
+    "lead_time",
+    "no_of_special_requests",
+    "avg_price_per_room",
+    "arrival_month",
+    "arrival_date",
+    "market_segment_type",
+    "no_of_week_nights",
+    "no_of_weekend_nights",
+    "type_of_meal_plan",
+    "room_type_reserved",
+]
+
+INTEGER_COLUMNS = [c for c in FEATURE_COLUMNS if c != "avg_price_per_room"]
+
+# Form field names differ from the dataset column names for some features
+FORM_FIELDS = {
+    "no_of_special_requests": "no_of_special_request",
+}
+
+
+class BatchValidationError(ValueError):
+    """Raised when a batch of bookings cannot be turned into a feature matrix"""
+
+
+def _rows_from_records(records):
+    rows = []
+    for i, record in enumerate(records):
+        if isinstance(record, dict):
+            missing = [c for c in FEATURE_COLUMNS if c not in record and FORM_FIELDS.get(c) not in record]
+            if missing:
+                raise BatchValidationError(f"Row {i} is missing features: {missing}")
+            rows.append([record[c] if c in record else record[FORM_FIELDS[c]] for c in FEATURE_COLUMNS])
+        elif isinstance(record, (list, tuple)):
+            rows.append(list(record))
+        else:
+            raise BatchValidationError(f"Row {i} must be a list or an object, got {type(record).__name__}")
+    return rows
+
+
+def parse_json_bookings(payload):
+    """Accept a list of bookings or {"bookings": [...]}; each booking is a list or a dict of features"""
+    if isinstance(payload, dict):
+        payload = payload.get("bookings")
+    if not isinstance(payload, list):
+        raise BatchValidationError("Expected a JSON list of bookings or an object with a 'bookings' list")
+    return _rows_from_records(payload)
+
+
+def parse_csv_bookings(text, max_batch_size=None):
+    """Parse CSV text, with or without a header row of feature names
+
+    Stops with BatchValidationError as soon as more than max_batch_size data rows are read.
+    """
+    reader = (row for row in csv.reader(io.StringIO(text)) if row)
+    first = next(reader, None)
+    if first is None:
+        return []
+
+    header = [h.strip() for h in first]
+    positions = None
+    rows = []
+    if not set(header).isdisjoint(FEATURE_COLUMNS + list(FORM_FIELDS.values())):
+        names = {FORM_FIELDS.get(c, c): c for c in FEATURE_COLUMNS}
+        header = [names.get(h, h) for h in header]
+        missing = [c for c in FEATURE_COLUMNS if c not in header]
+        if missing:
+            raise BatchValidationError(f"CSV header is missing features: {missing}")
+        positions = [header.index(c) for c in FEATURE_COLUMNS]
+    else:
+        rows.append(first)
+
+    for row in reader:
+        if max_batch_size is not None and len(rows) >= max_batch_size:
+            raise BatchValidationError(f"Batch exceeds max_batch_size={max_batch_size}")
+        if positions is not None:
+            if len(row) != len(header):
+                raise BatchValidationError(f"Row {len(rows)} has {len(row)} values, "
+                                           f"expected {len(header)} as in the header")
+            row = [row[p] for p in positions]
+        rows.append(row)
+
+    return rows
+
+
+def _check_batch_size(n_rows, max_batch_size):
+    if n_rows == 0:
+        raise BatchValidationError("Batch is empty")
+    if n_rows > max_batch_size:
+        raise BatchValidationError(f"Batch of {n_rows} rows exceeds max_batch_size={max_batch_size}")
+
+
+def build_feature_matrix(rows, max_batch_size):
+    """Validate bookings column by column and return a float64 (n, 10) matrix"""
+    _check_batch_size(len(rows), max_batch_size)
+
+    for i, row in enumerate(rows):
+        if len(row) != len(FEATURE_COLUMNS):
+            raise BatchValidationError(f"Row {i} has {len(row)} values, expected {len(FEATURE_COLUMNS)}")
+
+    raw = np.array(rows, dtype=object)
+    features = np.empty(raw.shape, dtype=np.float64)
+
+    for j, col in enumerate(FEATURE_COLUMNS):
+        # astype(float64) would silently turn JSON true/false into 1.0/0.0
+        bad = next((i for i, v in enumerate(raw[:, j]) if isinstance(v, (bool, np.bool_))), None)
+        if bad is not None:
+            raise BatchValidationError(f"Column '{col}' has a non-numeric value at row {bad}: {raw[bad, j]!r}")
+        try:
+            values = raw[:, j].astype(np.float64)
+        except (TypeError, ValueError):
+            bad = next(i for i, v in enumerate(raw[:, j]) if not _is_number(v))
+            raise BatchValidationError(f"Column '{col}' has a non-numeric value at row {bad}: {raw[bad, j]!r}")
+
+        bad_rows = np.flatnonzero(~np.isfinite(values) | (values < 0))
+        if bad_rows.size:
+            raise BatchValidationError(f"Column '{col}' must be finite and non-negative, see row {bad_rows[0]}")
+
+        if col in INTEGER_COLUMNS:
+            bad_rows = np.flatnonzero(values != np.floor(values))
+            if bad_rows.size:
+                raise BatchValidationError(f"Column '{col}' must be an integer, see row {bad_rows[0]}")
+
+        features[:, j] = values
+
+    return features
+
+
+def parse_raw_json_bookings(payload, max_batch_size):
+    """Raw booking objects (columns as in Hotel_Reservations.csv) -> DataFrame for the fitted preprocessor"""
+    records = payload.get("bookings") if isinstance(payload, dict) else payload
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise BatchValidationError("Raw bookings must be a list of objects keyed by column name")
+    _check_batch_size(len(records), max_batch_size)
+    return pd.DataFrame.from_records(records)
+
+
+def parse_raw_csv_bookings(text, max_batch_size):
+    try:
+        # One row past the limit is enough to reject the batch without parsing the rest
+        df = pd.read_csv(io.StringIO(text), nrows=max_batch_size + 1)
+    except Exception as e:
+        raise BatchValidationError(f"Could not parse CSV: {e}")
+    _check_batch_size(len(df), max_batch_size)
+    return df
+
+
+def _is_number(value):
+    try:
+        float(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def score_batch(model, features):
+    """Score all rows with a single predict / predict_proba call"""
+    start = time.perf_counter()
+
+    if hasattr(model, "predict_proba"):
+        proba = model.predict_proba(features)
+        classes = getattr(model, "classes_", np.arange(proba.shape[1]))
+        predictions = np.asarray(classes)[proba.argmax(axis=1)]
+        probabilities = proba[:, -1]
+    else:
+        predictions = model.predict(features)
+        probabilities = None
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"Scored batch of {len(features)} rows in {elapsed_ms:.2f} ms")
+
+    return predictions, probabilities, elapsed_ms
@@ -0,0 +1,183 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from src.logger import get_logger
+from src.custom_exception import CustomException
+
+logger = get_logger(__name__)
+
+# cpus=None claims the whole budget (e.g. LightGBM with n_jobs=-1) and cpus=0 suits I/O-bound work
+# such as uploads, which then never wait for CPU
+Task = namedtuple("Task", ["name", "fn", "inputs", "outputs", "cpus"])
+
+
+def _timed_call(fn, args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return start, time.perf_counter(), result
+
+
+class DAGRunner:
+    """Runs tasks as soon as their inputs exist, as many at once as the CPU budget allows
+
+    Each task names the values it consumes and produces; a task depends on whichever task
+    produces its inputs, and receives them as positional arguments. Tasks claim `cpus` units of
+    cpu_budget while running and start in declaration order when enough units are free. After
+    run(), timings holds when each task became ready, started and finished, and report() shows
+    the critical path: the chain of tasks that actually bounded the wall time.
+    """
+
+    def __init__(self, name, cpu_budget=None):
+        self.name = name
+        self.cpu_budget = max(1, int(cpu_budget or os.cpu_count() or 1))
+        self.tasks = []
+        self.timings = {}
+        self.wall_s = None
+
+    def add(self, name, fn, inputs=(), outputs=(), cpus=1):
+        if any(t.name == name for t in self.tasks):
+            raise ValueError(f"Duplicate task {name!r} in {self.name}")
+        outputs = (outputs,) if isinstance(outputs, str) else tuple(outputs)
+        self.tasks.append(Task(name, fn, tuple(inputs), outputs, cpus))
+        return name
+
+    def _dependencies(self, provided):
+        producers = {}
+        for task in self.tasks:
+            for output in task.outputs:
+                if output in producers or output in provided:
+                    raise ValueError(f"{output!r} is produced twice in {self.name}")
+                producers[output] = task.name
+
+        dependencies = {}
+        for task in self.tasks:
+            missing = [i for i in task.inputs if i not in producers and i not in provided]
+            if missing:
+                raise ValueError(f"Task {task.name!r} needs {missing}, which nothing in {self.name} produces")
+            dependencies[task.name] = {producers[i] for i in task.inputs if i in producers}
+
+        # Kahn's algorithm, only to reject cycles before anything runs
+        remaining = {name: set(deps) for name, deps in dependencies.items()}
+        while remaining:
+            free = [name for name, deps in remaining.items() if not deps]
+            if not free:
+                raise ValueError(f"Cycle between tasks {sorted(remaining)} in {self.name}")
+            for name in free:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(free)
+        return dependencies
+
+    def _claim(self, task):
+        return self.cpu_budget if task.cpus is None else max(0, min(int(task.cpus), self.cpu_budget))
+
+    def run(self, **provided):
+        """Run every task; returns all produced values (plus the provided ones) by name"""
+        dependencies = self._dependencies(provided)
+        values = dict(provided)
+        pending = list(self.tasks)
+        finished, running = set(), {}
+        free_cpus = self.cpu_budget
+        failure = None
+
+        start = time.perf_counter()
+        self.timings = {}
+        # The budget is enforced here, not by pool size, so zero-CPU tasks always get a thread
+        threads = ThreadPoolExecutor(max_workers=max(1, len(self.tasks)), thread_name_prefix=f"dag-{self.name}")
+        try:
+            while pending or running:
+                if failure is None:
+                    for task in list(pending):
+                        if not dependencies[task.name] <= finished:
+                            continue
+                        self.timings.setdefault(task.name, {"ready": time.perf_counter() - start})
+                        claim = self._claim(task)
+                        if claim > free_cpus:
+                            continue
+                        future = threads.submit(_timed_call, task.fn, [values[i] for i in task.inputs])
+                        running[future] = (task, claim)
+                        pending.remove(task)
+                        free_cpus -= claim
+                elif not running:
+                    break
+                if not running:
+                    raise RuntimeError(f"No runnable task in {self.name}: {[t.name for t in pending]}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task, claim = running.pop(future)
+                    free_cpus += claim
+                    try:
+                        task_start, task_end, result = future.result()
+                    except Exception as e:
+                        logger.error(f"Task {task.name} failed in {self.name}: {e}")
+                        failure = failure or (task.name, e)
+                        continue
+
+                    self.timings[task.name].update(start=task_start - start, end=task_end - start, cpus=claim)
+                    finished.add(task.name)
+                    if len(task.outputs) == 1:
+                        values[task.outputs[0]] = result
+                    elif task.outputs:
+                        values.update(zip(task.outputs, result))
+        finally:
+            threads.shutdown(wait=True)
+            self.wall_s = time.perf_counter() - start
+
+        if failure is not None:
+            raise CustomException(f"Task {failure[0]} failed in {self.name}", failure[1])
+
+        logger.info(f"{self.name}: {len(self.tasks)} tasks in {self.wall_s:.2f}s\n{self.report()}")
+        return values
+
+    def critical_path(self):
+        """Tasks from the first to the last finisher, each one the dependency that gated the next"""
+        if not self.timings:
+            return []
+        producers = {o: t.name for t in self.tasks for o in t.outputs}
+        inputs = {t.name: t.inputs for t in self.tasks}
+
+        path = [max(self.timings, key=lambda name: self.timings[name]["end"])]
+        while True:
+            upstream = {producers[i] for i in inputs[path[-1]] if i in producers}
+            if not upstream:
+                break
+            path.append(max(upstream, key=lambda name: self.timings[name]["end"]))
+        return path[::-1]
+
+    def report(self):
+        path = self.critical_path()
+        busy = sum(t["end"] - t["start"] for t in self.timings.values())
+        lines = [f"{'task':<28} {'ready':>7} {'start':>7} {'end':>7} {'secs':>7} {'cpus':>4}  critical"]
+        for task in self.tasks:
+            t = self.timings.get(task.name)
+            if t is None or "end" not in t:
+                continue
+            lines.append(f"{task.name:<28} {t['ready']:>7.2f} {t['start']:>7.2f} {t['end']:>7.2f} "
+                         f"{t['end'] - t['start']:>7.2f} {t['cpus']:>4}  {'*' if task.name in path else ''}")
+        critical_s = sum(self.timings[name]["end"] - self.timings[name]["start"] for name in path)
+        # Time critical tasks spent ready but waiting for CPU units; a bigger budget would remove it
+        waiting_s = sum(self.timings[name]["start"] - self.timings[name]["ready"] for name in path)
+        lines.append(f"wall {self.wall_s:.2f}s, critical path {critical_s:.2f}s (+{waiting_s:.2f}s waiting for CPU), "
+                     f"task time {busy:.2f}s, parallelism {busy / self.wall_s if self.wall_s else 0:.2f}x "
+                     f"on a budget of {self.cpu_budget} CPUs")
+        return "\n".join(lines)
+
+    def metrics(self):
+        """Flat {dag.<name>.<field>: value} dict for mlflow.log_metrics"""
+        path = self.critical_path()
+        busy = sum(t["end"] - t["start"] for t in self.timings.values())
+        return {
+            f"dag.{self.name}.wall_s": self.wall_s,
+            f"dag.{self.name}.critical_path_s": sum(self.timings[n]["end"] - self.timings[n]["start"] for n in path),
+            f"dag.{self.name}.critical_path_cpu_wait_s": sum(self.timings[n]["start"] - self.timings[n]["ready"]
+                                                             for n in path),
+            f"dag.{self.name}.task_s": busy,
+            f"dag.{self.name}.cpu_budget": self.cpu_budget,
+        }
+
+    def summary(self):
+        """JSON-friendly timings for the run summary"""
+        return {"wall_s": self.wall_s, "cpu_budget": self.cpu_budget, "critical_path": self.critical_path(),
+                "tasks": self.timings}
@@ -1,11 +1,13 @@
 import os
 import pandas as pd
-from google.cloud import storage
 from sklearn.model_selection import train_test_split
 from src.logger import get_logger
 from src.custom_exception import CustomException
 from config.paths_config import *
-from utils.common_functions import read_yaml
+from utils.common_functions import read_yaml, write_data
+from src.storage import ChunkedDownloader, make_backend
+from src.profiling import profiler, profiled
+from src.hash_split import HashSplitter
 
 logger = get_logger(__name__)
 
@@ -16,26 +18,38 @@ class DataIngestion:
         self.bucket_name = self.config["bucket_name"]
         self.file_name = self.config["bucket_file_name"]
         self.train_ratio = self.config["train_ratio"]
+        self.artifacts_config = config.get("artifacts", {})
+        self.split_config = self.config.get("split", {})
+
+        download_config = self.config.get("download", {})
+        self.downloader = ChunkedDownloader(
+            make_backend(self.config),
+            chunk_size=int(download_config.get("chunk_size_mb", 32) * 1024 * 1024),
+            max_workers=download_config.get("max_workers", 8)
+        )
 
         os.makedirs(RAW_DIR, exist_ok=True)
 
         logger.info(f"Data Ingestion initialized with bucket: {self.bucket_name}, file: {self.file_name}")
 
+    @profiled()
     def download_csv_from_gcp(self):
-        """Download raw CSV file from GCP bucket into RAW_DIR"""
+        """Download raw CSV file from GCP bucket (or the configured backend) into RAW_DIR"""
         try:
-            client = storage.Client()
-            bucket = client.bucket(self.bucket_name)
-            blob = bucket.blob(self.file_name)
-
-            blob.download_to_filename(RAW_FILE_PATH)
-
-            logger.info(f"CSV file successfully downloaded to {RAW_FILE_PATH}")
+            if self.downloader.download(self.file_name, RAW_FILE_PATH, RAW_MANIFEST_PATH):
+                logger.info(f"CSV file successfully downloaded to {RAW_FILE_PATH}")
+            else:
+                logger.info(f"CSV file at {RAW_FILE_PATH} is already up to date")
 
         except Exception as e:
             logger.error(f"Error while downloading CSV from GCP: {e}")
             raise CustomException("Failed to download CSV file from GCP", e)
 
+    def appended_paths(self):
+        """Delta rows recorded by incremental runs; split together with raw.csv, which stays as downloaded"""
+        return [APPENDED_ROWS_PATH] if os.path.exists(APPENDED_ROWS_PATH) else []
+
+    @profiled()
     def split_data(self):
         """Split raw data into train and test sets"""
         try:
@@ -44,15 +58,23 @@ class DataIngestion:
             if not os.path.exists(RAW_FILE_PATH):
                 raise FileNotFoundError(f"Raw file not found at {os.path.abspath(RAW_FILE_PATH)}")
 
+            if self.split_config.get("mode", "random") == "hash":
+                return self.split_data_streaming()
+
             data = pd.read_csv(RAW_FILE_PATH)
+            appended = [pd.read_csv(path) for path in self.appended_paths()]
+            if appended:
+                # Rows a later download already contains keep their raw.csv copy
+                data = pd.concat([data, *appended], ignore_index=True).drop_duplicates(subset=["Booking_ID"])
 
             test_size = 1 - self.train_ratio
             train_data, test_data = train_test_split(data, test_size=test_size, random_state=42)
+            profiler.annotate(data_in=data, rows_out=len(train_data) + len(test_data))
 
             # Save to constants-defined paths
             os.makedirs(RAW_DIR, exist_ok=True)
-            train_data.to_csv(TRAIN_FILE_PATH, index=False)
-            test_data.to_csv(TEST_FILE_PATH, index=False)
+            write_data(train_data, TRAIN_FILE_PATH, self.artifacts_config)
+            write_data(test_data, TEST_FILE_PATH, self.artifacts_config)
 
             logger.info(f"Train data saved to {os.path.abspath(TRAIN_FILE_PATH)}")
             logger.info(f"Test data saved to {os.path.abspath(TEST_FILE_PATH)}")
@@ -61,6 +83,28 @@ class DataIngestion:
             logger.error(f"Error while splitting data: {e}")
             raise CustomException("Failed to split data into training and test sets", e)
 
+    def split_data_streaming(self):
+        """Split raw.csv and the appended delta rows chunk by chunk on a hash of Booking_ID; memory
+        does not grow with the file"""
+        splitter = HashSplitter(
+            test_ratio=1 - self.train_ratio,
+            stratify=self.split_config.get("stratify", True),
+            salt=self.split_config.get("salt", "hotel_churn"),
+            chunk_rows=self.split_config.get("chunk_rows", 100000),
+            manifest_path=SPLIT_MANIFEST_PATH
+        )
+        counts = splitter.split(RAW_FILE_PATH, TRAIN_FILE_PATH, TEST_FILE_PATH,
+                                extra_paths=self.appended_paths())
+
+        train_rows, test_rows = sum(counts["train"].values()), sum(counts["test"].values())
+        profiler.annotate(rows_in=train_rows + test_rows, rows_out=train_rows + test_rows)
+        for label in sorted(set(counts["train"]) | set(counts["test"])):
+            n_train, n_test = counts["train"].get(label, 0), counts["test"].get(label, 0)
+            logger.info(f"{label}: {n_train} train / {n_test} test ({n_test / (n_train + n_test):.3f} test share)")
+
+        logger.info(f"Train data saved to {os.path.abspath(TRAIN_FILE_PATH)} ({train_rows} rows)")
+        logger.info(f"Test data saved to {os.path.abspath(TEST_FILE_PATH)} ({test_rows} rows)")
+
     def run(self):
         """Main ingestion pipeline"""
         try:
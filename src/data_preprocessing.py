@@ -1,89 +1,145 @@
 import os
+import time
 import pandas as pd
 import numpy as np
 from src.logger import get_logger
 from src.custom_exception import CustomException
 from config.paths_config import *
-from utils.common_functions import read_yaml, load_data
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
+from utils.common_functions import read_yaml, load_data, write_data, peak_rss_mb
 from imblearn.over_sampling import SMOTE
+from src.preprocessor import BookingPreprocessor
+from src.feature_selection import rank_features
+from src.balancing import chunked_smote, resampled_frame
+from src.profiling import profiled
+from src.dag import DAGRunner
 
 logger = get_logger(__name__)
 
 
 class DataProcessor:
 
-    def __init__(self, train_path, test_path, processed_dir, config_path):
+    def __init__(self, train_path, test_path, processed_dir, config_path, preprocessor_path=PREPROCESSOR_PATH):
         self.train_path = train_path
         self.test_path = test_path
         self.processed_dir = processed_dir
+        self.preprocessor_path = preprocessor_path
 
         self.config = read_yaml(config_path)
 
+        # "compact" hands int8/int16/float32 frames to balancing, feature selection and training
+        self.preprocessing_mode = self.config["data_processing"].get("preprocessing_mode", "default")
+        if self.preprocessing_mode not in ("default", "compact"):
+            raise ValueError(f"Unknown preprocessing_mode {self.preprocessing_mode!r}")
+
+        self.preprocessor = BookingPreprocessor(
+            categorical_columns=self.config["data_processing"]["categorical_columns"],
+            numerical_columns=self.config["data_processing"]["numerical_columns"],
+            skewness_threshold=self.config["data_processing"]["skewness_threshold"],
+            compact_dtypes=self.preprocessing_mode == "compact",
+            float32_rtol=self.config.get("artifacts", {}).get("float32_rtol", 1e-6)
+        )
+
         if not os.path.exists(self.processed_dir):
             os.makedirs(self.processed_dir)
 
-    def preprocess_data(self, df):
-        try:
-            logger.info("Starting Data Processing step")
-
-            # Drop unnecessary columns
-            df.drop(columns=[c for c in ['Unnamed: 0', 'Booking_ID'] if c in df.columns],
-                    inplace=True, errors='ignore')
-            df.drop_duplicates(inplace=True)
+        self.dag_config = self.config.get("pipeline", {}).get("dag", {})
+        self.dag = None
 
-            cat_cols = self.config["data_processing"]["categorical_columns"]
-            num_cols = self.config["data_processing"]["numerical_columns"]
+    @staticmethod
+    def clean(df):
+        """Drop the id/index columns and duplicate rows, in place"""
+        df.drop(columns=[c for c in ['Unnamed: 0', 'Booking_ID'] if c in df.columns],
+                inplace=True, errors='ignore')
+        df.drop_duplicates(inplace=True)
+        return df
 
-            # Label Encoding
-            logger.info("Applying Label Encoding")
-            label_encoder = LabelEncoder()
-            mappings = {}
+    @profiled()
+    def fit_preprocessor(self, df):
+        """Learn the encodings and skewed columns from the cleaned training frame"""
+        try:
+            self.preprocessor.fit(self.clean(df))
+            return self.preprocessor
 
-            for col in cat_cols:
-                if col in df.columns:
-                    df[col] = label_encoder.fit_transform(df[col].astype(str))
-                    mappings[col] = {label: code for label, code in zip(label_encoder.classes_,
-                                                                      label_encoder.transform(label_encoder.classes_))}
+        except Exception as e:
+            logger.error(f"Error while fitting preprocessor {e}")
+            raise CustomException("Error while fitting preprocessor", e)
 
-            for col, mapping in mappings.items():
-                logger.info(f"{col} : {mapping}")
+    @profiled()
+    def preprocess_data(self, df, fit=False):
+        """Label encoding and skewness handling; fit=True learns the encodings from this frame"""
+        try:
+            logger.info("Starting Data Processing step")
 
-            # Handle skewness
-            logger.info("Handling Skewness")
-            skew_threshold = self.config["data_processing"]["skewness_threshold"]
-            skewness = df[num_cols].apply(lambda x: x.skew())
+            # Drop unnecessary columns
+            self.clean(df)
 
-            for column in skewness[skewness > skew_threshold].index:
-                df[column] = np.log1p(df[column])
+            if fit:
+                self.preprocessor.fit(df)
 
-            return df
+            logger.info("Applying Label Encoding and handling Skewness")
+            start = time.perf_counter()
+            encoded = self.preprocessor.transform(df)
+            seconds = time.perf_counter() - start
+            bytes_per_row = encoded.memory_usage(index=False, deep=True).sum() / max(len(encoded), 1)
+            logger.info(f"Encoded {len(encoded)} rows ({self.preprocessing_mode} dtypes) in {seconds:.3f}s, "
+                        f"{bytes_per_row:.1f} bytes/row")
+            return encoded
 
         except Exception as e:
             logger.error(f"Error during preprocess step {e}")
             raise CustomException("Error while preprocessing data", e)
 
+    @profiled()
     def balance_data(self, df):
-        """Apply SMOTE only on training set"""
+        """Balance ONLY the training set with the configured strategy"""
         try:
-            logger.info("Handling Imbalanced Data (SMOTE)")
-            X = df.drop(columns='booking_status')
-            y = df["booking_status"]
-
-            smote = SMOTE(random_state=42)
-            X_resampled, y_resampled = smote.fit_resample(X, y)
-
-            balanced_df = pd.DataFrame(X_resampled, columns=X.columns)
-            balanced_df["booking_status"] = y_resampled
-
-            logger.info("Data balanced successfully")
+            balancing_config = self.config["data_processing"].get("balancing", {})
+            method = balancing_config.get("method", "smote")
+            start = time.perf_counter()
+
+            if method == "class_weight":
+                # No synthetic rows; ModelTraining sets scale_pos_weight from the label counts instead
+                logger.info("Skipping resampling, class weights are applied during training")
+                balanced_df = df
+
+            elif method == "chunked_smote":
+                logger.info("Handling Imbalanced Data (chunked SMOTE)")
+                X = df.drop(columns='booking_status')
+                X_new, y_new = chunked_smote(
+                    X, df["booking_status"],
+                    k_neighbors=balancing_config.get("k_neighbors", 5),
+                    chunk_size=balancing_config.get("chunk_size", 50000),
+                    neighbor_sample_size=balancing_config.get("neighbor_sample_size"),
+                    random_state=42
+                )
+                balanced_df = resampled_frame(X_new, X,
+                                              round_columns=self.config["data_processing"]["categorical_columns"])
+                balanced_df["booking_status"] = np.concatenate([df["booking_status"].to_numpy(), y_new])
+
+            elif method == "smote":
+                logger.info("Handling Imbalanced Data (SMOTE)")
+                X = df.drop(columns='booking_status')
+                y = df["booking_status"]
+
+                smote = SMOTE(random_state=42)
+                X_resampled, y_resampled = smote.fit_resample(X, y)
+
+                balanced_df = pd.DataFrame(X_resampled, columns=X.columns)
+                balanced_df["booking_status"] = y_resampled
+
+            else:
+                raise ValueError(f"Unknown balancing method {method!r}")
+
+            logger.info(f"Data balanced successfully with {method}: {len(df)} -> {len(balanced_df)} rows, "
+                        f"{balanced_df.memory_usage(deep=True).sum() / 2**20:.1f} MB, "
+                        f"{time.perf_counter() - start:.2f}s, peak RSS {peak_rss_mb():.0f} MB")
             return balanced_df
 
         except Exception as e:
             logger.error(f"Error during balancing data step {e}")
             raise CustomException("Error while balancing data", e)
 
+    @profiled()
     def select_features(self, df):
         try:
             logger.info("Starting Feature selection step")
@@ -91,19 +147,23 @@ class DataProcessor:
             X = df.drop(columns='booking_status')
             y = df["booking_status"]
 
-            model = RandomForestClassifier(random_state=42)
-            model.fit(X, y)
-
-            feature_importance = model.feature_importances_
-            feature_importance_df = pd.DataFrame({
-                'feature': X.columns,
-                'importance': feature_importance
+            selection_config = dict(self.config["data_processing"].get("feature_selection", {}))
+            method = selection_config.pop("method", "random_forest")
+            use_cache = selection_config.pop("cache", False)
+
+            feature_importance = rank_features(
+                X, y, method=method,
+                cache_dir=os.path.join(CACHE_DIR, "feature_selection") if use_cache else None,
+                **selection_config
+            )
+            top_features_df = pd.DataFrame({
+                'feature': feature_importance.index,
+                'importance': feature_importance.values
             })
 
-            top_features_df = feature_importance_df.sort_values(by="importance", ascending=False)
             num_features_to_select = self.config["data_processing"]["no_of_features"]
 
-            selected_features = top_features_df["feature"].head(num_features_to_select).values
+            selected_features = top_features_df["feature"].head(num_features_to_select).tolist()
             logger.info(f"Features selected: {selected_features}")
 
             selected_df = df[list(selected_features) + ["booking_status"]]
@@ -118,37 +178,42 @@ class DataProcessor:
     def save_data(self, df, file_path):
         try:
             logger.info("Saving processed data")
-            df.to_csv(file_path, index=False)
+            write_data(df, file_path, self.config.get("artifacts", {}))
             logger.info(f"Data saved successfully to {file_path}")
 
         except Exception as e:
             logger.error(f"Error during saving data step {e}")
             raise CustomException("Error while saving data", e)
 
+    def align_test(self, test_df, train_df):
+        """Test frame with exactly the train columns; the model's feature order is recorded too"""
+        self.preprocessor.set_feature_order([c for c in train_df.columns if c != "booking_status"])
+        return test_df.reindex(columns=train_df.columns, fill_value=0)
+
     def process(self):
         try:
             logger.info("Loading data from RAW directory")
 
-            # Load
-            train_df = load_data(self.train_path)
-            test_df = load_data(self.test_path)
-
-            # Preprocess
-            train_df = self.preprocess_data(train_df)
-            test_df = self.preprocess_data(test_df)
-
-            # Balance ONLY train
-            train_df = self.balance_data(train_df)
-
-            # Feature selection on train
-            train_df = self.select_features(train_df)
-
-            # Align test features with train
-            test_df = test_df.reindex(columns=train_df.columns, fill_value=0)
-
-            # Save
-            self.save_data(train_df, PROCESSED_TRAIN_DATA_PATH)
-            self.save_data(test_df, PROCESSED_TEST_DATA_PATH)
+            # Encodings and skewed columns are learned on train only, then train and test are
+            # transformed concurrently; test waits only for the selected feature list
+            cpu_budget = self.dag_config.get("cpu_budget") if self.dag_config.get("enabled", False) else 1
+            dag = DAGRunner("data_processing", cpu_budget)
+            dag.add("load_train", load_data, ["train_path"], "raw_train")
+            dag.add("load_test", load_data, ["test_path"], "raw_test")
+            dag.add("fit_preprocessor", self.fit_preprocessor, ["raw_train"], "preprocessor")
+            dag.add("preprocess_train", lambda df, _: self.preprocess_data(df), ["raw_train", "preprocessor"],
+                    "encoded_train")
+            dag.add("preprocess_test", lambda df, _: self.preprocess_data(df), ["raw_test", "preprocessor"],
+                    "encoded_test")
+            dag.add("balance_data", self.balance_data, ["encoded_train"], "balanced_train")
+            # Feature ranking runs its own n_jobs=-1 pool, so it takes the whole budget
+            dag.add("select_features", self.select_features, ["balanced_train"], "train_df", cpus=None)
+            dag.add("align_test", self.align_test, ["encoded_test", "train_df"], "test_df")
+            dag.add("save_preprocessor", lambda _: self.preprocessor.save(self.preprocessor_path), ["test_df"])
+            dag.add("save_train", lambda df: self.save_data(df, PROCESSED_TRAIN_DATA_PATH), ["train_df"])
+            dag.add("save_test", lambda df: self.save_data(df, PROCESSED_TEST_DATA_PATH), ["test_df"])
+            dag.run(train_path=self.train_path, test_path=self.test_path)
+            self.dag = dag
 
             logger.info("Data processing pipeline completed successfully")
 
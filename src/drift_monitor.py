@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import threading
+import warnings
+import numpy as np
+from src.logger import get_logger
+from src.custom_exception import CustomException
+from utils.common_functions import iter_data_chunks
+
+logger = get_logger(__name__)
+
+# Name of the extra sketched column holding the model's predicted class
+PREDICTION_COLUMN = "prediction"
+QUANTILES = [0.5, 0.9, 0.99]
+# Floor on bin proportions so empty bins keep PSI finite
+PSI_EPSILON = 1e-4
+
+
+def _edges(values, kind, bins):
+    """Bin edges: reference quantiles for numeric values, one bin per category (plus unseen) otherwise"""
+    if kind == "categorical":
+        categories = np.unique(values)
+        # Codes below the first or above the last category (unseen, -1) land in the outer bins
+        return np.concatenate([[categories[0] - 0.5], (categories[:-1] + categories[1:]) / 2,
+                               [categories[-1] + 0.5]])
+    # "lower" keeps edges on observed values, so integer features are not split between codes
+    return np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1], method="lower"))
+
+
+def _psi_groups(counts, kind, psi_groups):
+    """Start index of each PSI group: equal reference mass for numeric bins, each category alone"""
+    if kind == "categorical":
+        return np.arange(len(counts))
+    cdf = np.cumsum(counts) / counts.sum()
+    starts = np.searchsorted(cdf, np.linspace(0, 1, psi_groups + 1)[:-1], side="right")
+    return np.unique(np.concatenate([[0], starts[starts < len(counts)]]))
+
+
+class DriftSketch:
+    """Fixed-size histograms of several columns over fixed bin edges
+
+    edges has one row per column, padded with +inf so every column has the same width; a value's
+    bin is the number of its column's edges at or below it. Counts are floats so the live sketch
+    can be decayed by halving.
+    """
+
+    def __init__(self, edges):
+        self.n_bins = np.array([len(e) + 1 for e in edges])
+        width = int(self.n_bins.max())
+        self.edges = np.full((len(edges), width - 1), np.inf)
+        for j, e in enumerate(edges):
+            self.edges[j, :len(e)] = e
+        self.counts = np.zeros((len(edges), width))
+        self._offsets = np.arange(len(edges)) * width
+        self._columns = np.arange(len(edges))
+
+    def bin_index(self, X):
+        if len(X) <= 64:
+            return (X[:, :, None] >= self.edges[None, :, :]).sum(axis=2)
+        return np.column_stack([np.searchsorted(self.edges[j], X[:, j], side="right")
+                                for j in range(X.shape[1])])
+
+    def add(self, X):
+        idx = self.bin_index(X)
+        if len(X) == 1:
+            self.counts[self._columns, idx[0]] += 1
+        else:
+            self.counts += np.bincount((idx + self._offsets).ravel(),
+                                       minlength=self.counts.size).reshape(self.counts.shape)
+
+
+def _reservoir(path, label_column, rows, chunk_rows, seed=42):
+    """Uniform sample of up to rows feature rows of a processed artifact, read chunk by chunk"""
+    rng = np.random.default_rng(seed)
+    sample, columns, seen = None, None, 0
+    for chunk in iter_data_chunks(path, chunk_rows):
+        if columns is None:
+            columns = [c for c in chunk.columns if c != label_column]
+            sample = np.empty((rows, len(columns)))
+        values = chunk[columns].to_numpy(dtype=np.float64)
+        fill = max(0, min(rows - seen, len(values)))
+        sample[seen:seen + fill] = values[:fill]
+        # Algorithm R, vectorized: row i replaces a random slot with probability rows / (i + 1)
+        position = np.arange(seen + fill, seen + len(values))
+        slots = (rng.random(len(position)) * (position + 1)).astype(np.int64)
+        keep = slots < rows
+        sample[slots[keep]] = values[fill:][keep]
+        seen += len(values)
+    return sample[:min(seen, rows)], columns
+
+
+def build_reference(path, model, categorical_columns=(), label_column="booking_status", bins=50,
+                    psi_groups=10, reference_rows=200000, chunk_rows=100000):
+    """Reference sketches of a processed artifact's features and the model's predictions on them"""
+    try:
+        X, columns = _reservoir(path, label_column, reference_rows, chunk_rows)
+        # Served rows reach the model as plain arrays too, so sklearn's feature-name warning is expected
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            predictions = np.asarray(model.predict(X), dtype=np.float64)
+        values = np.column_stack([X, predictions])
+        names = columns + [PREDICTION_COLUMN]
+        # A categorical column with more distinct codes than bins is sketched like a numeric one
+        kinds = ["categorical" if (c in categorical_columns or c == PREDICTION_COLUMN)
+                 and len(np.unique(values[:, j])) <= bins else "numeric" for j, c in enumerate(names)]
+
+        sketch = DriftSketch([_edges(values[:, j], kinds[j], bins) for j in range(len(names))])
+        sketch.add(values)
+        reference = {
+            "columns": names,
+            "kinds": kinds,
+            "edges": [sketch.edges[j, :sketch.n_bins[j] - 1].tolist() for j in range(len(names))],
+            "counts": [sketch.counts[j, :sketch.n_bins[j]].tolist() for j in range(len(names))],
+            "quantiles": {name: np.quantile(values[:, j], QUANTILES).tolist()
+                          for j, name in enumerate(names) if kinds[j] == "numeric"},
+            "rows": len(values),
+            "psi_groups": psi_groups,
+            "source": path,
+            "created": time.time(),
+        }
+        logger.info(f"Drift reference built from {len(values)} rows of {path}")
+        return reference
+
+    except Exception as e:
+        logger.error(f"Error while building drift reference from {path}: {e}")
+        raise CustomException("Failed to build drift reference", e)
+
+
+def save_reference(reference, path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(reference, f)
+    os.replace(tmp_path, path)
+    return path
+
+
+class DriftMonitor:
+    """Compares served features and predictions with the training reference in constant memory
+
+    observe() bins each row into the same edges as the reference sketch saved at training time,
+    so the state is one (columns x bins) array however much traffic is seen; every window_rows
+    rows the live counts are halved, which weights recent traffic without storing it. snapshot()
+    turns the counts into PSI (over equal-reference-mass groups of bins), KS (from the binned
+    CDFs) and estimated live quantiles per column. Each serving process keeps its own monitor.
+    """
+
+    def __init__(self, reference_path, window_rows=100000, min_rows=200, warn_psi=0.1, alert_psi=0.2):
+        self.reference_path = reference_path
+        self.window_rows = window_rows
+        self.min_rows = int(min_rows)
+        self.warn_psi = float(warn_psi)
+        self.alert_psi = float(alert_psi)
+
+        self._lock = threading.Lock()
+        self.reference = None
+        self.features = None
+        self.load_reference()
+
+    def load_reference(self):
+        """(Re)read the reference sketches and start the live ones from zero; False when there are none"""
+        if not os.path.exists(self.reference_path):
+            logger.warning(f"No drift reference at {self.reference_path}; drift monitoring is off until one exists")
+            with self._lock:
+                self.reference, self.features = None, None
+            return False
+
+        with open(self.reference_path) as f:
+            reference = json.load(f)
+        live = DriftSketch([np.asarray(e) for e in reference["edges"]])
+        expected = np.zeros_like(live.counts)
+        for j, counts in enumerate(reference["counts"]):
+            expected[j, :len(counts)] = counts
+        groups = [_psi_groups(np.asarray(c), kind, reference["psi_groups"])
+                  for c, kind in zip(reference["counts"], reference["kinds"])]
+
+        with self._lock:
+            self.reference, self._expected, self._groups, self._live = reference, expected, groups, live
+            self.features = [c for c in reference["columns"] if c != PREDICTION_COLUMN]
+            self.rows, self.decays = 0.0, 0
+            self._min = np.full(len(reference["columns"]), np.inf)
+            self._max = np.full(len(reference["columns"]), -np.inf)
+            self.since = time.time()
+        logger.info(f"Drift monitor loaded reference of {reference['rows']} rows over {reference['columns']}")
+        return True
+
+    def observe(self, features, predictions):
+        """Add served rows: features in the model's column order and their predicted classes"""
+        if self.reference is None:
+            return
+        values = np.column_stack([np.asarray(features, dtype=np.float64).reshape(len(predictions), -1),
+                                  np.asarray(predictions, dtype=np.float64)])
+        with self._lock:
+            self._live.add(values)
+            np.minimum(self._min, values.min(axis=0), out=self._min)
+            np.maximum(self._max, values.max(axis=0), out=self._max)
+            self.rows += len(values)
+            if self.window_rows and self.rows >= self.window_rows:
+                self._live.counts *= 0.5
+                self.rows *= 0.5
+                self.decays += 1
+
+    @staticmethod
+    def _quantiles(counts, edges, low_value, high_value):
+        """Live quantiles interpolated inside the bins; the outer bins end at the observed min/max"""
+        bounds = np.concatenate([[low_value], edges, [high_value]])
+        cdf = np.cumsum(counts) / counts.sum()
+        result = []
+        for q in QUANTILES:
+            b = min(int(np.searchsorted(cdf, q)), len(counts) - 1)
+            below = cdf[b - 1] if b else 0.0
+            share = (q - below) / (cdf[b] - below) if cdf[b] > below else 0.0
+            low, high = max(bounds[b], low_value), min(bounds[b + 1], high_value)
+            result.append(float(low + share * (high - low)))
+        return result
+
+    def _status(self, psi):
+        return "drift" if psi >= self.alert_psi else "warn" if psi >= self.warn_psi else "ok"
+
+    def snapshot(self):
+        """PSI, KS and quantiles per column against the reference, plus an overall status"""
+        # Everything is read under the lock, so a concurrent load_reference() cannot mix two references
+        with self._lock:
+            reference = self.reference
+            if reference is None:
+                return {"enabled": False, "reason": f"no reference at {self.reference_path}"}
+            live, rows, decays, since = self._live.counts.copy(), self.rows, self.decays, self.since
+            n_bins_all, expected_all, groups = self._live.n_bins, self._expected, self._groups
+            low_values, high_values = self._min.copy(), self._max.copy()
+
+        columns = {}
+        for j, name in enumerate(reference["columns"]):
+            n_bins = n_bins_all[j]
+            expected, actual = expected_all[j, :n_bins], live[j, :n_bins]
+            entry = {"kind": reference["kinds"][j]}
+            if actual.sum() > 0:
+                e = np.maximum(np.add.reduceat(expected, groups[j]) / expected.sum(), PSI_EPSILON)
+                a = np.maximum(np.add.reduceat(actual, groups[j]) / actual.sum(), PSI_EPSILON)
+                entry["psi"] = float(np.sum((a - e) * np.log(a / e)))
+                entry["status"] = self._status(entry["psi"]) if rows >= self.min_rows else "insufficient_data"
+                if entry["kind"] == "numeric":
+                    entry["ks"] = float(np.abs(np.cumsum(expected) / expected.sum()
+                                               - np.cumsum(actual) / actual.sum()).max())
+                    entry["quantiles"] = {"reference": reference["quantiles"][name],
+                                          "live": self._quantiles(actual, np.asarray(reference["edges"][j]),
+                                                                  low_values[j], high_values[j])}
+                else:
+                    entry["reference_share"] = (expected / expected.sum()).round(4).tolist()
+                    entry["live_share"] = (actual / actual.sum()).round(4).tolist()
+            columns[name] = entry
+
+        scored = {name: c["psi"] for name, c in columns.items() if "psi" in c}
+        worst = max(scored, key=scored.get) if scored else None
+        return {
+            "enabled": True,
+            "live_rows": rows,
+            "decays": decays,
+            "since": since,
+            "reference_rows": reference["rows"],
+            "status": "insufficient_data" if rows < self.min_rows or worst is None else self._status(scored[worst]),
+            "max_psi": scored[worst] if worst else None,
+            "max_psi_column": worst,
+            "drifted": sorted(n for n, c in columns.items() if c.get("status") == "drift"),
+            "quantiles": QUANTILES,
+            "columns": columns,
+        }
+
+    def psi(self):
+        """{column: psi} for the Prometheus gauge"""
+        snapshot = self.snapshot()
+        return {(name,): c["psi"] for name, c in snapshot.get("columns", {}).items() if "psi" in c}
@@ -0,0 +1,101 @@
+import os
+import json
+import hashlib
+import pandas as pd
+import lightgbm as lgb
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.inspection import permutation_importance
+from sklearn.model_selection import train_test_split
+from src.logger import get_logger
+from src.custom_exception import CustomException
+
+logger = get_logger(__name__)
+
+
+def _stratified_sample(X, y, size, random_state):
+    if size is None or len(X) <= size:
+        return X, y
+    X_sample, _, y_sample, _ = train_test_split(X, y, train_size=int(size), stratify=y, random_state=random_state)
+    return X_sample, y_sample
+
+
+def rank_random_forest(X, y, random_state=42, n_jobs=None, **_):
+    """The original ranking: a default RandomForest on every row"""
+    model = RandomForestClassifier(random_state=random_state, n_jobs=n_jobs)
+    model.fit(X, y)
+    return pd.Series(model.feature_importances_, index=X.columns)
+
+
+def rank_subsample_random_forest(X, y, random_state=42, n_jobs=-1, subsample_size=20000, **_):
+    """RandomForest importance on a stratified subsample"""
+    X_sample, y_sample = _stratified_sample(X, y, subsample_size, random_state)
+    return rank_random_forest(X_sample, y_sample, random_state=random_state, n_jobs=n_jobs)
+
+
+def rank_lgbm_gain(X, y, random_state=42, n_jobs=-1, lgbm_rounds=50, subsample_size=None, **_):
+    """Total split gain from a short LightGBM run on a stratified subsample (every row when subsample_size is None)"""
+    X_sample, y_sample = _stratified_sample(X, y, subsample_size, random_state)
+    model = lgb.LGBMClassifier(n_estimators=lgbm_rounds, importance_type="gain", random_state=random_state,
+                               n_jobs=n_jobs, verbose=-1)
+    model.fit(X_sample, y_sample)
+    return pd.Series(model.feature_importances_, index=X.columns)
+
+
+def rank_permutation(X, y, random_state=42, n_jobs=-1, lgbm_rounds=50, subsample_size=20000,
+                     permutation_repeats=5, **_):
+    """Permutation importance of a short LightGBM model on a held-out split, computed in parallel"""
+    X_sample, y_sample = _stratified_sample(X, y, subsample_size, random_state)
+    X_fit, X_valid, y_fit, y_valid = train_test_split(X_sample, y_sample, test_size=0.25, stratify=y_sample,
+                                                      random_state=random_state)
+    # Parallelism comes from the permutation jobs, so the model itself stays single-threaded
+    model = lgb.LGBMClassifier(n_estimators=lgbm_rounds, random_state=random_state, n_jobs=1, verbose=-1)
+    model.fit(X_fit, y_fit)
+    result = permutation_importance(model, X_valid, y_valid, n_repeats=permutation_repeats,
+                                    random_state=random_state, n_jobs=n_jobs)
+    return pd.Series(result.importances_mean, index=X.columns)
+
+
+RANKERS = {
+    "random_forest": rank_random_forest,
+    "subsample_random_forest": rank_subsample_random_forest,
+    "lgbm_gain": rank_lgbm_gain,
+    "permutation": rank_permutation,
+}
+
+
+def frame_fingerprint(df, options):
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    digest.update(",".join(map(str, df.columns)).encode())
+    digest.update(json.dumps(options, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def rank_features(X, y, method="random_forest", cache_dir=None, **options):
+    """Feature importances sorted descending, cached per (data, method, options) fingerprint"""
+    try:
+        if method not in RANKERS:
+            raise ValueError(f"Unknown feature selection method {method!r}, expected one of {list(RANKERS)}")
+
+        cache_path = None
+        if cache_dir:
+            fingerprint = frame_fingerprint(pd.concat([X, y], axis=1), {"method": method, **options})
+            cache_path = os.path.join(cache_dir, f"{fingerprint}.json")
+            if os.path.exists(cache_path):
+                with open(cache_path) as f:
+                    logger.info(f"Reusing cached {method} feature ranking {fingerprint[:12]}")
+                    return pd.Series(json.load(f))
+
+        logger.info(f"Ranking features with {method} on {len(X)} rows")
+        importance = RANKERS[method](X, y, **options).sort_values(ascending=False)
+
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_path, "w") as f:
+                json.dump({k: float(v) for k, v in importance.items()}, f, indent=2)
+
+        return importance
+
+    except Exception as e:
+        logger.error(f"Error while ranking features {e}")
+        raise CustomException("Failed to rank features", e)
@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+from src.logger import get_logger
+from src.custom_exception import CustomException
+from utils.common_functions import detect_format
+
+logger = get_logger(__name__)
+
+# Resolution of the per-class threshold search; each class's test share lands within 1/HISTOGRAM_BINS
+HISTOGRAM_BINS = 1 << 16
+
+
+def hash_fraction(ids, salt="hotel_churn"):
+    """Stable position in [0, 1) for each id, the same on every run, machine and file order"""
+    key = (salt * 16)[:16] if salt else "0123456789123456"
+    hashed = pd.util.hash_pandas_object(pd.Series(ids).astype(str), index=False, hash_key=key).to_numpy()
+    return (hashed >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+class ChunkWriter:
+    """Appends DataFrame chunks to a CSV, parquet or feather file
+
+    The first chunk fixes the schema for binary formats; later chunks are cast to it, so a
+    column that is all-integer in one chunk and has a decimal in the next fails loudly instead
+    of producing a file with mixed types.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = detect_format(path)
+        if self.format == "npy":
+            raise ValueError("The streaming split writes csv, parquet or feather; npy needs the row count up front")
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+        tmp = f"{path}.tmp"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        self._tmp = tmp
+
+    def write(self, df):
+        if self.format == "csv":
+            df.to_csv(self._tmp, mode="a", header=self.rows == 0, index=False)
+        else:
+            import pyarrow as pa
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                if self.format == "parquet":
+                    import pyarrow.parquet as pq
+                    self._writer = pq.ParquetWriter(self._tmp, self._schema)
+                else:
+                    self._writer = pa.ipc.new_file(self._tmp, self._schema)
+            self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self, schema_df=None):
+        """Finish the file and move it into place; schema_df gives the header if no rows were written"""
+        if self._writer is not None:
+            self._writer.close()
+        elif self.rows == 0 and schema_df is not None:
+            if self.format == "csv":
+                schema_df.iloc[:0].to_csv(self._tmp, index=False)
+            elif self.format == "parquet":
+                schema_df.iloc[:0].to_parquet(self._tmp, index=False)
+            else:
+                schema_df.iloc[:0].reset_index(drop=True).to_feather(self._tmp)
+        os.replace(self._tmp, self.path)
+
+
+class HashSplitter:
+    """Streaming train/test split on a hash of the booking id
+
+    A row is a test row when hash_fraction(id) falls below its class's threshold. Without
+    stratification every class uses test_ratio. With stratification a first pass counts the hash
+    positions per class in a fixed-size histogram and picks each class's threshold so exactly
+    test_ratio of it (to 1/HISTOGRAM_BINS) goes to test. The thresholds are saved in
+    manifest_path and reused while salt, ratio and stratification are unchanged, so appended
+    rows never move existing bookings to the other split. Memory depends on chunk_rows only,
+    plus the ids of extra_paths, whose rows are skipped when an earlier input already has them.
+    """
+
+    def __init__(self, test_ratio, id_column="Booking_ID", label_column="booking_status", stratify=True,
+                 salt="hotel_churn", chunk_rows=100000, manifest_path=None):
+        self.test_ratio = float(test_ratio)
+        self.id_column = id_column
+        self.label_column = label_column
+        self.stratify = stratify
+        self.salt = salt
+        self.chunk_rows = int(chunk_rows)
+        self.manifest_path = manifest_path
+
+    def _settings(self):
+        return {"test_ratio": self.test_ratio, "stratify": bool(self.stratify), "salt": self.salt,
+                "id_column": self.id_column, "label_column": self.label_column}
+
+    def _chunks(self, path, usecols=None, extra_paths=()):
+        """Chunks of path, then of each extra path without the ids an earlier input already had"""
+        extra_ids = set()
+        for extra in extra_paths:
+            for chunk in pd.read_csv(extra, usecols=[self.id_column], chunksize=self.chunk_rows):
+                extra_ids.update(chunk[self.id_column].astype(str))
+
+        seen = set()
+        for i, source in enumerate([path, *extra_paths]):
+            for chunk in pd.read_csv(source, chunksize=self.chunk_rows, usecols=usecols):
+                ids = chunk[self.id_column].astype(str)
+                if i:
+                    keep = ~ids.isin(seen) & ~ids.duplicated()
+                    chunk, ids = chunk[keep.to_numpy()], ids[keep]
+                if extra_ids:
+                    seen.update(ids[ids.isin(extra_ids)])
+                if len(chunk):
+                    yield chunk
+
+    def _fit_thresholds(self, path, extra_paths=()):
+        histograms = {}
+        for chunk in self._chunks(path, usecols=[self.id_column, self.label_column], extra_paths=extra_paths):
+            position = hash_fraction(chunk[self.id_column], self.salt)
+            bins = np.minimum((position * HISTOGRAM_BINS).astype(np.int64), HISTOGRAM_BINS - 1)
+            for label, label_bins in pd.Series(bins).groupby(chunk[self.label_column].astype(str).to_numpy()):
+                counts = np.bincount(label_bins.to_numpy(), minlength=HISTOGRAM_BINS)
+                histograms[label] = histograms.get(label, 0) + counts
+
+        thresholds = {}
+        for label, counts in histograms.items():
+            cumulative = np.concatenate([[0], np.cumsum(counts)]) / counts.sum()
+            edge = int(np.argmin(np.abs(cumulative - self.test_ratio)))
+            thresholds[label] = edge / HISTOGRAM_BINS
+        return thresholds
+
+    def thresholds(self, path, extra_paths=()):
+        """Per-class thresholds from the manifest, or fitted on path and saved when settings changed"""
+        if not self.stratify:
+            return {}
+        if self.manifest_path and os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get("settings") == self._settings():
+                return manifest["thresholds"]
+            logger.info("Split settings changed, fitting new per-class thresholds")
+
+        thresholds = self._fit_thresholds(path, extra_paths)
+        if self.manifest_path:
+            with open(self.manifest_path, "w") as f:
+                json.dump({"settings": self._settings(), "thresholds": thresholds, "created": time.time()}, f, indent=2)
+        logger.info(f"Per-class test thresholds: {thresholds}")
+        return thresholds
+
+    def split(self, path, train_path, test_path, extra_paths=()):
+        """Write the train and test files chunk by chunk; returns {split: {label: rows}}"""
+        try:
+            thresholds = self.thresholds(path, extra_paths)
+            writers = {"train": ChunkWriter(train_path), "test": ChunkWriter(test_path)}
+            counts = {"train": {}, "test": {}}
+            first = None
+
+            for chunk in self._chunks(path, extra_paths=extra_paths):
+                if first is None:
+                    first = chunk
+                position = hash_fraction(chunk[self.id_column], self.salt)
+                labels = chunk[self.label_column].astype(str)
+                cutoff = labels.map(thresholds).fillna(self.test_ratio).to_numpy(dtype=np.float64) \
+                    if thresholds else self.test_ratio
+                is_test = position < cutoff
+
+                for name, mask in (("train", ~is_test), ("test", is_test)):
+                    part = chunk[mask]
+                    if len(part):
+                        writers[name].write(part)
+                        for label, n in part[self.label_column].astype(str).value_counts().items():
+                            counts[name][label] = counts[name].get(label, 0) + int(n)
+
+            for writer in writers.values():
+                writer.close(first)
+            return counts
+        except Exception as e:
+            logger.error(f"Error while hash-splitting {path}: {e}")
+            raise CustomException("Failed to split data by booking id hash", e)
@@ -0,0 +1,193 @@
+import os
+import time
+import numpy as np
+import lightgbm as lgb
+from concurrent.futures import ThreadPoolExecutor
+from sklearn.model_selection import ParameterSampler, StratifiedKFold
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+from src.logger import get_logger
+from src.streaming_dataset import BoosterClassifier
+
+logger = get_logger(__name__)
+
+SCORERS = {
+    "accuracy": lambda y, proba: accuracy_score(y, proba > 0.5),
+    "precision": lambda y, proba: precision_score(y, proba > 0.5),
+    "recall": lambda y, proba: recall_score(y, proba > 0.5),
+    "f1": lambda y, proba: f1_score(y, proba > 0.5),
+    "roc_auc": roc_auc_score,
+}
+
+# Parameters that only make sense for the sklearn wrapper; rounds are set by the halving budget
+WRAPPER_ONLY_PARAMS = ["n_estimators"]
+
+
+def split_thread_budget(thread_budget=None, parallel_trials=1):
+    """(parallel trials, threads per model) so that their product never exceeds the budget"""
+    thread_budget = thread_budget or os.cpu_count() or 1
+    parallel_trials = max(1, min(int(parallel_trials), thread_budget))
+    return parallel_trials, max(1, thread_budget // parallel_trials)
+
+
+class SuccessiveHalvingSearch:
+    """Successive halving over LightGBM params with early stopping and shared binned Datasets
+
+    The data is binned into one lgb.Dataset up front; every CV fold is a subset of it, so bins
+    are computed once instead of once per candidate and fold. Each rung trains the surviving
+    candidates for `eta` times more boosting rounds and keeps the best 1/eta of them.
+
+    fit() also takes an already constructed lgb.Dataset with y=None (streaming training). There
+    is no raw data to predict on then, so folds are scored from LightGBM's own validation
+    predictions and the winner is refit with lgb.train into a BoosterClassifier.
+    """
+
+    def __init__(self, param_distributions, n_candidates=27, min_rounds=25, max_rounds=500, eta=3, cv=2,
+                 early_stopping_rounds=20, scoring="accuracy", thread_budget=None, parallel_trials=2,
+                 random_state=42, fixed_params=None):
+        self.param_distributions = param_distributions
+        self.fixed_params = dict(fixed_params or {})
+        self.n_candidates = n_candidates
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.eta = eta
+        self.cv = cv
+        self.early_stopping_rounds = early_stopping_rounds
+        self.scoring = scoring
+        self.random_state = random_state
+        self.parallel_trials, self.threads_per_model = split_thread_budget(thread_budget, parallel_trials)
+
+        self.results_ = []
+        self.n_trials_ = 0
+        self.total_boost_rounds_ = 0
+
+    def _rungs(self):
+        rounds = [self.min_rounds]
+        while rounds[-1] * self.eta < self.max_rounds:
+            rounds.append(rounds[-1] * self.eta)
+        if rounds[-1] < self.max_rounds:
+            rounds.append(self.max_rounds)
+        return rounds
+
+    def _build_folds(self, X, y):
+        if isinstance(X, lgb.Dataset):
+            full, X_values, y_values = X, None, X.get_label()
+        else:
+            full = lgb.Dataset(X, label=y, params={"verbosity": -1, "feature_pre_filter": False},
+                               free_raw_data=False).construct()
+            X_values = np.asarray(X, dtype=np.float64)
+            y_values = np.asarray(y)
+
+        folds = []
+        splitter = StratifiedKFold(n_splits=self.cv, shuffle=True, random_state=self.random_state)
+        for train_idx, valid_idx in splitter.split(np.zeros((len(y_values), 1)), y_values):
+            train_set = full.subset(sorted(train_idx)).construct()
+            valid_set = full.subset(sorted(valid_idx)).construct()
+            X_valid = X_values[valid_idx] if X_values is not None else None
+            folds.append((train_set, valid_set, X_valid, y_values[valid_idx]))
+        return full, folds
+
+    def _train_params(self, candidate):
+        params = {k: v for k, v in candidate.items() if k not in WRAPPER_ONLY_PARAMS}
+        params.update(self.fixed_params)
+        params.update({
+            "objective": "binary",
+            "verbosity": -1,
+            "num_threads": self.threads_per_model,
+            "seed": self.random_state,
+        })
+        return params
+
+    def _evaluate(self, candidate, rounds, folds):
+        params = self._train_params(candidate)
+        scores, best_iterations, used_rounds = [], [], 0
+
+        for train_set, valid_set, X_valid, y_valid in folds:
+            callbacks, feval, history = [], None, {}
+            if X_valid is None:
+                # Score every round from the validation predictions LightGBM already keeps;
+                # early stopping stays on the first (built-in logloss) metric as with raw data
+                feval = lambda proba, data: (self.scoring, SCORERS[self.scoring](data.get_label(), proba), True)
+                callbacks.append(lgb.record_evaluation(history))
+            # LightGBM ignores early stopping for dart, so it always runs the full rung budget
+            if params.get("boosting_type") != "dart":
+                callbacks.append(lgb.early_stopping(self.early_stopping_rounds, first_metric_only=True,
+                                                    verbose=False))
+
+            booster = lgb.train(params, train_set, num_boost_round=rounds, valid_sets=[valid_set],
+                                feval=feval, callbacks=callbacks)
+            best_iteration = booster.best_iteration or booster.current_iteration()
+
+            if X_valid is None:
+                scores.append(history["valid_0"][self.scoring][best_iteration - 1])
+            else:
+                proba = booster.predict(X_valid, num_iteration=best_iteration)
+                scores.append(SCORERS[self.scoring](y_valid, proba))
+            best_iterations.append(best_iteration)
+            used_rounds += booster.current_iteration()
+
+        return float(np.mean(scores)), int(np.mean(best_iterations)), used_rounds
+
+    def fit(self, X, y):
+        start = time.perf_counter()
+
+        candidates = list(ParameterSampler(self.param_distributions, n_iter=self.n_candidates,
+                                           random_state=self.random_state))
+        full, folds = self._build_folds(X, y)
+        logger.info(f"Successive halving: {len(candidates)} candidates, rungs {self._rungs()}, "
+                    f"{self.parallel_trials} parallel trials x {self.threads_per_model} threads")
+
+        survivors = list(range(len(candidates)))
+        best = None
+
+        with ThreadPoolExecutor(max_workers=self.parallel_trials) as executor:
+            for rung, rounds in enumerate(self._rungs()):
+                outcomes = list(executor.map(lambda i: self._evaluate(candidates[i], rounds, folds), survivors))
+
+                ranked = []
+                for i, (score, best_iteration, used_rounds) in zip(survivors, outcomes):
+                    self.n_trials_ += len(folds)
+                    self.total_boost_rounds_ += used_rounds
+                    self.results_.append({"rung": rung, "rounds": rounds, "candidate": i, "score": score,
+                                          "best_iteration": best_iteration, "params": candidates[i]})
+                    ranked.append((score, i, best_iteration))
+
+                ranked.sort(key=lambda r: r[0], reverse=True)
+                best = ranked[0]
+                logger.info(f"Rung {rung} ({rounds} rounds): best {self.scoring}={best[0]:.4f} "
+                            f"from candidate {best[1]} of {len(survivors)}")
+
+                if len(ranked) == 1:
+                    break
+                survivors = [i for _, i, _ in ranked[:max(1, len(ranked) // self.eta)]]
+
+        best_score, best_index, best_iteration = best
+        self.best_score_ = best_score
+        self.best_params_ = {**candidates[best_index], "n_estimators": max(1, best_iteration)}
+
+        # Every candidate at the furthest rung it reached, best first; the winner leads
+        furthest = {}
+        for result in self.results_:
+            furthest[result["candidate"]] = result
+        self.ranking_ = [{"params": {**r["params"], "n_estimators": max(1, r["best_iteration"])}, "score": r["score"]}
+                         for r in sorted(furthest.values(), key=lambda r: (r["rung"], r["score"]), reverse=True)]
+
+        self.best_estimator_ = self.refit(self.best_params_, X, y)
+
+        self.wall_time_s_ = time.perf_counter() - start
+        logger.info(f"Successive halving finished: {self.n_trials_} trials, {self.total_boost_rounds_} boosting "
+                    f"rounds, {self.wall_time_s_:.1f}s")
+        return self
+
+    def refit(self, params, X, y):
+        """Fit params (n_estimators included) on all data with every thread in the budget"""
+        if isinstance(X, lgb.Dataset):
+            train_params = {**self._train_params(params), "num_threads": self.parallel_trials * self.threads_per_model}
+            booster = lgb.train(train_params, X, num_boost_round=params["n_estimators"])
+            return BoosterClassifier(booster, {**params, **self.fixed_params})
+        return lgb.LGBMClassifier(
+            **params,
+            **self.fixed_params,
+            n_jobs=self.parallel_trials * self.threads_per_model,
+            random_state=self.random_state,
+            verbose=-1
+        ).fit(X, y)
@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import joblib
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+from src.logger import get_logger
+from src.custom_exception import CustomException
+from src.preprocessor import BookingPreprocessor
+from src.streaming_dataset import BoosterClassifier
+from src.hash_split import hash_fraction
+from src.profiling import profiler, profiled
+from utils.common_functions import load_data
+
+logger = get_logger(__name__)
+
+METRICS = {"accuracy": accuracy_score, "precison": precision_score, "recall": recall_score, "f1": f1_score}
+
+# Booster params that describe the previous fit rather than how to keep boosting
+FIT_ONLY_PARAMS = {"num_iterations", "n_estimators", "early_stopping_round", "random_state"}
+
+
+def score(model, X, y):
+    y_pred = model.predict(X)
+    return {name: float(fn(y, y_pred)) for name, fn in METRICS.items()}
+
+
+def full_retrain_seconds(run_summary_path):
+    """End-to-end wall time of the last full pipeline run, or None if unknown
+
+    Profiled steps overlap when the DAG runs them concurrently, so their sum would overcount.
+    The stage cache times each pipeline stage from start to finish instead (a cache hit reports
+    the time the stage originally took); without it, the DAG wall times are used.
+    """
+    if not os.path.exists(run_summary_path):
+        return None
+    with open(run_summary_path) as f:
+        summary = json.load(f)
+    if not any(r["stage"] == "train_lgbm" for r in summary.get("stages", [])):
+        return None
+    stages = summary.get("stage_cache") or []
+    if stages:
+        return sum(r["saved_s"] if r["hit"] else r["duration_s"] for r in stages)
+    dags = summary.get("dag") or {}
+    if dags:
+        return sum(d["wall_s"] for d in dags.values())
+    return summary.get("total_wall_s")
+
+
+def record_new_bookings(source_path, raw_path, appended_path, chunk_rows=100000):
+    """Append rows of source_path whose Booking_ID is in neither raw_path nor appended_path to
+    appended_path; returns the appended rows. raw_path itself is never modified."""
+    known = set()
+    for path in (raw_path, appended_path):
+        if os.path.exists(path):
+            for chunk in pd.read_csv(path, usecols=["Booking_ID"], chunksize=chunk_rows):
+                known.update(chunk["Booking_ID"])
+
+    columns = pd.read_csv(raw_path, nrows=0).columns
+    rows = load_data(source_path)
+    new_rows = rows[~rows["Booking_ID"].isin(known)].drop_duplicates(subset=["Booking_ID"]).reindex(columns=columns)
+    new_rows.to_csv(appended_path, mode="a", header=not os.path.exists(appended_path), index=False)
+    logger.info(f"Recorded {len(new_rows)} of {len(rows)} rows of {source_path} in {appended_path}")
+    return new_rows
+
+
+class IncrementalTrainer:
+    """Refreshes the saved model with a delta of new bookings instead of retraining from scratch
+
+    The delta is encoded with the saved preprocessor and split by a hash of Booking_ID into
+    refresh and holdout rows. The saved booster keeps boosting on the refresh rows for at most
+    max_extra_trees (early-stopped on the holdout). A full retrain is requested instead when the
+    current model scores more than drift_threshold worse on the delta holdout than on the
+    historical test set, when the refreshed model is more than max_regression worse on that test
+    set, or when the model would grow past max_total_trees.
+    """
+
+    def __init__(self, model_path, preprocessor_path, test_path, config):
+        self.model_path = model_path
+        self.preprocessor_path = preprocessor_path
+        self.test_path = test_path
+
+        self.max_extra_trees = int(config.get("max_extra_trees", 50))
+        self.max_total_trees = config.get("max_total_trees")
+        self.early_stopping_rounds = int(config.get("early_stopping_rounds", 10))
+        self.holdout_ratio = float(config.get("holdout_ratio", 0.2))
+        self.min_delta_rows = int(config.get("min_delta_rows", 100))
+        self.metric = config.get("metric", "accuracy")
+        self.drift_threshold = float(config.get("drift_threshold", 0.05))
+        self.max_regression = float(config.get("max_regression", 0.01))
+        self.learning_rate = config.get("learning_rate")
+
+        self.metrics = {}
+        # "refreshed", "skipped" (delta too small) or "full_retrain" with fallback_reason set
+        self.status = None
+        self.fallback_reason = None
+
+    @profiled()
+    def prepare_delta(self, delta_path, preprocessor):
+        """Encode the raw delta and split it into (X_refresh, y_refresh, X_holdout, y_holdout)"""
+        try:
+            df = load_data(delta_path)
+            self.metrics["delta_rows"] = len(df)
+            if "Booking_ID" not in df.columns:
+                raise ValueError("Delta file has no Booking_ID column to split on")
+
+            df = df.drop_duplicates(subset=["Booking_ID"])
+            holdout = hash_fraction(df["Booking_ID"]) < self.holdout_ratio
+
+            encoded = preprocessor.transform(df[preprocessor.feature_order + ["booking_status"]])
+            X = encoded[preprocessor.feature_order].astype(np.float64)
+            y = encoded["booking_status"].to_numpy()
+            if (y < 0).any():
+                raise ValueError("Delta has booking_status values the preprocessor has not seen")
+
+            profiler.annotate(data_in=df, rows_out=len(X))
+            return X[~holdout], y[~holdout], X[holdout], y[holdout]
+
+        except Exception as e:
+            logger.error(f"Error while preparing delta {delta_path}: {e}")
+            raise CustomException("Failed to prepare delta for incremental training", e)
+
+    def boosting_params(self, booster):
+        params = {k: v for k, v in booster.params.items() if k not in FIT_ONLY_PARAMS and v is not None}
+        params.update({"objective": "binary", "verbosity": -1})
+        if self.learning_rate:
+            params["learning_rate"] = float(self.learning_rate)
+        return params
+
+    @profiled()
+    def continue_boosting(self, model, X_refresh, y_refresh, X_holdout, y_holdout):
+        try:
+            booster = model.booster_
+            params = self.boosting_params(booster)
+            trees_before = booster.current_iteration()
+
+            train_set = lgb.Dataset(X_refresh, label=y_refresh, params={"verbosity": -1})
+            valid_set = lgb.Dataset(X_holdout, label=y_holdout, reference=train_set)
+            callbacks = []
+            if params.get("boosting_type") != "dart":
+                callbacks.append(lgb.early_stopping(self.early_stopping_rounds, verbose=False))
+
+            refreshed = lgb.train(params, train_set, num_boost_round=self.max_extra_trees, init_model=booster,
+                                  valid_sets=[valid_set], callbacks=callbacks, keep_training_booster=True)
+            if refreshed.best_iteration and refreshed.best_iteration < refreshed.current_iteration():
+                # Drop the trees added after the holdout stopped improving
+                refreshed = lgb.Booster(model_str=refreshed.model_to_string(num_iteration=refreshed.best_iteration))
+
+            self.metrics["trees_before"] = trees_before
+            self.metrics["added_trees"] = refreshed.current_iteration() - trees_before
+            self.metrics["total_trees"] = refreshed.current_iteration()
+            logger.info(f"Added {self.metrics['added_trees']} trees to the {trees_before} of the saved model")
+
+            model_params = model.get_params() if hasattr(model, "get_params") else {}
+            return BoosterClassifier(refreshed, {k: v for k, v in model_params.items() if k != "n_estimators"})
+
+        except Exception as e:
+            logger.error(f"Error while continuing boosting: {e}")
+            raise CustomException("Failed to continue boosting the saved model", e)
+
+    def _fall_back(self, reason):
+        self.status, self.fallback_reason = "full_retrain", reason
+        logger.warning(f"Incremental refresh rejected, full retrain needed: {reason}")
+        return None
+
+    def refresh(self, delta_path):
+        """The refreshed model, or None when the delta is skipped or a full retrain is needed (see status)"""
+        start = time.perf_counter()
+        model = joblib.load(self.model_path)
+        preprocessor = BookingPreprocessor.load(self.preprocessor_path)
+
+        test_df = load_data(self.test_path)
+        X_test = test_df[preprocessor.feature_order].astype(np.float64)
+        y_test = test_df["booking_status"].to_numpy()
+
+        X_refresh, y_refresh, X_holdout, y_holdout = self.prepare_delta(delta_path, preprocessor)
+        self.metrics.update({"delta_refresh_rows": len(X_refresh), "delta_holdout_rows": len(X_holdout)})
+        if len(X_refresh) < self.min_delta_rows or len(X_holdout) == 0:
+            self.status = "skipped"
+            logger.info(f"Delta has {len(X_refresh)} refresh and {len(X_holdout)} holdout rows, "
+                        f"below min_delta_rows={self.min_delta_rows}; keeping the current model")
+            return None
+
+        before_test = score(model, X_test, y_test)
+        before_delta = score(model, X_holdout, y_holdout)
+        drift = before_test[self.metric] - before_delta[self.metric]
+        self.metrics.update({f"before_test_{k}": v for k, v in before_test.items()})
+        self.metrics.update({f"before_delta_{k}": v for k, v in before_delta.items()})
+        self.metrics["delta_drift"] = drift
+
+        if drift > self.drift_threshold:
+            return self._fall_back(f"{self.metric} on the delta is {drift:.4f} below the test set")
+
+        refreshed = self.continue_boosting(model, X_refresh, y_refresh, X_holdout, y_holdout)
+        after_test = score(refreshed, X_test, y_test)
+        after_delta = score(refreshed, X_holdout, y_holdout)
+        self.metrics.update({f"after_test_{k}": v for k, v in after_test.items()})
+        self.metrics.update({f"after_delta_{k}": v for k, v in after_delta.items()})
+
+        regression = before_test[self.metric] - after_test[self.metric]
+        if regression > self.max_regression:
+            return self._fall_back(f"refreshed model lost {regression:.4f} {self.metric} on the test set")
+        if self.max_total_trees and self.metrics["total_trees"] > int(self.max_total_trees):
+            return self._fall_back(f"model would grow to {self.metrics['total_trees']} trees")
+
+        self.status = "refreshed"
+        self.metrics["refresh_wall_s"] = time.perf_counter() - start
+        return refreshed
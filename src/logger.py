@@ -19,23 +19,182 @@
 #     return logger
 
 
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 from datetime import datetime
+import yaml
+from config.paths_config import CONFIG_PATH
 
 LOGS_DIR = "logs"
 os.makedirs(LOGS_DIR,exist_ok=True)
 
 LOG_FILE = os.path.join(LOGS_DIR, f"log_{datetime.now().strftime('%Y-%m-%d')}.log")
 
-logging.basicConfig(
-    filename=LOG_FILE,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with time, level, logger, message and any exception"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Per-logger sampling (keep 1 in N) and rate limits (records/second) for INFO and below
+
+    Warnings and errors always pass. Loggers are matched by name or by any parent name, so a
+    limit on "src" covers "src.micro_batcher" too.
+    """
+
+    def __init__(self, sample_every=None, rate_limits=None):
+        super().__init__()
+        self.sample_every = {k: int(v) for k, v in (sample_every or {}).items() if v and int(v) > 1}
+        self.rate_limits = {k: float(v) for k, v in (rate_limits or {}).items() if v}
+        self._counts = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def _rule(self, rules, name):
+        while name:
+            if name in rules:
+                return name, rules[name]
+            name = name.rpartition(".")[0]
+        return None, None
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+
+        key, every = self._rule(self.sample_every, record.name)
+        if every:
+            with self._lock:
+                count = self._counts[key] = self._counts.get(key, 0) + 1
+            if count % every != 1:
+                self.dropped += 1
+                return False
+
+        key, rate = self._rule(self.rate_limits, record.name)
+        if rate:
+            now = time.monotonic()
+            with self._lock:
+                tokens, last = self._buckets.get(key, (rate, now))
+                tokens = min(rate, tokens + (now - last) * rate)
+                allowed = tokens >= 1
+                self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            if not allowed:
+                self.dropped += 1
+                return False
+        return True
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues the record with its message merged; formatting happens on the listener thread
+
+    The %-args are merged on the caller's thread, as the stdlib QueueHandler does, because the
+    caller may change a mutable argument after the call returns. Timestamps, JSON and
+    tracebacks are still rendered by the listener.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+_state = {"handler": None, "listener": None, "file_handler": None, "settings": None}
+
+
+def _stop_listener():
+    listener = _state["listener"]
+    if listener is not None:
+        _state["listener"] = None
+        listener.stop()
+
+
+def configure_logging(mode=None, log_format=None, sampling=None, rate_limits=None):
+    """(Re)install the root handler
+
+    mode "sync" writes from the calling thread (the original behaviour); "queue" hands records
+    to a background listener thread that formats and writes them. log_format is "text" or
+    "json". Defaults come from the logging section of config.yaml, and the LOG_MODE/LOG_FORMAT
+    environment variables override mode and format.
+    """
+    _stop_listener()
+    root = logging.getLogger()
+    for handler in (_state["handler"], _state["file_handler"]):
+        if handler is not None:
+            root.removeHandler(handler)
+            handler.close()
+
+    file_handler = logging.FileHandler(LOG_FILE)
+    file_handler.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(LOG_FORMAT))
+    sampler = SamplingFilter(sampling, rate_limits)
+
+    if mode == "queue":
+        records = queue.SimpleQueue()
+        handler = _DeferredQueueHandler(records)
+        listener = logging.handlers.QueueListener(records, file_handler, respect_handler_level=True)
+        listener.start()
+        _state["listener"] = listener
+    else:
+        handler = file_handler
+
+    # Filtering on the root handler drops sampled-out records before they are queued
+    handler.addFilter(sampler)
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    _state.update(handler=handler, file_handler=file_handler, sampler=sampler,
+                  settings=(mode, log_format, sampling, rate_limits))
+    return sampler
+
+
+def _configure_from_config():
+    try:
+        with open(CONFIG_PATH) as f:
+            config = (yaml.safe_load(f) or {}).get("logging", {})
+    except OSError:
+        config = {}
+    configure_logging(
+        mode=os.environ.get("LOG_MODE", config.get("mode", "sync")),
+        log_format=os.environ.get("LOG_FORMAT", config.get("format", "text")),
+        sampling=config.get("sampling"),
+        rate_limits=config.get("rate_limits"),
+    )
+
+
+def _restart_after_fork():
+    # The listener thread does not exist in a forked child (e.g. gunicorn workers), so the
+    # child gets its own queue and listener
+    if _state["listener"] is not None:
+        _state["listener"] = None
+        configure_logging(*_state["settings"])
+
+
+_configure_from_config()
+atexit.register(_stop_listener)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
 
 def get_logger(name):
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
     return logger
-
@@ -0,0 +1,199 @@
+import threading
+from bisect import bisect_left
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Upper bounds in milliseconds; the last bucket (+Inf) is implicit
+DEFAULT_LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + list(extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{n}="{v}"' for (n, _), v in zip(pairs, escaped)) + "}"
+
+
+class _Sharded:
+    """Per-thread list of numbers; writers touch only their own list, readers sum all of them
+
+    The hot path is an attribute lookup and a list increment with no lock. A lock is only taken
+    the first time a thread records a value, and when the metric is rendered. Both also fold the
+    shards of finished threads into one retired list, so memory follows the live thread count
+    rather than every thread that ever recorded a value.
+    """
+
+    def __init__(self, size):
+        self._size = size
+        self._local = threading.local()
+        self._shards = {}
+        self._retired = [0] * size
+        self._lock = threading.Lock()
+
+    def _reap(self):
+        # A finished thread never writes again, so its shard can be read without racing it
+        for thread in [t for t in self._shards if not t.is_alive()]:
+            for i, value in enumerate(self._shards.pop(thread)):
+                self._retired[i] += value
+
+    def shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = [0] * self._size
+            with self._lock:
+                self._reap()
+                self._shards[threading.current_thread()] = shard
+        return shard
+
+    def totals(self):
+        with self._lock:
+            self._reap()
+            shards = list(self._shards.values())
+            totals = list(self._retired)
+        for shard in shards:
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class _CounterChild(_Sharded):
+
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount=1):
+        self.shard()[0] += amount
+
+    def value(self):
+        return self.totals()[0]
+
+
+class _HistogramChild(_Sharded):
+
+    def __init__(self, buckets):
+        # One slot per bucket, one for +Inf, one for the sum of observations
+        super().__init__(len(buckets) + 2)
+        self.buckets = buckets
+
+    def observe(self, value):
+        shard = self.shard()
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Child metric for one combination of label values, created on first use"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {child.value()}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS_MS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def _render_child(self, values, child):
+        totals = child.totals()
+        lines, cumulative = [], 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], totals[:-1]):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, [("le", bound)])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {totals[-1]}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value read from a callback at scrape time, e.g. a cache size; fn returns {label values: value}"""
+    kind = "gauge"
+
+    def __init__(self, name, help_text, fn, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.fn = fn
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            values = self.fn()
+        except Exception as e:
+            logger.error(f"Error while collecting gauge {self.name}: {e}")
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        for label_values, value in sorted(values.items()):
+            if value is not None:
+                lines.append(f"{self.name}{_format_labels(self.labelnames, label_values)} {float(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """In-process counters, fixed-bucket histograms and callback gauges in Prometheus text format"""
+
+    def __init__(self, namespace=""):
+        self.namespace = namespace
+        self._metrics = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def _name(self, name):
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(self._name(name), help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS_MS):
+        return self._register(Histogram(self._name(name), help_text, labelnames, buckets))
+
+    def gauge(self, name, help_text, fn, labelnames=()):
+        return self._register(Gauge(self._name(name), help_text, fn, labelnames))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,113 @@
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+import numpy as np
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class MicroBatcher:
+    """Collects concurrent single-row requests and scores them in one model call
+
+    A row submitted with a model is scored by that model's predict, so callers can pin the
+    model version they paired with their preprocessing; rows of different models in one
+    collected batch are scored in one call per model. Other rows go to predict_fn.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=2.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait = float(max_wait_ms) / 1000
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._worker = None
+
+        self.batch_sizes = Counter()
+        self.rows_scored = 0
+        self.errors = 0
+
+        logger.info(f"Micro-batching enabled with max_batch_size={self.max_batch_size}, max_wait_ms={max_wait_ms}")
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, row, model=None):
+        """Queue one feature row; the returned Future resolves to that row's prediction"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((np.asarray(row, dtype=np.float64), model, future))
+        return future
+
+    def predict(self, row, model=None, timeout=None):
+        return self.submit(row, model).result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _score(self, model, batch):
+        futures = [future for _, _, future in batch]
+        try:
+            rows = np.vstack([row for row, _, _ in batch])
+            predictions = model.predict(rows) if model is not None else self.predict_fn(rows)
+        except Exception as e:
+            logger.error(f"Error while scoring micro-batch of {len(batch)} rows: {e}")
+            with self._stats_lock:
+                self.errors += 1
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        for future, prediction in zip(futures, predictions):
+            future.set_result(prediction)
+
+        with self._stats_lock:
+            self.batch_sizes[len(batch)] += 1
+            self.rows_scored += len(batch)
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[1]), []).append(item)
+            # _score never raises, so a failing batch cannot kill the worker and strand later callers
+            for group in groups.values():
+                self._score(group[0][1], group)
+
+    def stats(self):
+        with self._stats_lock:
+            sizes = dict(self.batch_sizes)
+            rows_scored, errors = self.rows_scored, self.errors
+        n_batches = sum(sizes.values())
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": n_batches,
+            "rows": rows_scored,
+            "errors": errors,
+            "mean_batch_size": rows_scored / n_batches if n_batches else 0.0,
+            "batch_size_counts": {str(size): count for size, count in sorted(sizes.items())},
+            "queue_depth": self._queue.qsize(),
+        }
@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from src.logger import get_logger
+from src.custom_exception import CustomException
+from src.stage_cache import hash_path
+from utils.common_functions import path_signature
+
+logger = get_logger(__name__)
+
+# One consistent set of serving artifacts; requests take a reference and keep using it even if
+# a newer version is swapped in mid-request
+LoadedModel = namedtuple("LoadedModel", ["model", "preprocessor", "version", "load_time_ms", "loaded_at"])
+
+
+class ModelRegistry:
+    """Holds the serving model, loads it lazily or on warm_up(), and hot-swaps retrained versions
+
+    load_fn() returns (model, preprocessor). A daemon thread polls the files in watch_paths and,
+    once a changed signature has been stable for one poll (so half-written artifacts are not
+    picked up), loads and warms the new version and swaps it in with a single assignment. If
+    loading fails the previous model keeps serving.
+    """
+
+    def __init__(self, load_fn, watch_paths, warmup_fn=None, poll_interval_s=5.0, watch=True):
+        self.load_fn = load_fn
+        self.watch_paths = [p for p in watch_paths if p]
+        self.warmup_fn = warmup_fn
+        self.poll_interval = float(poll_interval_s)
+        self.watch = watch
+
+        self._current = None
+        self._signature_loaded = None
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._watcher_pid = None
+        self._listeners = []
+
+        self.reloads = 0
+        self.reload_errors = 0
+
+    def _signature(self):
+        return tuple(path_signature(p) for p in self.watch_paths)
+
+    def _version(self):
+        digest = None
+        for path in self.watch_paths:
+            if os.path.exists(path):
+                digest = hash_path(path, digest)
+        return digest.hexdigest()[:12] if digest else "unknown"
+
+    def _load(self):
+        start = time.perf_counter()
+        signature = self._signature()
+        model, preprocessor = self.load_fn()
+        if self.warmup_fn is not None:
+            self.warmup_fn(model, preprocessor)
+        load_time_ms = (time.perf_counter() - start) * 1000
+
+        loaded = LoadedModel(model, preprocessor, self._version(), load_time_ms, time.time())
+        logger.info(f"Loaded model version {loaded.version} in {load_time_ms:.1f} ms")
+        return loaded, signature
+
+    def add_listener(self, fn):
+        """fn(loaded_model) is called after every hot swap"""
+        self._listeners.append(fn)
+
+    def _ensure_loaded(self):
+        current = self._current
+        if current is None:
+            with self._lock:
+                if self._current is None:
+                    try:
+                        self._current, self._signature_loaded = self._load()
+                    except Exception as e:
+                        logger.error(f"Error while loading model: {e}")
+                        raise CustomException("Failed to load serving model", e)
+                current = self._current
+        return current
+
+    def get(self):
+        """The current LoadedModel, loading it on first use"""
+        current = self._ensure_loaded()
+        self._ensure_watcher()
+        return current
+
+    def warm_up(self):
+        """Load and prime the model now instead of on the first request
+
+        The watcher is not started here, so a preloading parent process can warm up and fork
+        without running a thread of its own; each serving process starts one on its first get().
+        """
+        return self._ensure_loaded()
+
+    def _ensure_watcher(self):
+        # Threads do not survive fork, so a forked worker starts its own watcher
+        if not self.watch or (self._watcher_pid == os.getpid() and self._watcher.is_alive()):
+            return
+        with self._lock:
+            if self._watcher_pid != os.getpid() or not self._watcher.is_alive():
+                self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+                self._watcher_pid = os.getpid()
+                self._watcher.start()
+
+    def _watch(self):
+        pending = None
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                signature = self._signature()
+                if signature == self._signature_loaded:
+                    pending = None
+                    continue
+                if signature != pending:
+                    # Wait one more poll to make sure the writer has finished
+                    pending = signature
+                    continue
+                self.reload()
+                pending = None
+            except Exception as e:
+                logger.error(f"Error while watching model files: {e}")
+
+    def reload(self):
+        """Load the artifacts on disk and swap them in; the old model serves until the swap"""
+        try:
+            loaded, signature = self._load()
+        except Exception as e:
+            self.reload_errors += 1
+            # Do not retry the same broken files on every poll
+            self._signature_loaded = self._signature()
+            kept = self._current.version if self._current else None
+            logger.error(f"Error while reloading model, keeping version {kept}: {e}")
+            return False
+
+        previous = self._current
+        self._current, self._signature_loaded = loaded, signature
+        self.reloads += 1
+        logger.info(f"Swapped model version {previous.version if previous else None} -> {loaded.version}")
+
+        for fn in self._listeners:
+            fn(loaded)
+        return True
+
+    def stats(self):
+        current = self._current
+        if current is None:
+            return {"loaded": False, "reloads": self.reloads, "reload_errors": self.reload_errors}
+        return {
+            "loaded": True,
+            "version": current.version,
+            "load_time_ms": round(current.load_time_ms, 3),
+            "loaded_at": current.loaded_at,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+            "watching": self.watch,
+            "poll_interval_s": self.poll_interval,
+        }
@@ -0,0 +1,139 @@
+import time
+import pickle
+import warnings
+import numpy as np
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def measure_serving_cost(model, X, single_row_calls=200, batch_rows=1000, batch_calls=5, warmup_calls=5):
+    """Latency of model.predict as application.py calls it, plus the pickled model size
+
+    Single-row calls cycle through the rows of X one (1, n_features) float64 array at a time,
+    like POST /predict; batch calls predict batch_rows rows at once, like /predict_batch.
+    """
+    X = np.ascontiguousarray(np.asarray(X, dtype=np.float64))
+    rows = [X[i:i + 1] for i in range(min(len(X), single_row_calls))]
+    batch = X[:batch_rows]
+
+    single = np.empty(single_row_calls)
+    batched = np.empty(batch_calls)
+    # The app shows sklearn's feature-name warning once; here it would fire and be timed on every call
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        for i in range(warmup_calls):
+            model.predict(rows[i % len(rows)])
+
+        for i in range(single_row_calls):
+            start = time.perf_counter()
+            model.predict(rows[i % len(rows)])
+            single[i] = time.perf_counter() - start
+
+        for i in range(batch_calls):
+            start = time.perf_counter()
+            model.predict(batch)
+            batched[i] = time.perf_counter() - start
+
+    booster = getattr(model, "booster_", None)
+    return {
+        "single_row_p50_ms": float(np.percentile(single, 50) * 1000),
+        "single_row_p99_ms": float(np.percentile(single, 99) * 1000),
+        "batch_p50_ms": float(np.percentile(batched, 50) * 1000),
+        "batch_p99_ms": float(np.percentile(batched, 99) * 1000),
+        "batch_rows": len(batch),
+        "model_mb": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)) / 2**20,
+        "n_trees": booster.num_trees() if booster is not None else None,
+    }
+
+
+def pareto_front(results, score_key="score", cost_key="single_row_p99_ms"):
+    """Results no other result beats on both score (higher) and cost (lower), fastest first"""
+    front, best_score = [], -np.inf
+    for result in sorted(results, key=lambda r: (r[cost_key], -r[score_key])):
+        if result[score_key] > best_score:
+            front.append(result)
+            best_score = result[score_key]
+    return front
+
+
+class LatencyAwareSelector:
+    """Picks the best-scoring search candidate whose serving cost fits a budget
+
+    The top_k candidates by cross-validation score are refit on the full training data and
+    their single-row and batch predict latency and pickled size measured on sample rows. The
+    highest-scoring one within every configured limit wins; when none fits, the candidate with
+    the lowest single-row p99 is taken and budget_met_ is False. results_ holds every
+    measurement and front_ the score/latency Pareto front, whether or not a budget is set.
+    """
+
+    LIMITS = {"max_single_row_p99_ms": "single_row_p99_ms", "max_batch_p99_ms": "batch_p99_ms",
+              "max_model_mb": "model_mb"}
+
+    def __init__(self, top_k=5, max_single_row_p99_ms=None, max_batch_p99_ms=None, max_model_mb=None,
+                 single_row_calls=200, batch_rows=1000, batch_calls=5):
+        self.top_k = int(top_k)
+        self.limits = {"max_single_row_p99_ms": max_single_row_p99_ms, "max_batch_p99_ms": max_batch_p99_ms,
+                       "max_model_mb": max_model_mb}
+        self.single_row_calls = single_row_calls
+        self.batch_rows = batch_rows
+        self.batch_calls = batch_calls
+
+        self.results_ = []
+        self.front_ = []
+        self.budget_met_ = None
+        self.selected_ = None
+
+    def within_budget(self, result):
+        return all(limit is None or result[self.LIMITS[name]] <= limit for name, limit in self.limits.items())
+
+    def select(self, ranked, refit, X_sample, fitted=None):
+        """ranked: [{"params", "score"}] best first; refit(params) -> model; fitted: {rank: model} already fit
+
+        Returns the selected model.
+        """
+        fitted = dict(fitted or {})
+        models = []
+        self.results_ = []
+        for rank, candidate in enumerate(ranked[:self.top_k]):
+            model = fitted[rank] if rank in fitted else refit(candidate["params"])
+            cost = measure_serving_cost(model, X_sample, self.single_row_calls, self.batch_rows, self.batch_calls)
+            params = {k: v.item() if isinstance(v, np.generic) else v for k, v in candidate["params"].items()}
+            result = {"rank": rank, "score": float(candidate["score"]), "params": params, **cost}
+            result["within_budget"] = self.within_budget(result)
+            self.results_.append(result)
+            models.append(model)
+            logger.info(f"Candidate {rank}: score {result['score']:.4f}, single-row p99 "
+                        f"{result['single_row_p99_ms']:.2f} ms, batch of {result['batch_rows']} p99 "
+                        f"{result['batch_p99_ms']:.1f} ms, {result['model_mb']:.2f} MB, {result['n_trees']} trees")
+
+        self.front_ = pareto_front(self.results_)
+        within = [r for r in self.results_ if r["within_budget"]]
+        self.budget_met_ = bool(within)
+        if within:
+            self.selected_ = max(within, key=lambda r: r["score"])
+        else:
+            self.selected_ = min(self.results_, key=lambda r: r["single_row_p99_ms"])
+            logger.warning(f"No candidate fits the serving budget {self.limits}; taking the fastest, "
+                           f"candidate {self.selected_['rank']}")
+        logger.info(f"Selected candidate {self.selected_['rank']} of {len(self.results_)} "
+                    f"({len(within)} within budget, {len(self.front_)} on the Pareto front)")
+        return models[self.selected_["rank"]]
+
+    def metrics(self):
+        """Serving cost of the selected model for mlflow.log_metrics"""
+        selected = self.selected_
+        return {
+            "serving_single_row_p50_ms": selected["single_row_p50_ms"],
+            "serving_single_row_p99_ms": selected["single_row_p99_ms"],
+            "serving_batch_p99_ms": selected["batch_p99_ms"],
+            "serving_model_mb": selected["model_mb"],
+            "serving_budget_met": float(self.budget_met_),
+            "serving_candidates_measured": len(self.results_),
+            "serving_selected_rank": selected["rank"],
+        }
+
+    def report(self):
+        """JSON-friendly measurements, budget and Pareto front for an MLflow artifact"""
+        return {"limits": self.limits, "selected_rank": self.selected_["rank"], "budget_met": self.budget_met_,
+                "candidates": self.results_, "pareto_front": [r["rank"] for r in self.front_]}
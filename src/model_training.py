@@ -1,4 +1,6 @@
 import os
+import time
+import numpy as np
 import pandas as pd
 import joblib
 from sklearn.model_selection import RandomizedSearchCV
@@ -8,7 +10,16 @@ from src.logger import get_logger
 from src.custom_exception import CustomException
 from config.paths_config import *
 from config.model_params import *
-from utils.common_functions import read_yaml,load_data
+from utils.common_functions import read_yaml,load_data,iter_data_chunks
+from src.tree_predictor import TreeEnsemblePredictor
+from src.hyperparameter_search import SuccessiveHalvingSearch
+from src.balancing import scale_pos_weight
+from src.profiling import profiler, profiled
+from src.streaming_dataset import StreamingDatasetBuilder
+from src.dag import DAGRunner
+from src.artifact_logger import AsyncArtifactLogger
+from src.model_selection import LatencyAwareSelector
+from src.drift_monitor import build_reference, save_reference
 from scipy.stats import randint
 
 import mlflow
@@ -18,14 +29,41 @@ logger = get_logger(__name__)
 
 class ModelTraining:
 
-    def __init__(self,train_path,test_path,model_output_path):
+    def __init__(self,train_path,test_path,model_output_path,tree_model_output_path=TREE_MODEL_OUTPUT_PATH,config_path=CONFIG_PATH):
         self.train_path = train_path
         self.test_path = test_path
         self.model_output_path = model_output_path
+        self.tree_model_output_path = tree_model_output_path
+
+        self.config = read_yaml(config_path)
+        self.balancing_method = self.config["data_processing"].get("balancing", {}).get("method", "smote")
+
+        # "streaming" never loads the processed data into pandas; see build_train_dataset
+        self.data_loading = self.config.get("model_training", {}).get("data_loading", {})
+        self.data_loading_mode = self.data_loading.get("mode", "in_memory")
+        self.chunk_rows = int(self.data_loading.get("chunk_rows", 100000))
+
+        self.dag_config = self.config.get("pipeline", {}).get("dag", {})
+        self.dag = None
+
+        self.artifact_config = self.config.get("model_training", {}).get("artifact_logging", {})
+        self.artifacts = None
+
+        # With latency_aware, the top search candidates are refit and timed before one is chosen
+        self.selection_config = dict(self.config.get("model_training", {}).get("model_selection", {}))
+        self.model_selection = None
+
+        # Reference sketches for the serving drift monitor, written before the model it describes
+        self.drift_config = self.config.get("serving", {}).get("drift", {})
+        self.drift_reference_path = DRIFT_REFERENCE_PATH
 
         self.params_dist = LIGHTGM_PARAMS
         self.random_search_params = RANDOM_SEARCH_PARAMS
+        self.search_strategy = SEARCH_STRATEGY
+        self.halving_search_params = HALVING_SEARCH_PARAMS
+        self.search_metrics = {}
 
+    @profiled()
     def load_and_split_data(self):
         try:
             logger.info(f"Loading data from {self.train_path}")
@@ -47,11 +85,41 @@ class ModelTraining:
             logger.error(f"Error while loading data {e}")
             raise CustomException("Failed to load data" ,  e)
         
+    @profiled()
+    def build_train_dataset(self):
+        """Binned lgb.Dataset streamed from the processed train artifact, reused from its binary cache"""
+        builder = StreamingDatasetBuilder(
+            LGB_DATASET_DIR,
+            chunk_rows=self.chunk_rows,
+            dataset_params=self.data_loading.get("dataset_params"),
+            reuse_binary=self.data_loading.get("reuse_binary", True),
+            max_entries=self.data_loading.get("max_cached_datasets", 3)
+        )
+        train_set = builder.build(self.train_path)
+        self.search_metrics["train_dataset_build_s"] = builder.last_build["seconds"]
+        self.search_metrics["train_dataset_from_binary"] = float(builder.last_build["source"] == "binary")
+        profiler.annotate(rows_out=train_set.num_data())
+        return train_set
+
+    def class_weight_params(self,y_train):
+        """With class_weight balancing the data is left imbalanced and LightGBM reweights positives"""
+        if self.balancing_method != "class_weight":
+            return {}
+        weight = scale_pos_weight(y_train)
+        logger.info(f"Using scale_pos_weight={weight:.3f} instead of resampled data")
+        return {"scale_pos_weight": weight}
+
+    @profiled()
     def train_lgbm(self,X_train,y_train):
         try:
+            if self.search_strategy == "successive_halving" or isinstance(X_train, lgb.Dataset):
+                # RandomizedSearchCV needs the raw frame, so streaming training always halves
+                return self.train_lgbm_halving(X_train,y_train)
+
             logger.info("Intializing our model")
 
-            lgbm_model = lgb.LGBMClassifier(random_state=self.random_search_params["random_state"])
+            lgbm_model = lgb.LGBMClassifier(random_state=self.random_search_params["random_state"],
+                                            **self.class_weight_params(y_train))
 
             logger.info("Starting our Hyperparamter tuning")
 
@@ -68,6 +136,7 @@ class ModelTraining:
 
             logger.info("Starting our Hyperparamter tuning")
 
+            search_start = time.perf_counter()
             random_search.fit(X_train,y_train)
 
             logger.info("Hyperparamter tuning completed")
@@ -75,14 +144,75 @@ class ModelTraining:
             best_params = random_search.best_params_
             best_lgbm_model = random_search.best_estimator_
 
+            self.search_metrics = {
+                "search_wall_time_s" : time.perf_counter() - search_start,
+                "search_trials" : self.random_search_params["n_iter"] * self.random_search_params["cv"],
+                "search_boost_rounds" : int(sum(random_search.cv_results_["param_n_estimators"])) * self.random_search_params["cv"],
+                "search_best_cv_score" : float(random_search.best_score_)
+            }
+
             logger.info(f"Best paramters are : {best_params}")
 
-            return best_lgbm_model
+            results = random_search.cv_results_
+            ranked = [{"params": results["params"][i], "score": results["mean_test_score"][i]}
+                      for i in np.argsort(results["rank_test_score"], kind="stable")]
+            return self.select_for_serving(
+                ranked, best_lgbm_model,
+                lambda params: lgb.LGBMClassifier(random_state=self.random_search_params["random_state"],
+                                                  **self.class_weight_params(y_train), **params).fit(X_train,y_train))
         
         except Exception as e:
             logger.error(f"Error while training model {e}")
             raise CustomException("Failed to train model" ,  e)
+
+    def train_lgbm_halving(self,X_train,y_train):
+        try:
+            logger.info("Starting successive halving Hyperparamter tuning")
+
+            # With a streamed Dataset the labels live inside it
+            labels = X_train.get_label() if isinstance(X_train, lgb.Dataset) else y_train
+            search = SuccessiveHalvingSearch(self.params_dist, **self.halving_search_params,
+                                             fixed_params=self.class_weight_params(labels))
+            search.fit(X_train,y_train)
+
+            self.search_metrics.update({
+                "search_wall_time_s" : search.wall_time_s_,
+                "search_trials" : search.n_trials_,
+                "search_boost_rounds" : search.total_boost_rounds_,
+                "search_best_cv_score" : search.best_score_
+            })
+
+            logger.info(f"Best paramters are : {search.best_params_}")
+
+            return self.select_for_serving(search.ranking_, search.best_estimator_,
+                                           lambda params: search.refit(params, X_train, y_train))
+
+        except Exception as e:
+            logger.error(f"Error while training model {e}")
+            raise CustomException("Failed to train model" ,  e)
     
+    @profiled()
+    def select_for_serving(self,ranked,best_model,refit):
+        """Best-scoring candidate within the serving latency/size budget; best_model when disabled"""
+        if not self.selection_config.get("latency_aware", False):
+            return best_model
+        try:
+            options = {k: v for k, v in self.selection_config.items() if k != "latency_aware"}
+            selector = LatencyAwareSelector(**options)
+            # Latency is measured on held-out rows, one chunk read from the test artifact
+            sample_rows = max(selector.single_row_calls, selector.batch_rows)
+            X_sample = next(iter_data_chunks(self.test_path, sample_rows)).drop(columns=["booking_status"])
+
+            model = selector.select(ranked, refit, X_sample, fitted={0: best_model})
+            self.model_selection = selector
+            self.search_metrics.update(selector.metrics())
+            return model
+
+        except Exception as e:
+            logger.error(f"Error while selecting the model for serving {e}")
+            raise CustomException("Failed to select model for serving" ,  e)
+
+    @profiled()
     def evaluate_model(self , model , X_test , y_test):
         try:
             logger.info("Evaluating our model")
@@ -109,6 +239,30 @@ class ModelTraining:
             logger.error(f"Error while evaluating model {e}")
             raise CustomException("Failed to evaluate model" ,  e)
         
+    @profiled()
+    def evaluate_model_streaming(self , model):
+        """evaluate_model over the test artifact one chunk at a time; keeps only labels in memory"""
+        try:
+            logger.info("Evaluating our model on streamed test chunks")
+
+            y_true, y_pred = [], []
+            for chunk in iter_data_chunks(self.test_path, self.chunk_rows):
+                y_true.append(chunk["booking_status"].to_numpy())
+                y_pred.append(model.predict(chunk.drop(columns=["booking_status"])))
+            y_true, y_pred = np.concatenate(y_true), np.concatenate(y_pred)
+            profiler.annotate(rows_in=len(y_true))
+
+            return {
+                "accuracy" : accuracy_score(y_true,y_pred),
+                "precison" : precision_score(y_true,y_pred),
+                "recall" : recall_score(y_true,y_pred),
+                "f1" : f1_score(y_true,y_pred)
+            }
+        except Exception as e:
+            logger.error(f"Error while evaluating model {e}")
+            raise CustomException("Failed to evaluate model" ,  e)
+
+    @profiled()
     def save_model(self,model):
         try:
             os.makedirs(os.path.dirname(self.model_output_path),exist_ok=True)
@@ -116,33 +270,134 @@ class ModelTraining:
             logger.info("saving the model")
             joblib.dump(model , self.model_output_path)
             logger.info(f"Model saved to {self.model_output_path}")
+            return self.model_output_path
 
         except Exception as e:
             logger.error(f"Error while saving model {e}")
             raise CustomException("Failed to save model" ,  e)
+
+    @profiled()
+    def export_tree_model(self,model,X_check=None):
+        """Flatten the booster into NumPy tree tables for the serving app"""
+        try:
+            logger.info("Exporting the model to tree tables")
+            tree_model = TreeEnsemblePredictor.from_model(model)
+
+            if X_check is not None:
+                expected = model.predict_proba(X_check)[:, 1]
+                actual = tree_model.predict_proba(X_check.to_numpy(dtype="float64"))[:, 1]
+                max_diff = float(abs(expected - actual).max())
+                logger.info(f"Tree tables max probability difference vs LightGBM : {max_diff}")
+                if max_diff > 1e-9:
+                    raise ValueError(f"Tree tables disagree with LightGBM by {max_diff}")
+
+            tree_model.save(self.tree_model_output_path)
+            logger.info(f"Tree tables saved to {self.tree_model_output_path}")
+
+        except Exception as e:
+            logger.error(f"Error while exporting tree tables {e}")
+            raise CustomException("Failed to export tree tables" ,  e)
     
+    @profiled()
+    def build_drift_reference(self,model):
+        """Sketch the processed training features and the model's predictions for the drift monitor"""
+        if not self.drift_config.get("enabled", False):
+            return None
+        try:
+            reference = build_reference(
+                self.train_path, model,
+                categorical_columns=self.config["data_processing"]["categorical_columns"],
+                bins=self.drift_config.get("bins", 50),
+                psi_groups=self.drift_config.get("psi_groups", 10),
+                reference_rows=self.drift_config.get("reference_rows", 200000),
+                chunk_rows=self.chunk_rows
+            )
+            save_reference(reference, self.drift_reference_path)
+            logger.info(f"Drift reference saved to {self.drift_reference_path}")
+            return self.drift_reference_path
+
+        except Exception as e:
+            logger.error(f"Error while building drift reference {e}")
+            raise CustomException("Failed to build drift reference" ,  e)
+
+    def log_dataset(self,path,artifacts):
+        # npy artifacts are directories of column blocks; both upload under datasets/
+        return artifacts.log_artifact(path , artifact_path="datasets")
+
+    def build_dag(self,artifacts):
+        """Training steps as a DAG; the model upload is queued on artifacts once it is saved"""
+        cpu_budget = self.dag_config.get("cpu_budget") if self.dag_config.get("enabled", False) else 1
+        dag = DAGRunner("model_training", cpu_budget)
+
+        if self.data_loading_mode == "streaming":
+            dag.add("build_train_dataset", self.build_train_dataset, outputs="train_set")
+            dag.add("train_lgbm", lambda train_set: self.train_lgbm(train_set, None), ["train_set"], "model",
+                    cpus=None)
+            dag.add("evaluate_model", self.evaluate_model_streaming, ["model"], "metrics")
+            # The tree-table export is checked on the first test chunk
+            dag.add("load_check_rows", lambda: next(iter_data_chunks(self.test_path, self.chunk_rows))
+                    .drop(columns=["booking_status"]), outputs="X_test")
+        else:
+            dag.add("load_and_split_data", self.load_and_split_data,
+                    outputs=["X_train", "y_train", "X_test", "y_test"])
+            dag.add("train_lgbm", self.train_lgbm, ["X_train", "y_train"], "model", cpus=None)
+            dag.add("evaluate_model", self.evaluate_model, ["model", "X_test", "y_test"], "metrics")
+
+        dag.add("build_drift_reference", self.build_drift_reference, ["model"], "drift_reference")
+        # The serving app watches only the model file, so the reference it reloads must be written first
+        dag.add("save_model", lambda model, _: self.save_model(model), ["model", "drift_reference"], "model_saved")
+        dag.add("export_tree_model", self.export_tree_model, ["model", "X_test"])
+        dag.add("queue_model_upload", lambda _: artifacts.log_artifact(self.model_output_path),
+                ["model_saved"], cpus=0)
+        dag.add("queue_drift_reference_upload",
+                lambda path: path and artifacts.log_artifact(path), ["drift_reference"], cpus=0)
+        return dag
+
     def run(self):
         try:
-            with mlflow.start_run():
+            with mlflow.start_run() as run, AsyncArtifactLogger(
+                    run.info.run_id,
+                    dedup=self.artifact_config.get("dedup", False),
+                    background=self.artifact_config.get("background", False)) as artifacts:
                 logger.info("Starting our Model Training pipeline")
 
                 logger.info("Starting our MLFLOW experimentation")
 
-                logger.info("Logging the training and testing datset to MLFLOW")
-                mlflow.log_artifact(self.train_path , artifact_path="datasets")
-                mlflow.log_artifact(self.test_path , artifact_path="datasets")
-
-                X_train,y_train,X_test,y_test =self.load_and_split_data()
-                best_lgbm_model = self.train_lgbm(X_train,y_train)
-                metrics = self.evaluate_model(best_lgbm_model ,X_test , y_test)
-                self.save_model(best_lgbm_model)
+                logger.info("Logging the datasets to MLFLOW in the background")
+                self.artifacts = artifacts
+                self.log_dataset(self.train_path, artifacts)
+                self.log_dataset(self.test_path, artifacts)
 
-                logger.info("Logging the model into MLFLOW")
-                mlflow.log_artifact(self.model_output_path)
+                logger.info("Training and evaluating the model")
+                dag = self.dag = self.build_dag(artifacts)
+                results = dag.run()
+                best_lgbm_model, metrics = results["model"], results["metrics"]
 
                 logger.info("Logging Params and metrics to MLFLOW")
                 mlflow.log_params(best_lgbm_model.get_params())
                 mlflow.log_metrics(metrics)
+                mlflow.log_metrics(self.search_metrics)
+                mlflow.log_param("search_strategy", self.search_strategy)
+                mlflow.log_param("data_loading_mode", self.data_loading_mode)
+                if self.model_selection is not None:
+                    # Score and serving cost per candidate, stepped by CV rank, beside the chosen model's
+                    for result in self.model_selection.results_:
+                        mlflow.log_metrics({"candidate_cv_score": result["score"],
+                                            "candidate_single_row_p99_ms": result["single_row_p99_ms"],
+                                            "candidate_batch_p99_ms": result["batch_p99_ms"],
+                                            "candidate_model_mb": result["model_mb"]}, step=result["rank"])
+                    mlflow.log_dict(self.model_selection.report(), "model_selection.json")
+
+                logger.info("Logging per-stage timing and memory to MLFLOW")
+                mlflow.log_metrics(profiler.metrics())
+                mlflow.log_metrics(dag.metrics())
+                mlflow.log_text(dag.report(), "dag_model_training.txt")
+
+                logger.info("Waiting for pending artifact uploads")
+                artifacts.wait()
+                mlflow.log_metrics(artifacts.metrics())
+                mlflow.log_artifact(profiler.write_summary(RUN_SUMMARY_PATH, extra={"dag": {dag.name: dag.summary()},
+                                                                                    "artifacts": artifacts.records}))
 
                 logger.info("Model Training sucesfullly completed")
 
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PredictionCache:
+    """Bounded LRU cache of single-booking predictions keyed on the form-order feature vector
+
+    Keys are the 10 features as floats, with avg_price_per_room optionally rounded to
+    price_quantum so near-identical quotes share an entry; the model then scores the rounded
+    vector, so a cached answer is always what the model says for its key. Entries expire after
+    ttl_seconds; the serving app calls invalidate() whenever a new model version is swapped in.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=None, price_index=None, price_quantum=None):
+        self.max_entries = int(max_entries)
+        self.ttl = float(ttl_seconds) if ttl_seconds else None
+        self.price_index = price_index
+        self.price_quantum = float(price_quantum) if price_quantum else None
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by invalidate(); a miss scored before the bump is not stored after it
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_results = 0
+
+        logger.info(f"Prediction cache enabled with max_entries={self.max_entries}, ttl_seconds={ttl_seconds}, "
+                    f"price_quantum={price_quantum}")
+
+    def normalize(self, row):
+        row = np.asarray(row, dtype=np.float64).copy()
+        if self.price_quantum and self.price_index is not None:
+            row[self.price_index] = np.round(row[self.price_index] / self.price_quantum) * self.price_quantum
+        return row
+
+    def invalidate(self, reason="manual"):
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._generation += 1
+            self.invalidations += 1
+        logger.info(f"Prediction cache invalidated ({reason}), dropped {dropped} entries")
+
+    def get_or_compute(self, row, predict_fn):
+        """Cached prediction for one row; on a miss predict_fn(normalized row) is called outside the lock"""
+        now = time.monotonic()
+
+        row = self.normalize(row)
+        key = row.tobytes()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                prediction, expires = entry
+                if expires is None or expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return prediction
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            generation = self._generation
+
+        prediction = predict_fn(row)
+
+        with self._lock:
+            if generation != self._generation:
+                # The model changed while this row was scored; answer it, but do not cache the old model's result
+                self.stale_results += 1
+                return prediction
+            self._entries[key] = (prediction, now + self.ttl if self.ttl else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return prediction
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "price_quantum": self.price_quantum,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_results": self.stale_results,
+        }
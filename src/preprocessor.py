@@ -0,0 +1,167 @@
+import joblib
+import numpy as np
+import pandas as pd
+from src.logger import get_logger
+from src.custom_exception import CustomException
+from src.batch_scoring import BatchValidationError
+from utils.common_functions import downcast_column, smallest_int_dtype
+
+logger = get_logger(__name__)
+
+
+class BookingPreprocessor:
+    """Fit-once / transform-many encoder for raw booking rows
+
+    Holds the category -> code maps (same codes LabelEncoder would give), the columns
+    that get log1p for skewness and the feature order selected for the model. With
+    compact_dtypes, transform() also downcasts every column to the narrowest dtype holding its
+    values, so the frames handed to balancing, feature selection and training are smaller.
+    """
+
+    def __init__(self, categorical_columns, numerical_columns, skewness_threshold, compact_dtypes=False,
+                 float32_rtol=1e-6):
+        self.categorical_columns = list(categorical_columns)
+        self.numerical_columns = list(numerical_columns)
+        self.skewness_threshold = skewness_threshold
+        self.compact_dtypes = compact_dtypes
+        self.float32_rtol = float32_rtol
+
+        self.category_maps = {}
+        self.log1p_columns = []
+        self.feature_order = None
+        self._plans = {}
+
+    def fit(self, df):
+        try:
+            logger.info("Fitting preprocessor")
+
+            self.category_maps = {}
+            for col in self.categorical_columns:
+                if col in df.columns:
+                    classes = np.sort(df[col].astype(str).unique())
+                    self.category_maps[col] = {label: code for code, label in enumerate(classes)}
+
+            for col, mapping in self.category_maps.items():
+                logger.info(f"{col} : {mapping}")
+
+            num_cols = [c for c in self.numerical_columns if c in df.columns]
+            skewness = df[num_cols].skew()
+            self.log1p_columns = list(skewness[skewness > self.skewness_threshold].index)
+            logger.info(f"Columns with skewness above {self.skewness_threshold} : {self.log1p_columns}")
+
+            self._plans = {}
+            return self
+
+        except Exception as e:
+            logger.error(f"Error while fitting preprocessor {e}")
+            raise CustomException("Failed to fit preprocessor", e)
+
+    def set_feature_order(self, features):
+        self.feature_order = list(features)
+        self._plans = {}
+
+    def transform(self, df, compact=None):
+        """Encode categories and apply log1p in one pass over the columns of raw booking rows
+
+        Returns a new frame and never modifies df. compact (default: compact_dtypes) also
+        downcasts each column: codes and counts to int8/int16/int32, floats to float32 when every
+        value survives within float32_rtol.
+        """
+        try:
+            # Preprocessors pickled before compact_dtypes existed keep the wide dtypes
+            compact = getattr(self, "compact_dtypes", False) if compact is None else compact
+            float32_rtol = getattr(self, "float32_rtol", 1e-6)
+
+            columns = {}
+            for col in df.columns:
+                if col in self.category_maps:
+                    values = self._encode(col, df[col], compact)
+                elif col in self.log1p_columns:
+                    values = df[col].to_numpy(dtype=np.float64, copy=True)
+                    np.log1p(values, out=values)
+                else:
+                    values = df[col]
+                columns[col] = downcast_column(values, float32_rtol) if compact else values
+
+            return pd.DataFrame(columns, index=df.index, copy=False)
+
+        except Exception as e:
+            logger.error(f"Error while transforming data {e}")
+            raise CustomException("Failed to transform data with preprocessor", e)
+
+    def _encode(self, col, values, compact):
+        """Codes of one categorical column; unseen categories become -1"""
+        mapping = self.category_maps[col]
+        # Encode the few distinct values once, then broadcast their codes to every row
+        labels, uniques = pd.factorize(values, use_na_sentinel=False)
+        lookup = pd.Index(list(mapping.keys())).get_indexer(pd.Index(uniques).astype(str))
+        unseen = np.flatnonzero(lookup < 0)
+        if len(unseen):
+            logger.warning(f"{int(np.isin(labels, unseen).sum())} unseen categories in {col} encoded as -1")
+        # Compact codes are cast while still one per distinct value, never as an int64 column
+        code_dtype = smallest_int_dtype(-1, len(mapping) - 1) if compact else np.int64
+        return lookup.astype(code_dtype)[labels]
+
+    def to_model_input(self, df):
+        """Raw booking rows -> float64 matrix in the selected feature order
+
+        Numeric columns get the same checks as build_feature_matrix (numeric, finite,
+        non-negative); a bad value raises BatchValidationError naming its column and row.
+        """
+        if self.feature_order is None:
+            raise CustomException("Preprocessor has no selected feature order")
+        missing = [c for c in self.feature_order if c not in df.columns]
+        if missing:
+            raise CustomException(f"Missing features for the model: {missing}")
+
+        df = df[self.feature_order]
+        for col in self.feature_order:
+            if col in self.category_maps:
+                continue
+            values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+            bad_rows = np.flatnonzero(np.isnan(values) & df[col].notna().to_numpy())
+            if bad_rows.size:
+                raise BatchValidationError(f"Column '{col}' has a non-numeric value at row {bad_rows[0]}: "
+                                           f"{df[col].iloc[bad_rows[0]]!r}")
+            bad_rows = np.flatnonzero(~np.isfinite(values) | (values < 0))
+            if bad_rows.size:
+                raise BatchValidationError(f"Column '{col}' must be finite and non-negative, see row {bad_rows[0]}")
+
+        try:
+            return self.transform(df, compact=False).to_numpy(dtype=np.float64)
+        except (TypeError, ValueError) as e:
+            raise BatchValidationError(f"Could not convert bookings to model features: {e}")
+
+    def covers(self, columns):
+        return self.feature_order is not None and set(self.feature_order) == set(columns)
+
+    def align_encoded(self, features, columns):
+        """Reorder an already-encoded matrix to the model's feature order and apply log1p"""
+        columns = tuple(columns)
+        plan = self._plans.get(columns)
+        if plan is None:
+            order = [columns.index(c) for c in self.feature_order]
+            log_positions = [i for i, c in enumerate(self.feature_order) if c in self.log1p_columns]
+            plan = self._plans[columns] = (order, log_positions)
+
+        order, log_positions = plan
+        aligned = features[:, order]
+        if log_positions:
+            aligned[:, log_positions] = np.log1p(aligned[:, log_positions])
+        return aligned
+
+    def save(self, path):
+        try:
+            joblib.dump(self, path)
+            logger.info(f"Preprocessor saved to {path}")
+        except Exception as e:
+            logger.error(f"Error while saving preprocessor {e}")
+            raise CustomException("Failed to save preprocessor", e)
+
+    @staticmethod
+    def load(path):
+        try:
+            return joblib.load(path)
+        except Exception as e:
+            logger.error(f"Error while loading preprocessor {e}")
+            raise CustomException("Failed to load preprocessor", e)
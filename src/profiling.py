@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import cProfile
+import functools
+import threading
+from contextlib import contextmanager
+from src.logger import get_logger
+from utils.common_functions import peak_rss_mb, reset_peak_rss
+
+logger = get_logger(__name__)
+
+
+def _shape(value):
+    """(rows, columns) of a DataFrame/array, of the first element of a tuple result, else None"""
+    if isinstance(value, tuple) and value:
+        value = value[0]
+    shape = getattr(value, "shape", None)
+    if not shape:
+        return None
+    return int(shape[0]), int(shape[1]) if len(shape) > 1 else 1
+
+
+class StageProfiler:
+    """Wall time, CPU time, peak RSS and rows/columns in and out of each pipeline stage
+
+    Stages are wrapped with @profiled("name") (or the stage() context manager) and appended to
+    records in the order they finish. Peak RSS is reset when a stage starts while no other stage
+    is running; nested or concurrent stages share the high-water mark, so their peak is an
+    upper bound. Stages listed in cprofile_stages also write a cProfile dump to profile_dir.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.cprofile_stages = set()
+        self.profile_dir = None
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._active = 0
+
+    def configure(self, cprofile_stages=(), profile_dir=None):
+        self.cprofile_stages = set(cprofile_stages or ())
+        self.profile_dir = profile_dir
+
+    def reset(self):
+        with self._lock:
+            self.records = []
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def stage(self, name, data_in=None):
+        stack = self._stack()
+        with self._lock:
+            if self._active == 0:
+                reset_peak_rss()
+            self._active += 1
+
+        frame = {"stage": name, "shape_in": _shape(data_in), "shape_out": None, "child_peak_mb": 0.0}
+        stack.append(frame)
+        rss_before = peak_rss_mb()
+
+        profile = None
+        if name in self.cprofile_stages:
+            profile = cProfile.Profile()
+            profile.enable()
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield frame
+        finally:
+            wall_s = time.perf_counter() - wall
+            cpu_s = time.process_time() - cpu
+            if profile is not None:
+                profile.disable()
+                self._dump(name, profile)
+
+            stack.pop()
+            depth = len(stack)
+            peak = max(peak_rss_mb(), frame["child_peak_mb"])
+            if stack:
+                stack[-1]["child_peak_mb"] = max(stack[-1]["child_peak_mb"], peak)
+
+            rows_in, cols_in = frame["shape_in"] or (None, None)
+            rows_out, cols_out = frame["shape_out"] or (None, None)
+            record = {
+                "stage": name,
+                "depth": depth,
+                "wall_s": wall_s,
+                "cpu_s": cpu_s,
+                "peak_rss_mb": peak,
+                "peak_rss_delta_mb": max(0.0, peak - rss_before),
+                "rows_in": rows_in,
+                "cols_in": cols_in,
+                "rows_out": rows_out,
+                "cols_out": cols_out,
+            }
+            with self._lock:
+                self._active -= 1
+                self.records.append(record)
+            logger.info(f"Stage {name}: {wall_s:.2f}s wall, {cpu_s:.2f}s CPU, peak RSS {peak:.0f} MB "
+                        f"(+{record['peak_rss_delta_mb']:.0f}), rows {rows_in} -> {rows_out}")
+
+    def annotate(self, data_in=None, data_out=None, rows_in=None, rows_out=None):
+        """Set the current stage's input/output size when it is not an argument or return value"""
+        frame = self._stack()[-1]
+        if data_in is not None:
+            frame["shape_in"] = _shape(data_in)
+        if data_out is not None:
+            frame["shape_out"] = _shape(data_out)
+        if rows_in is not None:
+            frame["shape_in"] = (int(rows_in), (frame["shape_in"] or (None, None))[1])
+        if rows_out is not None:
+            frame["shape_out"] = (int(rows_out), (frame["shape_out"] or (None, None))[1])
+
+    def profiled(self, name=None):
+        """Decorator for stage methods; the first array-like argument after self is the input"""
+        def decorator(fn):
+            stage_name = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                data_in = next((a for a in args[1:] if _shape(a) is not None), None)
+                with self.stage(stage_name, data_in) as frame:
+                    result = fn(*args, **kwargs)
+                    if _shape(result) is not None:
+                        frame["shape_out"] = _shape(result)
+                    return result
+            return wrapper
+        return decorator
+
+    def _dump(self, name, profile):
+        directory = self.profile_dir or "."
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}.prof")
+        profile.dump_stats(path)
+        logger.info(f"cProfile dump for {name} written to {path} (view with python -m pstats or snakeviz)")
+
+    def metrics(self):
+        """Flat {stage.<name>.<field>: value} dict for mlflow.log_metrics; repeated stages are summed"""
+        metrics = {}
+        for record in self.records:
+            prefix = f"stage.{record['stage']}"
+            for field in ("wall_s", "cpu_s"):
+                metrics[f"{prefix}.{field}"] = metrics.get(f"{prefix}.{field}", 0.0) + record[field]
+            for field in ("peak_rss_mb", "peak_rss_delta_mb"):
+                metrics[f"{prefix}.{field}"] = max(metrics.get(f"{prefix}.{field}", 0.0), record[field])
+            for field in ("rows_in", "cols_in", "rows_out", "cols_out"):
+                if record[field] is not None:
+                    metrics[f"{prefix}.{field}"] = record[field]
+        return metrics
+
+    def write_summary(self, path, extra=None):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        summary = {
+            "created": time.time(),
+            "total_wall_s": sum(r["wall_s"] for r in self.records if r["depth"] == 0),
+            "peak_rss_mb": max((r["peak_rss_mb"] for r in self.records), default=None),
+            "stages": self.records,
+            **(extra or {}),
+        }
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
+        return path
+
+
+# Process-wide profiler shared by every pipeline stage
+profiler = StageProfiler()
+profiled = profiler.profiled
@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+from src.logger import get_logger
+from src.custom_exception import CustomException
+
+logger = get_logger(__name__)
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def hash_path(path, digest=None):
+    """Content hash of a file, or of every file under a directory in sorted order"""
+    digest = digest or hashlib.sha256()
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, path).encode())
+                hash_path(file_path, digest)
+    else:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+    return digest
+
+
+def _copy_file(src, dst):
+    # Written beside the target and renamed over it, like TreeEnsemblePredictor.save: a process
+    # that memory-maps dst keeps the old inode and never sees a half-written file
+    shutil.copy2(src, f"{dst}.tmp")
+    os.replace(f"{dst}.tmp", dst)
+
+
+def _copy(src, dst):
+    if os.path.isdir(dst) and not os.path.isdir(src):
+        shutil.rmtree(dst)
+    elif os.path.isfile(dst) and os.path.isdir(src):
+        os.remove(dst)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if not os.path.isdir(src):
+        _copy_file(src, dst)
+        return
+
+    # Directories are updated file by file in place, never removed, so readers always find them
+    copied = set()
+    for root, _, files in os.walk(src):
+        target_root = os.path.join(dst, os.path.relpath(root, src))
+        os.makedirs(target_root, exist_ok=True)
+        for name in files:
+            _copy_file(os.path.join(root, name), os.path.join(target_root, name))
+            copied.add(os.path.normpath(os.path.join(target_root, name)))
+    for root, _, files in os.walk(dst):
+        for name in files:
+            path = os.path.normpath(os.path.join(root, name))
+            if path not in copied:
+                os.remove(path)
+
+
+class StageCache:
+    """Reuses a stage's outputs when its inputs, config and params are unchanged
+
+    Each entry lives in <cache_dir>/<stage>/<fingerprint>/ with a copy of the outputs and a
+    manifest.json recording how long the stage took, so a hit can report the time it saved.
+    """
+
+    def __init__(self, cache_dir, max_entries_per_stage=3, max_age_days=None, force=False, enabled=True, stages=()):
+        self.cache_dir = cache_dir
+        # What invalidate() drops by default; cache_dir also holds other caches (feature_selection, lgb_dataset)
+        self.stages = list(stages)
+        self.max_entries_per_stage = max_entries_per_stage
+        self.max_age_days = max_age_days
+        self.force = force
+        self.enabled = enabled
+        self.report = []
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def fingerprint(self, inputs, config=None, extra_files=()):
+        digest = hashlib.sha256()
+        for path in list(inputs) + list(extra_files):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Stage input not found: {path}")
+            digest.update(os.path.basename(path).encode())
+            hash_path(path, digest)
+        digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def run(self, stage, fn, inputs, outputs, config=None, extra_files=()):
+        """Run fn() unless a cached entry matches; returns True on a cache hit"""
+        try:
+            fingerprint = self.fingerprint(inputs, config, extra_files) if self.enabled else None
+            entry_dir = os.path.join(self.cache_dir, stage, fingerprint or "")
+            manifest_path = os.path.join(entry_dir, "manifest.json")
+
+            if self.enabled and not self.force and os.path.exists(manifest_path):
+                with open(manifest_path) as f:
+                    manifest = json.load(f)
+
+                start = time.perf_counter()
+                self._restore(entry_dir, manifest, outputs)
+                restore_s = time.perf_counter() - start
+
+                manifest["last_used"] = time.time()
+                with open(manifest_path, "w") as f:
+                    json.dump(manifest, f, indent=2)
+
+                saved_s = max(0.0, manifest["duration_s"] - restore_s)
+                self.report.append({"stage": stage, "hit": True, "fingerprint": fingerprint[:12],
+                                    "duration_s": restore_s, "saved_s": saved_s})
+                logger.info(f"Stage cache hit for {stage} ({fingerprint[:12]}), saved {saved_s:.1f}s")
+                return True
+
+            logger.info(f"Stage cache miss for {stage}, running stage")
+            start = time.perf_counter()
+            fn()
+            duration_s = time.perf_counter() - start
+
+            self.report.append({"stage": stage, "hit": False, "fingerprint": (fingerprint or "")[:12],
+                                "duration_s": duration_s, "saved_s": 0.0})
+
+            if self.enabled:
+                self._store(entry_dir, outputs, duration_s)
+                self.evict(stage)
+            return False
+
+        except Exception as e:
+            logger.error(f"Error in stage cache for {stage}: {e}")
+            raise CustomException(f"Stage cache failed for {stage}", e)
+
+    def _store(self, entry_dir, outputs, duration_s):
+        if os.path.exists(entry_dir):
+            shutil.rmtree(entry_dir)
+        os.makedirs(entry_dir)
+
+        files = {}
+        for i, path in enumerate(outputs):
+            cached_name = f"{i:02d}_{os.path.basename(path)}"
+            _copy(path, os.path.join(entry_dir, cached_name))
+            files[path] = {"cached_name": cached_name, "sha256": hash_path(path).hexdigest()}
+
+        manifest = {"duration_s": duration_s, "created": time.time(), "last_used": time.time(), "outputs": files}
+        with open(os.path.join(entry_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    def _restore(self, entry_dir, manifest, outputs):
+        for path in outputs:
+            info = manifest["outputs"][path]
+            # Outputs already on disk from the same run are left alone
+            if os.path.exists(path) and hash_path(path).hexdigest() == info["sha256"]:
+                continue
+            _copy(os.path.join(entry_dir, info["cached_name"]), path)
+
+    def _entries(self, stage):
+        stage_dir = os.path.join(self.cache_dir, stage)
+        if not os.path.isdir(stage_dir):
+            return []
+        entries = []
+        for name in os.listdir(stage_dir):
+            manifest_path = os.path.join(stage_dir, name, "manifest.json")
+            if os.path.exists(manifest_path):
+                with open(manifest_path) as f:
+                    entries.append((json.load(f)["last_used"], os.path.join(stage_dir, name)))
+            else:
+                entries.append((0.0, os.path.join(stage_dir, name)))
+        return sorted(entries, reverse=True)
+
+    def evict(self, stage):
+        """Keep the most recently used entries of a stage and drop ones older than max_age_days"""
+        now = time.time()
+        for rank, (last_used, path) in enumerate(self._entries(stage)):
+            too_many = rank >= self.max_entries_per_stage
+            too_old = self.max_age_days is not None and now - last_used > self.max_age_days * 86400
+            if too_many or too_old:
+                shutil.rmtree(path, ignore_errors=True)
+                logger.info(f"Evicted cached {stage} entry {os.path.basename(path)[:12]}")
+
+    def invalidate(self, stages=None):
+        """Drop the cached entries of stages (default: every stage this cache was created for)"""
+        for stage in stages or self.stages:
+            shutil.rmtree(os.path.join(self.cache_dir, stage), ignore_errors=True)
+            logger.info(f"Invalidated stage cache for {stage}")
+
+    def summary(self):
+        lines = [f"{'stage':<16} {'result':<6} {'time s':>8} {'saved s':>8}"]
+        for r in self.report:
+            lines.append(f"{r['stage']:<16} {'hit' if r['hit'] else 'miss':<6} {r['duration_s']:>8.1f} {r['saved_s']:>8.1f}")
+        lines.append(f"Total time saved by stage cache: {sum(r['saved_s'] for r in self.report):.1f}s")
+        return "\n".join(lines)
@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import base64
+import hashlib
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.logger import get_logger
+from src.custom_exception import CustomException
+from config.paths_config import PROJECT_ROOT
+
+logger = get_logger(__name__)
+
+# md5 is base64-encoded like GCS's blob.md5_hash; generation changes whenever the object is rewritten
+ObjectInfo = namedtuple("ObjectInfo", ["size", "md5", "generation"])
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_md5(path):
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return base64.b64encode(digest.digest()).decode()
+
+
+class StorageBackend:
+    """Minimal object-store interface used by ChunkedDownloader"""
+
+    def stat(self, name):
+        raise NotImplementedError
+
+    def read_range(self, name, start, end, generation=None):
+        """Bytes [start, end) of the object"""
+        raise NotImplementedError
+
+
+class GCSBackend(StorageBackend):
+
+    def __init__(self, bucket_name):
+        self.bucket_name = bucket_name
+        self._bucket = None
+        self._lock = threading.Lock()
+
+    @property
+    def bucket(self):
+        with self._lock:
+            if self._bucket is None:
+                from google.cloud import storage
+                self._bucket = storage.Client().bucket(self.bucket_name)
+        return self._bucket
+
+    def stat(self, name):
+        blob = self.bucket.get_blob(name)
+        if blob is None:
+            raise FileNotFoundError(f"gs://{self.bucket_name}/{name} not found")
+        return ObjectInfo(size=blob.size, md5=blob.md5_hash, generation=str(blob.generation))
+
+    def read_range(self, name, start, end, generation=None):
+        # Pinning the generation keeps all chunks from the same version of the object
+        blob = self.bucket.blob(name, generation=int(generation) if generation else None)
+        return blob.download_as_bytes(start=start, end=end - 1)
+
+
+class LocalDirectoryBackend(StorageBackend):
+    """Serves objects from a local directory, standing in for GCS in tests and offline runs"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def stat(self, name):
+        path = self._path(name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found")
+        st = os.stat(path)
+        return ObjectInfo(size=st.st_size, md5=file_md5(path), generation=str(st.st_mtime_ns))
+
+    def read_range(self, name, start, end, generation=None):
+        with open(self._path(name), "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+
+def make_backend(config):
+    """Storage backend from the data_ingestion config section"""
+    backend = config.get("storage_backend", "gcs")
+    if backend == "gcs":
+        return GCSBackend(config["bucket_name"])
+    if backend == "local":
+        return LocalDirectoryBackend(os.path.join(PROJECT_ROOT, config["local_dir"]))
+    raise CustomException(f"Unknown storage backend: {backend}")
+
+
+class ChunkedDownloader:
+    """Parallel byte-range download that skips unchanged objects and resumes partial files
+
+    A manifest next to the destination records the size/md5/generation of the last complete
+    download. While downloading, <dest>.part.json tracks finished chunks so an interrupted run
+    continues where it stopped.
+    """
+
+    def __init__(self, backend, chunk_size=32 * 1024 * 1024, max_workers=8):
+        self.backend = backend
+        self.chunk_size = int(chunk_size)
+        self.max_workers = int(max_workers)
+
+    @staticmethod
+    def _read_json(path):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _write_json(path, data):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+
+    def download(self, name, dest, manifest_path):
+        """Returns True if bytes were transferred, False if the local copy was already current"""
+        try:
+            info = self.backend.stat(name)
+            source = {"name": name, "size": info.size, "md5": info.md5, "generation": info.generation}
+
+            manifest = self._read_json(manifest_path)
+            if manifest and all(manifest.get(k) == v for k, v in source.items()) \
+                    and os.path.exists(dest) and os.path.getsize(dest) == info.size:
+                logger.info(f"{dest} matches remote generation {info.generation}, skipping download")
+                return False
+
+            part_path, state_path = f"{dest}.part", f"{dest}.part.json"
+            state = self._read_json(state_path)
+            if not (state and state.get("source") == source and state.get("chunk_size") == self.chunk_size
+                    and os.path.exists(part_path) and os.path.getsize(part_path) == info.size):
+                state = {"source": source, "chunk_size": self.chunk_size, "done": []}
+                with open(part_path, "wb") as f:
+                    f.truncate(info.size)
+                self._write_json(state_path, state)
+            else:
+                logger.info(f"Resuming download of {name}: {len(state['done'])} chunks already on disk")
+
+            self._fetch_chunks(name, info, part_path, state, state_path)
+
+            if info.md5 and file_md5(part_path) != info.md5:
+                os.remove(part_path)
+                os.remove(state_path)
+                raise ValueError(f"MD5 mismatch after downloading {name}")
+
+            os.replace(part_path, dest)
+            os.remove(state_path)
+            self._write_json(manifest_path, {**source, "downloaded_at": time.time()})
+            return True
+
+        except Exception as e:
+            logger.error(f"Error while downloading {name}: {e}")
+            raise CustomException(f"Failed to download {name}", e)
+
+    def _fetch_chunks(self, name, info, part_path, state, state_path):
+        done = set(state["done"])
+        chunks = [(i, start, min(start + self.chunk_size, info.size))
+                  for i, start in enumerate(range(0, info.size, self.chunk_size)) if i not in done]
+        if not chunks:
+            return
+
+        start_time = time.perf_counter()
+        fd = os.open(part_path, os.O_WRONLY)
+        try:
+            def fetch(chunk):
+                index, start, end = chunk
+                data = self.backend.read_range(name, start, end, info.generation)
+                if len(data) != end - start:
+                    raise IOError(f"Short read for chunk {index}: {len(data)} of {end - start} bytes")
+                os.pwrite(fd, data, start)
+                return index
+
+            workers = min(self.max_workers, len(chunks))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for future in as_completed([executor.submit(fetch, chunk) for chunk in chunks]):
+                    state["done"].append(future.result())
+                    self._write_json(state_path, state)
+        finally:
+            os.close(fd)
+
+        elapsed = time.perf_counter() - start_time
+        transferred = sum(end - start for _, start, end in chunks)
+        logger.info(f"Downloaded {transferred / 2**20:.1f} MB of {name} in {len(chunks)} chunks "
+                    f"with {workers} workers in {elapsed:.2f}s")
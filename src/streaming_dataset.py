@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import numpy as np
+import lightgbm as lgb
+from src.logger import get_logger
+from src.custom_exception import CustomException
+from src.stage_cache import hash_path
+from utils.common_functions import iter_data_chunks
+
+logger = get_logger(__name__)
+
+# Binning settings of the streamed Dataset; anything that changes the bins changes the cache key
+DEFAULT_DATASET_PARAMS = {"max_bin": 255, "verbosity": -1, "feature_pre_filter": False}
+
+
+class SpooledMatrix(lgb.Sequence):
+    """Row-major float64 feature matrix spooled to disk and read back with positional reads
+
+    LightGBM samples single rows from it to find bin boundaries and then pushes it in batch_size
+    row slices, so only the binned Dataset and one batch live in memory. Reads go through the
+    page cache instead of a memory map, so the spool never counts towards the process's RSS.
+    """
+
+    def __init__(self, path, n_rows, n_cols, batch_size=65536):
+        self.path = path
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.batch_size = batch_size
+        self._row_bytes = n_cols * 8
+        self._fd = os.open(path, os.O_RDONLY)
+
+    def __len__(self):
+        return self.n_rows
+
+    def _read(self, start, stop):
+        data = os.pread(self._fd, (stop - start) * self._row_bytes, start * self._row_bytes)
+        return np.frombuffer(data, dtype=np.float64).reshape(-1, self.n_cols)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(self.n_rows)
+            return self._read(start, stop)[::step]
+        if isinstance(idx, (list, np.ndarray)):
+            return np.vstack([self._read(i, i + 1) for i in idx])
+        return self._read(idx, idx + 1)[0]
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class BoosterClassifier:
+    """Binary classifier around a trained lgb.Booster with the LGBMClassifier methods the app uses
+
+    Streaming training ends with lgb.train rather than LGBMClassifier.fit, so this is what gets
+    pickled to MODEL_OUTPUT_PATH; serving, evaluation and the tree-table export only need
+    predict, predict_proba, classes_ and booster_.
+    """
+
+    def __init__(self, booster, params=None):
+        self.booster_ = booster
+        self.params = dict(params or {})
+        self.classes_ = np.array([0, 1])
+        self.n_features_in_ = booster.num_feature()
+        self.feature_name_ = booster.feature_name()
+
+    def predict_proba(self, X):
+        positive = self.booster_.predict(X)
+        return np.column_stack([1 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[(self.booster_.predict(X) > 0.5).astype(int)]
+
+    def get_params(self, deep=True):
+        return {**self.params, "n_estimators": self.booster_.current_iteration()}
+
+
+def spool_features(path, spool_path, label_column, chunk_rows):
+    """Stream the artifact into a float64 spool file; returns (n_rows, feature_names, labels)"""
+    feature_names, labels, n_rows = None, [], 0
+    with open(spool_path, "wb") as spool:
+        for chunk in iter_data_chunks(path, chunk_rows):
+            if feature_names is None:
+                feature_names = [c for c in chunk.columns if c != label_column]
+            elif [c for c in chunk.columns if c != label_column] != feature_names:
+                raise ValueError(f"Column mismatch in chunk starting at row {n_rows} of {path}")
+            spool.write(np.ascontiguousarray(chunk[feature_names].to_numpy(dtype=np.float64)).tobytes())
+            labels.append(chunk[label_column].to_numpy(dtype=np.float32))
+            n_rows += len(chunk)
+    return n_rows, feature_names, np.concatenate(labels) if labels else np.empty(0, dtype=np.float32)
+
+
+class StreamingDatasetBuilder:
+    """Builds a LightGBM Dataset from a processed artifact without loading it into pandas
+
+    The artifact is read chunk by chunk into a spool file on disk, LightGBM bins it from there,
+    and the binned Dataset is saved in LightGBM's binary format under cache_dir, keyed on the
+    artifact's content and the binning params. Later runs load that binary file directly.
+    """
+
+    def __init__(self, cache_dir, label_column="booking_status", chunk_rows=100000, dataset_params=None,
+                 reuse_binary=True, max_entries=3):
+        self.cache_dir = cache_dir
+        self.label_column = label_column
+        self.chunk_rows = int(chunk_rows)
+        self.dataset_params = {**DEFAULT_DATASET_PARAMS, **(dataset_params or {})}
+        self.reuse_binary = reuse_binary
+        self.max_entries = max_entries
+        self.last_build = {}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def fingerprint(self, path):
+        digest = hash_path(path)
+        digest.update(json.dumps({"label": self.label_column, "params": self.dataset_params,
+                                  "lightgbm": lgb.__version__}, sort_keys=True).encode())
+        return digest.hexdigest()[:16]
+
+    def build(self, path):
+        """Constructed lgb.Dataset for the artifact at path, from the binary cache when possible"""
+        try:
+            start = time.perf_counter()
+            binary_path = os.path.join(self.cache_dir, f"{self.fingerprint(path)}.bin")
+
+            if self.reuse_binary and os.path.exists(binary_path):
+                dataset = lgb.Dataset(binary_path, params=self.dataset_params).construct()
+                os.utime(binary_path)
+                source = "binary"
+            else:
+                dataset = self._build_from_chunks(path, binary_path)
+                source = "chunks"
+
+            self.last_build = {"source": source, "rows": dataset.num_data(), "features": dataset.num_feature(),
+                               "seconds": time.perf_counter() - start, "binary_path": binary_path}
+            logger.info(f"Training Dataset with {self.last_build['rows']} rows built from {source} "
+                        f"in {self.last_build['seconds']:.2f}s")
+            return dataset
+        except Exception as e:
+            logger.error(f"Error while building the streaming Dataset from {path}: {e}")
+            raise CustomException("Failed to build LightGBM Dataset", e)
+
+    def _build_from_chunks(self, path, binary_path):
+        spool_path = f"{binary_path}.spool"
+        try:
+            n_rows, feature_names, labels = spool_features(path, spool_path, self.label_column, self.chunk_rows)
+            if n_rows == 0:
+                raise ValueError(f"No rows in {path}")
+            rows = SpooledMatrix(spool_path, n_rows, len(feature_names))
+            try:
+                dataset = lgb.Dataset(rows, label=labels, feature_name=feature_names, params=self.dataset_params,
+                                      free_raw_data=True).construct()
+            finally:
+                rows.close()
+        finally:
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+
+        if self.reuse_binary:
+            # save_binary appends its own suffix to paths without .bin, so keep the extension
+            tmp_path = f"{binary_path[:-len('.bin')]}.tmp.bin"
+            dataset.save_binary(tmp_path)
+            os.replace(tmp_path, binary_path)
+            self._prune()
+        return dataset
+
+    def _prune(self):
+        entries = sorted((os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                          if name.endswith(".bin") and not name.endswith(".tmp.bin")),
+                         key=os.path.getmtime, reverse=True)
+        for stale in entries[self.max_entries:]:
+            os.remove(stale)
+            logger.info(f"Removed cached binary Dataset {stale}")
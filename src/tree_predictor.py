@@ -0,0 +1,197 @@
+import json
+import os
+import numpy as np
+from src.logger import get_logger
+from src.custom_exception import CustomException
+
+logger = get_logger(__name__)
+
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+MISSING_TYPES = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+
+# LightGBM treats |x| <= kZeroThreshold as zero for missing_type=Zero
+ZERO_THRESHOLD = 1e-35
+
+# Upper bound on rows * trees evaluated at once, keeps temporaries small for large batches
+MAX_CELLS_PER_CHUNK = 1 << 20
+
+ARRAY_NAMES = ["feature", "threshold", "left", "right", "default_left", "missing_type", "value", "roots", "classes"]
+
+
+class TreeEnsemblePredictor:
+    """Array-backed copy of a binary LightGBM model, evaluated with NumPy only
+
+    Every node of every tree lives in one set of flat arrays. Leaves have feature == -1
+    and carry their output in `value`; split nodes point at their children by global index.
+    """
+
+    def __init__(self, feature, threshold, left, right, default_left, missing_type, value, roots, classes,
+                 sigmoid=1.0, average_output=False, n_features=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.missing_type = missing_type
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.sigmoid = float(sigmoid)
+        self.average_output = bool(average_output)
+        self.n_features_in_ = int(n_features) if n_features is not None else int(feature.max()) + 1
+        self._has_zero_missing = bool((missing_type == MISSING_ZERO).any())
+        # children[2 * node + went_right] lets one gather replace a where() per level
+        self._children = np.column_stack([left, right]).ravel()
+
+    @classmethod
+    def from_model(cls, model):
+        """Flatten a fitted LGBMClassifier (or a raw lgb.Booster) into tree tables"""
+        booster = getattr(model, "booster_", model)
+        dump = booster.dump_model()
+
+        if dump["num_class"] != 1:
+            raise CustomException("Only binary LightGBM models can be exported to tree tables")
+
+        objective = dump["objective"].split()
+        if objective[0] != "binary":
+            raise CustomException(f"Unsupported objective for tree tables: {dump['objective']}")
+        sigmoid = next((float(p.split(":")[1]) for p in objective[1:] if p.startswith("sigmoid:")), 1.0)
+
+        nodes = {name: [] for name in ["feature", "threshold", "left", "right", "default_left", "missing_type", "value"]}
+        roots = []
+
+        def add_node(node):
+            index = len(nodes["feature"])
+            for name in nodes:
+                nodes[name].append(0)
+
+            if "leaf_value" in node:
+                nodes["feature"][index] = -1
+                nodes["value"][index] = node["leaf_value"]
+                return index
+
+            if node["decision_type"] != "<=":
+                raise CustomException(f"Unsupported split type for tree tables: {node['decision_type']}")
+
+            nodes["feature"][index] = node["split_feature"]
+            nodes["threshold"][index] = node["threshold"]
+            nodes["default_left"][index] = node["default_left"]
+            nodes["missing_type"][index] = MISSING_TYPES[node["missing_type"]]
+            nodes["left"][index] = add_node(node["left_child"])
+            nodes["right"][index] = add_node(node["right_child"])
+            return index
+
+        for tree in dump["tree_info"]:
+            roots.append(add_node(tree["tree_structure"]))
+
+        classes = np.asarray(getattr(model, "classes_", [0, 1]))
+
+        return cls(
+            feature=np.asarray(nodes["feature"], dtype=np.int32),
+            threshold=np.asarray(nodes["threshold"], dtype=np.float64),
+            left=np.asarray(nodes["left"], dtype=np.int32),
+            right=np.asarray(nodes["right"], dtype=np.int32),
+            default_left=np.asarray(nodes["default_left"], dtype=bool),
+            missing_type=np.asarray(nodes["missing_type"], dtype=np.int8),
+            value=np.asarray(nodes["value"], dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=classes,
+            sigmoid=sigmoid,
+            average_output=dump.get("average_output", False),
+            n_features=dump["max_feature_idx"] + 1,
+        )
+
+    def save(self, directory):
+        """Write one .npy file per array plus meta.json, so the tables can be memory-mapped
+
+        Each file is written beside its target and renamed over it; truncating a file in place
+        would crash processes that still have the previous version memory-mapped.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            array = self.classes_ if name == "classes" else getattr(self, name)
+            path = os.path.join(directory, f"{name}.npy")
+            with open(f"{path}.tmp", "wb") as f:
+                np.save(f, array, allow_pickle=False)
+            os.replace(f"{path}.tmp", path)
+
+        meta = {
+            "sigmoid": self.sigmoid,
+            "average_output": self.average_output,
+            "n_features": self.n_features_in_,
+            "n_trees": len(self.roots),
+            "n_nodes": len(self.feature),
+        }
+        meta_path = os.path.join(directory, "meta.json")
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    @classmethod
+    def load(cls, directory, mmap_mode=None):
+        try:
+            with open(os.path.join(directory, "meta.json")) as f:
+                meta = json.load(f)
+            arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+                      for name in ARRAY_NAMES}
+        except Exception as e:
+            logger.error(f"Error while loading tree tables from {directory}: {e}")
+            raise CustomException("Failed to load tree tables", e)
+
+        return cls(**arrays, sigmoid=meta["sigmoid"], average_output=meta["average_output"],
+                   n_features=meta["n_features"])
+
+    def _raw_score_chunk(self, X):
+        n_rows, n_features = X.shape
+        n_trees = len(self.roots)
+
+        # One cell per (row, tree); only cells still sitting on a split node are advanced
+        node = np.tile(self.roots, n_rows)
+        row_offset = np.repeat(np.arange(n_rows, dtype=np.intp) * n_features, n_trees)
+        active = np.flatnonzero(self.feature[node] >= 0)
+        values = X.ravel()
+        check_missing = self._has_zero_missing or np.isnan(values).any()
+
+        while active.size:
+            current = node[active]
+            x = values[row_offset[active] + self.feature[current]]
+
+            if check_missing:
+                missing_type = self.missing_type[current]
+                is_nan = np.isnan(x)
+                # Non-NaN missing types compare NaN as zero, like LightGBM's NumericalDecision
+                x = np.where(is_nan & (missing_type != MISSING_NAN), 0.0, x)
+                use_default = ((missing_type == MISSING_ZERO) & (np.abs(x) <= ZERO_THRESHOLD)) | \
+                              ((missing_type == MISSING_NAN) & is_nan)
+                go_right = np.where(use_default, ~self.default_left[current], x > self.threshold[current])
+            else:
+                go_right = x > self.threshold[current]
+
+            current = self._children[2 * current + go_right]
+            node[active] = current
+            active = active[self.feature[current] >= 0]
+
+        score = self.value[node].reshape(n_rows, n_trees).sum(axis=1)
+        if self.average_output:
+            score /= n_trees
+        return score
+
+    def predict_raw(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got {X.shape[1]}")
+
+        chunk = max(1, MAX_CELLS_PER_CHUNK // max(1, len(self.roots)))
+        if len(X) <= chunk:
+            return self._raw_score_chunk(X)
+        return np.concatenate([self._raw_score_chunk(X[i:i + chunk]) for i in range(0, len(X), chunk)])
+
+    def predict_proba(self, X):
+        positive = 1.0 / (1.0 + np.exp(-self.sigmoid * self.predict_raw(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        positive = self.predict_proba(X)[:, 1]
+        return np.asarray(self.classes_)[(positive > 0.5).astype(np.intp)]
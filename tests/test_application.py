@@ -0,0 +1,143 @@
+import sys
+import importlib
+import joblib
+import numpy as np
+import lightgbm as lgb
+import pytest
+from benchmarks.synthetic_data import generate_reservations
+from src.batch_scoring import FEATURE_COLUMNS
+from src.preprocessor import BookingPreprocessor
+from src.drift_monitor import DriftMonitor, build_reference, save_reference
+
+CATEGORICAL_COLUMNS = ["type_of_meal_plan", "room_type_reserved", "market_segment_type", "booking_status"]
+NUMERICAL_COLUMNS = ["lead_time", "no_of_special_requests", "avg_price_per_room", "arrival_month", "arrival_date",
+                     "no_of_week_nights", "no_of_weekend_nights"]
+# Training order differs from the form order, as after feature selection
+TRAINING_ORDER = FEATURE_COLUMNS[::-1]
+
+
+@pytest.fixture(scope="module")
+def bookings():
+    """Raw synthetic bookings and the same rows encoded by the preprocessor the model is trained with"""
+    raw = generate_reservations(4000, seed=0)
+    preprocessor = BookingPreprocessor(CATEGORICAL_COLUMNS, NUMERICAL_COLUMNS, skewness_threshold=5).fit(raw)
+    preprocessor.set_feature_order(TRAINING_ORDER)
+    return raw, preprocessor, preprocessor.transform(raw[TRAINING_ORDER + ["booking_status"]])
+
+
+@pytest.fixture(scope="module")
+def app_module(tmp_path_factory, bookings):
+    """application.py imported against a scratch ARTIFACTS_DIR holding a small trained model"""
+    _, preprocessor, encoded = bookings
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setenv("ARTIFACTS_DIR", str(tmp_path_factory.mktemp("artifacts")))
+    paths = importlib.reload(importlib.import_module("config.paths_config"))
+
+    model = lgb.LGBMClassifier(n_estimators=20, num_leaves=15, verbose=-1, random_state=42)
+    model.fit(encoded[TRAINING_ORDER].to_numpy(dtype=np.float64), encoded["booking_status"])
+    joblib.dump(model, paths.MODEL_OUTPUT_PATH)
+    preprocessor.save(paths.PREPROCESSOR_PATH)
+    encoded.to_csv(paths.PROCESSED_TEST_DATA_PATH, index=False)
+    save_reference(build_reference(paths.PROCESSED_TEST_DATA_PATH, model, categorical_columns=CATEGORICAL_COLUMNS),
+                   paths.DRIFT_REFERENCE_PATH)
+
+    # Paths and config are read at import, so the app is imported only once they point here
+    sys.modules.pop("application", None)
+    application = importlib.import_module("application")
+    application.app.config["TESTING"] = True
+    yield application
+
+    sys.modules.pop("application", None)
+    monkeypatch.undo()
+    importlib.reload(paths)
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+def form_rows(bookings, n_rows, start=0):
+    """Encoded bookings in the form's column order, as /predict_batch takes them"""
+    return bookings[2][FEATURE_COLUMNS].iloc[start:start + n_rows]
+
+
+def expected_predictions(app_module, bookings, n_rows):
+    encoded = bookings[2].head(n_rows)
+    return app_module.model_registry.get().model.predict(encoded[TRAINING_ORDER].to_numpy(dtype=np.float64))
+
+
+def test_predict_batch_json_matches_the_model(app_module, client, bookings):
+    rows = form_rows(bookings, 50)
+    response = client.post("/predict_batch", json={"bookings": rows.to_numpy().tolist()})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["n_rows"] == 50
+    np.testing.assert_array_equal(body["predictions"], expected_predictions(app_module, bookings, 50))
+    assert len(body["probabilities"]) == 50
+    assert set(body["timing_ms"]) == {"parse", "predict"}
+
+
+def test_predict_batch_csv_with_header(app_module, client, bookings):
+    csv_text = form_rows(bookings, 20).to_csv(index=False)
+    response = client.post("/predict_batch", data=csv_text, content_type="text/csv")
+
+    assert response.status_code == 200
+    np.testing.assert_array_equal(response.get_json()["predictions"], expected_predictions(app_module, bookings, 20))
+
+
+def test_predict_batch_raw_bookings(app_module, client, bookings):
+    raw = bookings[0].head(30)
+    response = client.post("/predict_batch?raw=1", data=raw.to_csv(index=False), content_type="text/csv")
+
+    assert response.status_code == 200
+    np.testing.assert_array_equal(response.get_json()["predictions"], expected_predictions(app_module, bookings, 30))
+
+
+@pytest.mark.parametrize("payload", [
+    {"rows": []},
+    {"bookings": [[1, 2, 3]]},
+    {"bookings": [[True] * len(FEATURE_COLUMNS)]},
+    {"bookings": [["x"] * len(FEATURE_COLUMNS)]},
+])
+def test_predict_batch_rejects_invalid_input(client, payload):
+    response = client.post("/predict_batch", json=payload)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_predict_batch_rejects_batches_over_the_limit(app_module, client):
+    rows = [[0] * len(FEATURE_COLUMNS)] * (app_module.MAX_BATCH_SIZE + 1)
+    assert client.post("/predict_batch", json=rows).status_code == 400
+
+
+def test_stats_endpoints(client, bookings):
+    assert client.get("/stats/micro_batching").get_json() == {"enabled": False}
+    assert client.get("/stats/prediction_cache").get_json() == {"enabled": False}
+
+    client.post("/predict_batch", json=form_rows(bookings, 5).to_numpy().tolist())
+    model = client.get("/stats/model").get_json()
+    assert model["loaded"] is True
+    assert len(model["version"]) == 12
+
+    metrics = client.get("/metrics").get_data(as_text=True)
+    assert 'hotel_churn_requests_total{route="/predict_batch",status="200"}' in metrics
+    assert 'hotel_churn_request_phase_latency_ms_count{route="/predict_batch",phase="parse"}' in metrics
+
+
+def test_drift_endpoint(app_module, client, bookings, monkeypatch):
+    assert client.get("/drift").get_json() == {"enabled": False}
+
+    import config.paths_config as paths
+    monkeypatch.setattr(app_module, "drift_monitor", DriftMonitor(paths.DRIFT_REFERENCE_PATH, min_rows=100))
+    for start in range(0, 400, 100):
+        rows = form_rows(bookings, 100, start).to_numpy().tolist()
+        assert client.post("/predict_batch", json=rows).status_code == 200
+
+    snapshot = client.get("/drift").get_json()
+    assert snapshot["enabled"] is True
+    assert snapshot["live_rows"] == 400
+    # Served rows are the reference's own rows, so nothing has drifted
+    assert snapshot["status"] == "ok"
+    assert set(snapshot["columns"]) == set(TRAINING_ORDER) | {"prediction"}
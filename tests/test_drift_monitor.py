@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.drift_monitor import DriftMonitor, build_reference, save_reference, PREDICTION_COLUMN
+
+
+class ThresholdModel:
+    """Predicts 1 when the first feature is above 50, like a one-split tree"""
+
+    def predict(self, X):
+        return (np.asarray(X)[:, 0] > 50).astype(int)
+
+
+def make_frame(n_rows, seed, shift=0.0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "lead_time": rng.gamma(2.0, 25.0, n_rows) + shift,
+        "room_type": rng.choice([0, 1, 2], n_rows, p=[0.6, 0.3, 0.1]),
+        "price": rng.normal(100, 15, n_rows),
+        "booking_status": rng.integers(0, 2, n_rows),
+    })
+
+
+@pytest.fixture
+def reference_path(tmp_path):
+    data_path = tmp_path / "processed_train.csv"
+    make_frame(20000, seed=0).to_csv(data_path, index=False)
+    reference = build_reference(str(data_path), ThresholdModel(), categorical_columns=["room_type"],
+                                bins=20, psi_groups=10, chunk_rows=3000)
+    return save_reference(reference, str(tmp_path / "drift_reference.json"))
+
+
+def observe(monitor, frame):
+    X = frame[monitor.features].to_numpy(dtype=np.float64)
+    monitor.observe(X, ThresholdModel().predict(X))
+
+
+def test_reference_sketches_features_and_predictions(reference_path):
+    monitor = DriftMonitor(reference_path)
+    assert monitor.features == ["lead_time", "room_type", "price"]
+    assert monitor.reference["columns"][-1] == PREDICTION_COLUMN
+    assert monitor.reference["kinds"] == ["numeric", "categorical", "numeric", "categorical"]
+    assert monitor.reference["rows"] == 20000
+
+
+def test_same_distribution_has_low_psi(reference_path):
+    monitor = DriftMonitor(reference_path, min_rows=200)
+    observe(monitor, make_frame(5000, seed=1))
+
+    snapshot = monitor.snapshot()
+    assert snapshot["status"] == "ok"
+    assert snapshot["max_psi"] < 0.02
+    assert snapshot["drifted"] == []
+    lead_time = snapshot["columns"]["lead_time"]
+    assert lead_time["ks"] < 0.05
+    # Interpolated live quantiles land near the reference ones
+    np.testing.assert_allclose(lead_time["quantiles"]["live"][:2], lead_time["quantiles"]["reference"][:2], rtol=0.1)
+
+
+def test_shifted_feature_is_flagged(reference_path):
+    monitor = DriftMonitor(reference_path, min_rows=200, warn_psi=0.1, alert_psi=0.2)
+    observe(monitor, make_frame(5000, seed=1, shift=40.0))
+
+    snapshot = monitor.snapshot()
+    assert snapshot["status"] == "drift"
+    assert snapshot["max_psi_column"] in ("lead_time", PREDICTION_COLUMN)
+    assert "lead_time" in snapshot["drifted"]
+    assert snapshot["columns"]["price"]["status"] == "ok"
+    assert monitor.psi()[("lead_time",)] >= 0.2
+
+
+def test_few_rows_are_insufficient_data(reference_path):
+    monitor = DriftMonitor(reference_path, min_rows=200)
+    observe(monitor, make_frame(50, seed=1, shift=40.0))
+
+    snapshot = monitor.snapshot()
+    assert snapshot["status"] == "insufficient_data"
+    assert snapshot["columns"]["lead_time"]["status"] == "insufficient_data"
+
+
+def test_window_halves_live_counts(reference_path):
+    monitor = DriftMonitor(reference_path, window_rows=1000)
+    observe(monitor, make_frame(600, seed=1))
+    observe(monitor, make_frame(600, seed=2))
+
+    snapshot = monitor.snapshot()
+    assert snapshot["decays"] == 1
+    assert snapshot["live_rows"] == 600
+
+
+def test_missing_and_reloaded_reference(reference_path, tmp_path):
+    missing = DriftMonitor(str(tmp_path / "missing.json"))
+    missing.observe(np.zeros((1, 3)), [0])
+    assert missing.snapshot()["enabled"] is False
+
+    monitor = DriftMonitor(reference_path)
+    observe(monitor, make_frame(500, seed=1))
+    assert monitor.load_reference()
+    # Reloading starts the live sketch from zero
+    assert monitor.snapshot()["live_rows"] == 0
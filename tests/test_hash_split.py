@@ -0,0 +1,104 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from src.hash_split import HashSplitter, HISTOGRAM_BINS, hash_fraction
+
+
+def make_raw(n_rows, start=0, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Booking_ID": [f"INN{i:06d}" for i in range(start, start + n_rows)],
+        "lead_time": rng.integers(0, 400, n_rows),
+        "booking_status": np.where(rng.random(n_rows) < 0.3, "Canceled", "Not_Canceled"),
+    })
+
+
+def split(tmp_path, raw, name="run", extra_paths=(), **options):
+    raw_path = tmp_path / f"{name}_raw.csv"
+    raw.to_csv(raw_path, index=False)
+    splitter = HashSplitter(test_ratio=0.2, chunk_rows=997, manifest_path=str(tmp_path / "split.manifest.json"),
+                            **options)
+    counts = splitter.split(str(raw_path), str(tmp_path / f"{name}_train.csv"), str(tmp_path / f"{name}_test.csv"),
+                            extra_paths=extra_paths)
+    return counts, pd.read_csv(tmp_path / f"{name}_train.csv"), pd.read_csv(tmp_path / f"{name}_test.csv")
+
+
+def test_hash_fraction_is_stable_and_uniform():
+    ids = [f"INN{i:06d}" for i in range(20000)]
+    fractions = hash_fraction(ids)
+    np.testing.assert_array_equal(fractions, hash_fraction(list(reversed(ids)))[::-1])
+    assert ((fractions >= 0) & (fractions < 1)).all()
+    assert abs((fractions < 0.2).mean() - 0.2) < 0.01
+    assert not np.array_equal(fractions, hash_fraction(ids, salt="other"))
+
+
+def test_stratified_split_hits_the_ratio_per_class(tmp_path):
+    counts, train, test = split(tmp_path, make_raw(20000))
+
+    assert len(train) + len(test) == 20000
+    assert set(train["Booking_ID"]).isdisjoint(test["Booking_ID"])
+    for label in ("Canceled", "Not_Canceled"):
+        n_train, n_test = counts["train"][label], counts["test"][label]
+        # Each class's threshold is picked on a HISTOGRAM_BINS histogram of hash positions
+        assert abs(n_test / (n_train + n_test) - 0.2) < 0.002 + 1 / HISTOGRAM_BINS
+
+
+def test_thresholds_are_saved_and_reused(tmp_path):
+    split(tmp_path, make_raw(5000))
+    manifest = json.loads((tmp_path / "split.manifest.json").read_text())
+    assert set(manifest["thresholds"]) == {"Canceled", "Not_Canceled"}
+
+    # Appended rows do not refit the thresholds, so existing bookings keep their split
+    _, train, test = split(tmp_path, pd.concat([make_raw(5000), make_raw(2000, start=5000, seed=1)]), name="grown")
+    _, first_train, first_test = split(tmp_path, make_raw(5000), name="again")
+    assert set(first_test["Booking_ID"]) <= set(test["Booking_ID"])
+    assert set(first_train["Booking_ID"]) <= set(train["Booking_ID"])
+    assert json.loads((tmp_path / "split.manifest.json").read_text())["thresholds"] == manifest["thresholds"]
+
+
+def test_changed_settings_refit_thresholds(tmp_path):
+    split(tmp_path, make_raw(5000))
+    created = json.loads((tmp_path / "split.manifest.json").read_text())["created"]
+    split(tmp_path, make_raw(5000), name="salted", salt="other")
+    assert json.loads((tmp_path / "split.manifest.json").read_text())["created"] != created
+
+
+def test_row_order_does_not_change_the_split(tmp_path):
+    raw = make_raw(5000)
+    _, _, test = split(tmp_path, raw)
+    _, _, shuffled_test = split(tmp_path, raw.sample(frac=1, random_state=3), name="shuffled")
+    assert set(test["Booking_ID"]) == set(shuffled_test["Booking_ID"])
+
+
+def test_unstratified_split_uses_test_ratio(tmp_path):
+    counts, train, test = split(tmp_path, make_raw(20000), stratify=False)
+    assert not (tmp_path / "split.manifest.json").exists()
+    assert abs(len(test) / 20000 - 0.2) < 0.01
+
+
+def test_extra_paths_skip_ids_already_split(tmp_path):
+    raw = make_raw(3000)
+    appended = pd.concat([make_raw(10, start=2990), make_raw(200, start=3000, seed=1),
+                          make_raw(5, start=3000, seed=2)])
+    appended["lead_time"] = -1
+    appended.to_csv(tmp_path / "appended.csv", index=False)
+
+    _, train, test = split(tmp_path, raw, extra_paths=[str(tmp_path / "appended.csv")])
+    rows = pd.concat([train, test])
+    assert len(rows) == rows["Booking_ID"].nunique() == 3200
+    # Ids raw.csv already has keep its copy; the new ones are taken once
+    assert (rows["lead_time"] == -1).sum() == 200
+    assert (rows.set_index("Booking_ID").loc[raw["Booking_ID"], "lead_time"] >= 0).all()
+
+
+@pytest.mark.parametrize("extension", ["parquet", "feather"])
+def test_binary_outputs(tmp_path, extension):
+    pytest.importorskip("pyarrow")
+    raw_path = tmp_path / "raw.csv"
+    make_raw(3000).to_csv(raw_path, index=False)
+    counts = HashSplitter(test_ratio=0.2, chunk_rows=500).split(
+        str(raw_path), str(tmp_path / f"train.{extension}"), str(tmp_path / f"test.{extension}"))
+    read = pd.read_parquet if extension == "parquet" else pd.read_feather
+    assert len(read(tmp_path / f"train.{extension}")) == sum(counts["train"].values())
+    assert len(read(tmp_path / f"test.{extension}")) == sum(counts["test"].values())
@@ -0,0 +1,79 @@
+import numpy as np
+import lightgbm as lgb
+import pytest
+from src.hyperparameter_search import SuccessiveHalvingSearch, split_thread_budget
+from src.streaming_dataset import BoosterClassifier
+
+PARAM_DISTRIBUTIONS = {
+    "num_leaves": [4, 15, 31],
+    "learning_rate": [0.02, 0.1, 0.3],
+    "min_child_samples": [5, 20],
+}
+
+
+def make_data(n_rows=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((n_rows, 6))
+    y = ((X[:, 0] + 0.5 * X[:, 1] + 0.1 * rng.standard_normal(n_rows)) > 0.75).astype(int)
+    return X, y
+
+
+def search(**options):
+    options = {"n_candidates": 9, "min_rounds": 5, "max_rounds": 45, "eta": 3, "cv": 2, "thread_budget": 2,
+               "parallel_trials": 2, **options}
+    return SuccessiveHalvingSearch(PARAM_DISTRIBUTIONS, **options)
+
+
+@pytest.mark.parametrize("budget, trials, expected", [(8, 2, (2, 4)), (8, 3, (3, 2)), (2, 5, (2, 1)), (1, 1, (1, 1))])
+def test_split_thread_budget(budget, trials, expected):
+    assert split_thread_budget(budget, trials) == expected
+
+
+def test_rungs_grow_by_eta_up_to_max_rounds():
+    assert search()._rungs() == [5, 15, 45]
+    assert search(max_rounds=100)._rungs() == [5, 15, 45, 100]
+
+
+def test_halving_keeps_the_best_third_each_rung():
+    X, y = make_data()
+    result = search().fit(X, y)
+
+    per_rung = [sum(r["rung"] == rung for r in result.results_) for rung in range(3)]
+    assert per_rung == [9, 3, 1]
+    for rung in (1, 2):
+        previous = sorted((r for r in result.results_ if r["rung"] == rung - 1), key=lambda r: r["score"],
+                          reverse=True)
+        survivors = {r["candidate"] for r in result.results_ if r["rung"] == rung}
+        assert survivors == {r["candidate"] for r in previous[:len(survivors)]}
+
+    assert result.n_trials_ == (9 + 3 + 1) * 2
+    assert result.ranking_[0]["score"] == result.best_score_
+    assert result.best_score_ > 0.85
+    assert result.best_params_["n_estimators"] >= 1
+    assert isinstance(result.best_estimator_, lgb.LGBMClassifier)
+    assert result.best_estimator_.n_estimators == result.best_params_["n_estimators"]
+
+
+def test_same_seed_same_winner():
+    X, y = make_data()
+    first, second = search().fit(X, y), search().fit(X, y)
+    assert first.best_params_ == second.best_params_
+    assert first.best_score_ == second.best_score_
+
+
+def test_fixed_params_reach_every_model():
+    X, y = make_data()
+    result = search(fixed_params={"reg_lambda": 2.0}).fit(X, y)
+    assert result.best_estimator_.get_params()["reg_lambda"] == 2.0
+
+
+def test_constructed_dataset_refits_a_booster_classifier():
+    X, y = make_data()
+    dataset = lgb.Dataset(X, label=y, params={"verbosity": -1, "feature_pre_filter": False},
+                          free_raw_data=False).construct()
+    result = search().fit(dataset, None)
+
+    assert isinstance(result.best_estimator_, BoosterClassifier)
+    assert result.best_score_ > 0.85
+    X_test, y_test = make_data(1000, seed=1)
+    assert (result.best_estimator_.predict(X_test) == y_test).mean() > 0.85
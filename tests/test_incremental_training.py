@@ -0,0 +1,134 @@
+import json
+import joblib
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+import pytest
+from benchmarks.synthetic_data import generate_reservations
+from src.batch_scoring import FEATURE_COLUMNS
+from src.preprocessor import BookingPreprocessor
+from src.incremental_training import IncrementalTrainer, full_retrain_seconds, record_new_bookings
+
+CATEGORICAL_COLUMNS = ["type_of_meal_plan", "room_type_reserved", "market_segment_type", "booking_status"]
+NUMERICAL_COLUMNS = [c for c in FEATURE_COLUMNS if c not in CATEGORICAL_COLUMNS]
+CONFIG = {"max_extra_trees": 20, "early_stopping_rounds": 5, "holdout_ratio": 0.2, "min_delta_rows": 100,
+          "metric": "accuracy", "drift_threshold": 0.05, "max_regression": 0.01}
+
+
+def bookings(n_rows, seed, prefix):
+    df = generate_reservations(n_rows, seed=seed)
+    df["Booking_ID"] = [f"{prefix}{i:06d}" for i in range(n_rows)]
+    return df
+
+
+@pytest.fixture(scope="module")
+def artifacts(tmp_path_factory):
+    """A model and preprocessor trained on synthetic history, with an encoded test set"""
+    root = tmp_path_factory.mktemp("incremental")
+    history = bookings(6000, seed=0, prefix="INN")
+    preprocessor = BookingPreprocessor(CATEGORICAL_COLUMNS, NUMERICAL_COLUMNS, skewness_threshold=5).fit(history)
+    preprocessor.set_feature_order(FEATURE_COLUMNS)
+    encoded = preprocessor.transform(history[FEATURE_COLUMNS + ["booking_status"]])
+
+    train, test = encoded.iloc[:5000], encoded.iloc[5000:]
+    model = lgb.LGBMClassifier(n_estimators=30, num_leaves=15, verbose=-1, random_state=42)
+    model.fit(train[FEATURE_COLUMNS].astype(np.float64), train["booking_status"])
+
+    paths = {"model": str(root / "model.pkl"), "preprocessor": str(root / "preprocessor.pkl"),
+             "test": str(root / "test.csv"), "raw": str(root / "raw.csv"), "root": root}
+    joblib.dump(model, paths["model"])
+    preprocessor.save(paths["preprocessor"])
+    test.to_csv(paths["test"], index=False)
+    history.to_csv(paths["raw"], index=False)
+    return paths
+
+
+def trainer(artifacts, **config):
+    return IncrementalTrainer(artifacts["model"], artifacts["preprocessor"], artifacts["test"], {**CONFIG, **config})
+
+
+def write_delta(artifacts, name, df):
+    path = artifacts["root"] / f"{name}.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_refresh_adds_trees_to_the_saved_model(artifacts):
+    delta = write_delta(artifacts, "similar", bookings(3000, seed=1, prefix="NEW"))
+    refresher = trainer(artifacts)
+    refreshed = refresher.refresh(delta)
+
+    assert refresher.status == "refreshed"
+    assert refresher.fallback_reason is None
+    assert refresher.metrics["trees_before"] == 30
+    assert refreshed.booster_.current_iteration() == 30 + refresher.metrics["added_trees"]
+    assert refresher.metrics["added_trees"] <= CONFIG["max_extra_trees"]
+    assert refresher.metrics["delta_refresh_rows"] + refresher.metrics["delta_holdout_rows"] == 3000
+    assert refresher.metrics["before_test_accuracy"] - refresher.metrics["after_test_accuracy"] <= 0.01
+    assert refreshed.predict(np.zeros((2, len(FEATURE_COLUMNS)))).shape == (2,)
+
+
+def test_small_delta_is_skipped(artifacts):
+    delta = write_delta(artifacts, "small", bookings(50, seed=2, prefix="SMALL"))
+    refresher = trainer(artifacts)
+    assert refresher.refresh(delta) is None
+    assert refresher.status == "skipped"
+
+
+def test_drifted_delta_falls_back_to_full_retrain(artifacts):
+    drifted = bookings(3000, seed=3, prefix="FLIP")
+    # Flipped labels: the saved model is far worse on the delta than on the test set
+    drifted["booking_status"] = drifted["booking_status"].map({"Canceled": "Not_Canceled",
+                                                               "Not_Canceled": "Canceled"})
+    refresher = trainer(artifacts)
+    assert refresher.refresh(write_delta(artifacts, "drifted", drifted)) is None
+    assert refresher.status == "full_retrain"
+    assert "on the delta" in refresher.fallback_reason
+    assert refresher.metrics["delta_drift"] > CONFIG["drift_threshold"]
+
+
+def test_tree_cap_falls_back_to_full_retrain(artifacts):
+    delta = write_delta(artifacts, "capped", bookings(3000, seed=1, prefix="CAP"))
+    refresher = trainer(artifacts, max_total_trees=30, early_stopping_rounds=50)
+    assert refresher.refresh(delta) is None
+    assert refresher.status == "full_retrain"
+    assert "trees" in refresher.fallback_reason
+
+
+def test_record_new_bookings_appends_only_unseen_ids(artifacts, tmp_path):
+    raw = pd.read_csv(artifacts["raw"])
+    delta = pd.concat([raw.head(10), bookings(40, seed=4, prefix="REC")])
+    delta_path = write_delta(artifacts, "record", delta)
+    appended_path = str(tmp_path / "appended_rows.csv")
+    raw_before = open(artifacts["raw"], "rb").read()
+
+    assert len(record_new_bookings(delta_path, artifacts["raw"], appended_path, chunk_rows=1000)) == 40
+    # A second run of the same delta finds every id already recorded
+    assert len(record_new_bookings(delta_path, artifacts["raw"], appended_path, chunk_rows=1000)) == 0
+
+    appended = pd.read_csv(appended_path)
+    assert list(appended.columns) == list(raw.columns)
+    assert appended["Booking_ID"].str.startswith("REC").all() and len(appended) == 40
+    assert open(artifacts["raw"], "rb").read() == raw_before
+
+
+def test_full_retrain_seconds(tmp_path):
+    path = tmp_path / "run_summary.json"
+    assert full_retrain_seconds(str(path)) is None
+
+    stages = [{"stage": "train_lgbm"}]
+    path.write_text(json.dumps({"stages": stages, "total_wall_s": 99.0,
+                                "stage_cache": [{"hit": True, "duration_s": 0.5, "saved_s": 30.0},
+                                                {"hit": False, "duration_s": 12.0, "saved_s": 0.0}]}))
+    assert full_retrain_seconds(str(path)) == 42.0
+
+    path.write_text(json.dumps({"stages": stages, "total_wall_s": 99.0,
+                                "dag": {"data_processing": {"wall_s": 5.0}, "model_training": {"wall_s": 20.0}}}))
+    assert full_retrain_seconds(str(path)) == 25.0
+
+    path.write_text(json.dumps({"stages": stages, "total_wall_s": 99.0}))
+    assert full_retrain_seconds(str(path)) == 99.0
+
+    # An incremental run's summary has no training stage to compare against
+    path.write_text(json.dumps({"stages": [{"stage": "prepare_delta"}], "total_wall_s": 3.0}))
+    assert full_retrain_seconds(str(path)) is None
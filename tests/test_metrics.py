@@ -0,0 +1,49 @@
+import threading
+from src.metrics import MetricsRegistry
+
+
+def run_in_threads(fn, n_threads):
+    threads = [threading.Thread(target=fn) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_counter_keeps_counts_of_finished_threads_and_drops_their_shards():
+    registry = MetricsRegistry("app")
+    counter = registry.counter("requests_total", "Requests", ["endpoint"])
+    child = counter.labels("/predict")
+
+    for _ in range(5):
+        run_in_threads(lambda: [child.inc() for _ in range(100)], 8)
+    child.inc(2)
+
+    assert child.value() == 5 * 8 * 100 + 2
+    # Only the main thread's shard is left; the 40 finished ones were folded into the totals
+    assert len(child._shards) == 1
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry("app")
+    counter = registry.counter("requests_total", "Requests", ["endpoint"])
+    histogram = registry.histogram("latency_ms", "Latency", ["endpoint"], buckets=(1, 10))
+    registry.gauge("cache_entries", "Entries", lambda: 3)
+    registry.gauge("broken", "Raises", lambda: 1 / 0)
+
+    counter.labels('/a"b').inc(3)
+    for value in (0.5, 5, 50):
+        histogram.labels("/predict").observe(value)
+    run_in_threads(lambda: histogram.labels("/predict").observe(5), 2)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE app_requests_total counter" in lines
+    assert 'app_requests_total{endpoint="/a\\"b"} 3' in lines
+    assert 'app_latency_ms_bucket{endpoint="/predict",le="1"} 1' in lines
+    assert 'app_latency_ms_bucket{endpoint="/predict",le="10"} 4' in lines
+    assert 'app_latency_ms_bucket{endpoint="/predict",le="+Inf"} 5' in lines
+    assert 'app_latency_ms_sum{endpoint="/predict"} 65.5' in lines
+    assert 'app_latency_ms_count{endpoint="/predict"} 5' in lines
+    assert "app_cache_entries 3.0" in lines
+    # A failing gauge is left out instead of breaking the scrape
+    assert not any(line.startswith("app_broken ") for line in lines)
@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import pytest
+from src.stage_cache import StageCache
+from src.custom_exception import CustomException
+
+
+class Stage:
+    """Writes the upper-cased input to the output file and counts its runs"""
+
+    def __init__(self, input_path, output_path):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.runs = 0
+
+    def __call__(self):
+        self.runs += 1
+        with open(self.input_path) as f, open(self.output_path, "w") as out:
+            out.write(f.read().upper())
+
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+@pytest.fixture
+def stage(tmp_path):
+    write(tmp_path / "input.txt", "first")
+    return Stage(str(tmp_path / "input.txt"), str(tmp_path / "output.txt"))
+
+
+def run(cache, stage, config=None):
+    return cache.run("upper", stage, inputs=[stage.input_path], outputs=[stage.output_path], config=config)
+
+
+def test_unchanged_inputs_hit_and_restore_outputs(tmp_path, stage):
+    cache = StageCache(str(tmp_path / "cache"), stages=["upper"])
+    assert run(cache, stage) is False
+    os.remove(stage.output_path)
+
+    assert run(cache, stage) is True
+    assert stage.runs == 1
+    assert read(stage.output_path) == "FIRST"
+    assert [r["hit"] for r in cache.report] == [False, True]
+
+
+def test_changed_input_or_config_misses(tmp_path, stage):
+    cache = StageCache(str(tmp_path / "cache"))
+    run(cache, stage, config={"ratio": 0.8})
+    assert run(cache, stage, config={"ratio": 0.7}) is False
+
+    write(stage.input_path, "second")
+    assert run(cache, stage, config={"ratio": 0.7}) is False
+    assert read(stage.output_path) == "SECOND"
+    assert stage.runs == 3
+
+    # Going back to an earlier input restores that entry's output
+    write(stage.input_path, "first")
+    assert run(cache, stage, config={"ratio": 0.8}) is True
+    assert read(stage.output_path) == "FIRST"
+
+
+def test_force_and_disabled_always_run(tmp_path, stage):
+    run(StageCache(str(tmp_path / "cache")), stage)
+    assert run(StageCache(str(tmp_path / "cache"), force=True), stage) is False
+    assert run(StageCache(str(tmp_path / "cache"), enabled=False), stage) is False
+    assert stage.runs == 3
+
+
+def test_evicts_least_recently_used_entries(tmp_path, stage):
+    cache = StageCache(str(tmp_path / "cache"), max_entries_per_stage=2)
+    for text in ("a", "b", "c"):
+        write(stage.input_path, text)
+        run(cache, stage)
+    assert len(os.listdir(tmp_path / "cache" / "upper")) == 2
+
+    # "a" was evicted, "b" and "c" are still cached
+    write(stage.input_path, "a")
+    assert run(cache, stage) is False
+    write(stage.input_path, "c")
+    assert run(cache, stage) is True
+
+
+def test_evicts_entries_older_than_max_age(tmp_path, stage):
+    cache = StageCache(str(tmp_path / "cache"), max_age_days=1)
+    run(cache, stage)
+    entry = os.listdir(tmp_path / "cache" / "upper")[0]
+    manifest_path = tmp_path / "cache" / "upper" / entry / "manifest.json"
+    manifest = json.loads(read(manifest_path))
+    manifest["last_used"] = time.time() - 2 * 86400
+    write(manifest_path, json.dumps(manifest))
+
+    cache.evict("upper")
+    assert not os.path.exists(tmp_path / "cache" / "upper" / entry)
+
+
+def test_invalidate_drops_only_its_stages(tmp_path, stage):
+    cache_dir = tmp_path / "cache"
+    os.makedirs(cache_dir / "feature_selection")
+    cache = StageCache(str(cache_dir), stages=["upper"])
+    run(cache, stage)
+
+    cache.invalidate()
+    assert not os.path.exists(cache_dir / "upper")
+    assert os.path.exists(cache_dir / "feature_selection")
+    assert run(cache, stage) is False
+
+
+def test_restores_directory_outputs_and_removes_stale_files(tmp_path):
+    write(tmp_path / "input.txt", "rows")
+    out_dir = tmp_path / "model"
+
+    def build():
+        os.makedirs(out_dir, exist_ok=True)
+        write(out_dir / "trees.npy", read(tmp_path / "input.txt"))
+
+    cache = StageCache(str(tmp_path / "cache"))
+    cache.run("export", build, inputs=[str(tmp_path / "input.txt")], outputs=[str(out_dir)])
+    write(out_dir / "trees.npy", "changed")
+    write(out_dir / "stale.npy", "left over")
+
+    assert cache.run("export", build, inputs=[str(tmp_path / "input.txt")], outputs=[str(out_dir)]) is True
+    assert sorted(os.listdir(out_dir)) == ["trees.npy"]
+    assert read(out_dir / "trees.npy") == "rows"
+
+
+def test_missing_input_raises(tmp_path, stage):
+    cache = StageCache(str(tmp_path / "cache"))
+    with pytest.raises(CustomException):
+        cache.run("upper", stage, inputs=[str(tmp_path / "missing.txt")], outputs=[stage.output_path])
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+import lightgbm as lgb
+from src.tree_predictor import TreeEnsemblePredictor, MISSING_NAN, MISSING_ZERO
+
+
+def make_data(n_rows=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((n_rows, 10)) * 100
+    y = ((X[:, 0] > 50) ^ (X[:, 1] > 30) | (X[:, 2] > 90)).astype(int)
+    # Missing values correlated with the label, so splits learn a default direction for them
+    X[rng.random(n_rows) < 0.1, 0] = np.nan
+    X[(y == 1) & (rng.random(n_rows) < 0.2), 3] = np.nan
+    X[rng.random(n_rows) < 0.1, 4] = 0.0
+    return X, y
+
+
+def train(zero_as_missing=False):
+    X, y = make_data()
+    model = lgb.LGBMClassifier(n_estimators=40, num_leaves=15, zero_as_missing=zero_as_missing,
+                               verbose=-1, random_state=42)
+    return model.fit(X, y)
+
+
+@pytest.fixture(scope="module")
+def nan_model():
+    return train()
+
+
+@pytest.fixture(scope="module")
+def zero_model():
+    return train(zero_as_missing=True)
+
+
+def check_parity(model, tree_model):
+    X, _ = make_data(2000, seed=1)
+    X[::7, 1] = np.nan
+    np.testing.assert_allclose(tree_model.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-9)
+    np.testing.assert_array_equal(tree_model.predict(X), model.predict(X))
+    # A single row, as POST / scores it
+    np.testing.assert_allclose(tree_model.predict_proba(X[:1]), model.predict_proba(X[:1]), rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("mmap_mode", [None, "r"])
+def test_saved_tables_match_lightgbm(nan_model, tmp_path, mmap_mode):
+    TreeEnsemblePredictor.from_model(nan_model).save(tmp_path)
+    tree_model = TreeEnsemblePredictor.load(tmp_path, mmap_mode=mmap_mode)
+
+    if mmap_mode:
+        assert isinstance(tree_model.feature, np.memmap)
+    split = tree_model.feature >= 0
+    # The NaN branches below must actually go both ways
+    assert (tree_model.missing_type[split] == MISSING_NAN).any()
+    assert len(np.unique(tree_model.default_left[split & (tree_model.missing_type == MISSING_NAN)])) == 2
+    check_parity(nan_model, tree_model)
+
+
+def test_zero_as_missing_matches_lightgbm(zero_model, tmp_path):
+    TreeEnsemblePredictor.from_model(zero_model).save(tmp_path)
+    tree_model = TreeEnsemblePredictor.load(tmp_path, mmap_mode="r")
+
+    assert (tree_model.missing_type == MISSING_ZERO).any()
+    check_parity(zero_model, tree_model)
+
+
+def test_wrong_feature_count_is_rejected(nan_model):
+    tree_model = TreeEnsemblePredictor.from_model(nan_model)
+    with pytest.raises(ValueError):
+        tree_model.predict(np.zeros((1, 9)))
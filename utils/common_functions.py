@@ -1,4 +1,8 @@
 import os
+import json
+import resource
+import shutil
+import numpy as np
 import pandas as pd
 import yaml
 from src.logger import get_logger
@@ -20,16 +24,203 @@ def read_yaml(file_path):
         logger.error(f"Error while reading YAML file: {e}")
         raise CustomException("Failed to read YAML file", e)
 
-def load_data(path):
+def peak_rss_mb():
+    """Peak resident memory of this process in MB"""
+    # VmHWM belongs to the current address space; ru_maxrss on Linux survives exec and would
+    # report the parent's peak in a child process
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def reset_peak_rss():
+    """Reset VmHWM to the current RSS so the next peak_rss_mb() covers only what runs after this
+
+    Returns False where the kernel does not support it (peak_rss_mb then stays process-wide).
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def path_signature(path):
+    """(name, mtime_ns, size) of a model file, or of every file in a model directory"""
+    if not os.path.exists(path):
+        return None
+    if os.path.isdir(path):
+        entries = []
+        for name in sorted(os.listdir(path)):
+            st = os.stat(os.path.join(path, name))
+            entries.append((name, st.st_mtime_ns, st.st_size))
+        return tuple(entries)
+    st = os.stat(path)
+    return ((os.path.basename(path), st.st_mtime_ns, st.st_size),)
+
+def detect_format(path):
+    """Artifact format from the path: .parquet, .feather, .npy (directory of column blocks), else CSV"""
+    if os.path.isdir(path) or path.endswith(".npy"):
+        return "npy"
+    if path.endswith(".parquet"):
+        return "parquet"
+    if path.endswith(".feather"):
+        return "feather"
+    return "csv"
+
+def smallest_int_dtype(low, high):
+    """Narrowest signed integer dtype holding every value in [low, high]"""
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return np.int64
+
+def downcast_column(values, float32_rtol=1e-6):
+    """Column in its smallest integer dtype, or float32 when every value survives within float32_rtol"""
+    if pd.api.types.is_bool_dtype(values):
+        return values
+    if pd.api.types.is_integer_dtype(values):
+        if not len(values) or not isinstance(values.dtype, np.dtype):
+            # Nullable (masked) integer columns keep their dtype and missing values
+            return pd.to_numeric(values, downcast="integer")
+        return np.asarray(values).astype(smallest_int_dtype(values.min(), values.max()), copy=False)
+    if pd.api.types.is_float_dtype(values) and values.dtype != np.float32:
+        as_float32 = values.astype(np.float32)
+        if np.allclose(as_float32, values, rtol=float32_rtol, atol=0, equal_nan=True):
+            return as_float32
+    return values
+
+def downcast_frame(df, float32_rtol=1e-6):
+    """Smallest integer dtype per column; float32 when every value survives within float32_rtol"""
+    df = df.copy(deep=False)
+    for col in df.columns:
+        df[col] = downcast_column(df[col], float32_rtol)
+    return df
+
+def _save_npy(df, path):
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        entry = {"name": col, "file": f"col_{i:04d}.npy"}
+        values = df[col].to_numpy()
+        if values.dtype == object:
+            # Low-cardinality text is stored as small integer codes plus its categories
+            codes, categories = pd.factorize(df[col].astype(str))
+            if len(categories) <= min(2**15, len(df) // 2):
+                values = pd.to_numeric(pd.Series(codes), downcast="integer").to_numpy()
+                entry["categories"] = list(categories)
+            else:
+                values = df[col].astype(str).to_numpy(dtype=str)
+        np.save(os.path.join(path, entry["file"]), values, allow_pickle=False)
+        entry["dtype"] = values.dtype.str
+        columns.append(entry)
+
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"n_rows": len(df), "columns": columns}, f, indent=2)
+
+def _load_npy(path, mmap=True):
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    # Copy-on-write maps: pages are read lazily and in-place edits never touch the file
+    mmap_mode = "c" if mmap else None
+    data = {}
+    for c in meta["columns"]:
+        values = np.load(os.path.join(path, c["file"]), mmap_mode=mmap_mode, allow_pickle=False)
+        if "categories" in c:
+            values = pd.Categorical.from_codes(values, categories=c["categories"])
+        data[c["name"]] = values
+    return pd.DataFrame(data, copy=False)
+
+def write_data(df, path, artifacts_config=None):
+    """Write a DataFrame in the format implied by the path, downcasting dtypes for binary formats"""
+    try:
+        artifacts_config = artifacts_config or {}
+        file_format = detect_format(path)
+
+        if file_format != "csv" and artifacts_config.get("downcast", True):
+            df = downcast_frame(df, artifacts_config.get("float32_rtol", 1e-6))
+
+        if file_format == "parquet":
+            df.to_parquet(path, index=False)
+        elif file_format == "feather":
+            df.reset_index(drop=True).to_feather(path)
+        elif file_format == "npy":
+            _save_npy(df, path)
+        else:
+            df.to_csv(path, index=False)
+
+        logger.info(f"Saved {len(df)} rows as {file_format} to {path}")
+    except Exception as e:
+        logger.error(f"Error saving the data to {path}: {e}")
+        raise CustomException("Failed to save data", e)
+
+def load_data(path, mmap=True):
     try:
         logger.info(f"Loading data from {path}")
         if not os.path.exists(path):
             raise FileNotFoundError(f"Data file not found at path: {path}")
+
+        file_format = detect_format(path)
+        if file_format == "parquet":
+            return pd.read_parquet(path)
+        if file_format == "feather":
+            return pd.read_feather(path)
+        if file_format == "npy":
+            return _load_npy(path, mmap=mmap)
         return pd.read_csv(path)
     except Exception as e:
         logger.error(f"Error loading the data from {path}: {e}")
         raise CustomException("Failed to load data", e)
 
+def _iter_npy_chunks(path, chunk_rows):
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    columns = [(c, np.load(os.path.join(path, c["file"]), mmap_mode="r", allow_pickle=False))
+               for c in meta["columns"]]
+    for start in range(0, meta["n_rows"], chunk_rows):
+        data = {}
+        for c, values in columns:
+            block = np.array(values[start:start + chunk_rows])
+            if "categories" in c:
+                block = pd.Categorical.from_codes(block, categories=c["categories"])
+            data[c["name"]] = block
+        yield pd.DataFrame(data, copy=False)
+
+def iter_data_chunks(path, chunk_rows=100000):
+    """Yield DataFrames of at most chunk_rows rows, reading only one chunk of the artifact at a time"""
+    try:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Data file not found at path: {path}")
+
+        file_format = detect_format(path)
+        if file_format == "npy":
+            yield from _iter_npy_chunks(path, chunk_rows)
+        elif file_format == "parquet":
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+                yield batch.to_pandas()
+        elif file_format == "feather":
+            import pyarrow as pa
+            with pa.memory_map(path) as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    batch = reader.get_batch(i)
+                    for start in range(0, batch.num_rows, chunk_rows):
+                        yield batch.slice(start, chunk_rows).to_pandas()
+        else:
+            yield from pd.read_csv(path, chunksize=chunk_rows)
+    except Exception as e:
+        logger.error(f"Error reading chunks from {path}: {e}")
+        raise CustomException("Failed to read data in chunks", e)
+
 if __name__ == "__main__":
     config = read_yaml("config.yaml")
     print(config)
\ No newline at end of file
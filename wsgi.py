@@ -0,0 +1,13 @@
+"""Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app the master imports this module once, loads and warms the model, then forks the
+workers, which share the model's memory pages copy-on-write instead of each unpickling a copy.
+"""
+import gc
+from application import app, model_registry
+
+model_registry.warm_up()
+
+# Move everything loaded so far out of the collector's generations; otherwise the first GC
+# pass in each worker touches every object header and un-shares the pages
+gc.freeze()